@@ -0,0 +1,54 @@
+"""Adapt the polling interval of each switch to how busy it is."""
+
+
+class AdaptiveIntervals:
+    """Compute polling intervals from the last replies of each switch.
+
+    Switches whose counters change a lot are polled more often and idle ones
+    less often. The interval never goes below what keeps the processing time
+    and the number of entries per second under the configured limits.
+    """
+
+    #: Poll twice as often when more than this fraction of samples changed.
+    BUSY = 0.25
+    #: Poll 50% less often when less than this fraction of samples changed.
+    IDLE = 0.01
+
+    def __init__(self, min_interval, max_interval, max_load,
+                 max_entries_per_sec):
+        """Set the limits of the intervals.
+
+        Args:
+            min_interval (float): Shortest interval in seconds.
+            max_interval (float): Longest interval in seconds.
+            max_load (float): Maximum fraction of time spent processing the
+                replies of a switch and stats type.
+            max_entries_per_sec (float): Maximum entries (ports or flows) per
+                second received from a switch for a stats type.
+
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_load = max_load
+        self.max_entries_per_sec = max_entries_per_sec
+
+    def next_interval(self, interval, changed, entries, duration):
+        """Return the new interval after a reply.
+
+        Args:
+            interval (float): Current interval.
+            changed (float): Fraction of the samples that changed since the
+                previous reply, ``None`` if unknown.
+            entries (int): Number of entries in the reply.
+            duration (float): Seconds spent processing the reply.
+
+        """
+        if changed is not None:
+            if changed > self.BUSY:
+                interval /= 2
+            elif changed < self.IDLE:
+                interval *= 1.5
+        cost = max(duration / self.max_load,
+                   entries / self.max_entries_per_sec)
+        interval = max(interval, cost)
+        return min(max(interval, self.min_interval), self.max_interval)
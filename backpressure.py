@@ -0,0 +1,94 @@
+"""Bounded queue of samples waiting to be sent to kytos/kronos."""
+from collections import OrderedDict
+from threading import Lock
+
+from kytos.core import log
+
+
+class SampleQueue:
+    """Samples waiting for room in the app buffer.
+
+    Samples are keyed by namespace and value keys, as in
+    :class:`~changes.ChangeFilter`, since ``record`` mode has several
+    samples per namespace (e.g. ``packet_count`` and ``byte_count`` of a
+    flow). A newer sample replaces the unsent older one with the same key,
+    keeping its place in the queue. When the queue is full, the
+    ``drop_oldest`` policy discards the oldest sample and ``drop_newest``
+    discards the new one.
+    """
+
+    POLICIES = ('drop_oldest', 'drop_newest')
+
+    def __init__(self, max_samples, policy='drop_oldest'):
+        """Set the queue bounds.
+
+        Args:
+            max_samples (int): Maximum number of samples waiting.
+            policy (str): ``drop_oldest`` or ``drop_newest``.
+
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f'Invalid queue drop policy: {policy}')
+        self.max_samples = max_samples
+        self.policy = policy
+        #: (namespace, value keys) -> [namespace, value, timestamp, source]
+        self._samples = OrderedDict()
+        self._counters = {'queued': 0, 'coalesced': 0, 'dropped': 0,
+                          'sent': 0}
+        self._lock = Lock()
+
+    def add(self, samples, timestamp, source=None):
+        """Queue samples of a stats reply.
+
+        Args:
+            samples (list): ``(namespace, value)`` tuples.
+            timestamp (float): When the samples were received.
+            source (tuple): (dpid, stats name) of the samples.
+
+        """
+        dropped = 0
+        with self._lock:
+            for namespace, value in samples:
+                key = (namespace, tuple(value) if isinstance(value, dict)
+                       else None)
+                queued = self._samples.get(key)
+                if queued is not None:
+                    queued[:] = namespace, value, timestamp, source
+                    self._counters['coalesced'] += 1
+                    continue
+                if len(self._samples) >= self.max_samples:
+                    dropped += 1
+                    if self.policy == 'drop_newest':
+                        continue
+                    self._samples.popitem(last=False)
+                self._samples[key] = [namespace, value, timestamp, source]
+                self._counters['queued'] += 1
+            self._counters['dropped'] += dropped
+        if dropped:
+            log.warning('kytos/kronos is behind: %d samples dropped.',
+                        dropped)
+
+    def pop(self, count=None):
+        """Remove and return the oldest samples.
+
+        Returns:
+            list: ``(namespace, value, timestamp, source)`` tuples.
+
+        """
+        with self._lock:
+            if count is None:
+                count = len(self._samples)
+            result = []
+            for _ in range(min(count, len(self._samples))):
+                _, sample = self._samples.popitem(last=False)
+                result.append(tuple(sample))
+            self._counters['sent'] += len(result)
+            return result
+
+    def __len__(self):
+        return len(self._samples)
+
+    def counters(self):
+        """Return the number of waiting samples and the counters."""
+        with self._lock:
+            return dict(self._counters, pending=len(self._samples))
@@ -0,0 +1,174 @@
+"""Benchmark of the stats ingestion path.
+
+Synthetic port and flow stats replies are fed to ``Main._listen``, with
+stub buffers and switches. ``listen_v0x01`` and ``listen_v0x04`` are not
+called because kytos runs them in new threads and returns right away.
+Usage, from the NApp folder::
+
+    python -m benchmarks.ingestion --flows 1 1000 100000 -o results.json
+    python -m benchmarks.ingestion --compare results.json
+
+Results are saved as JSON. With ``--compare``, the new results are compared
+to a previous file and the exit status is 1 if any case got slower than
+``--threshold``.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from napps.kytos.of_stats.benchmarks.replies import (advance, get_replies,
+                                                     renumber)
+from napps.kytos.of_stats.benchmarks.stubs import (StubController, StubSwitch,
+                                                   expect_reply, get_event,
+                                                   get_stats_type)
+from napps.kytos.of_stats.main import Main
+
+PERCENTILES = (50, 90, 99)
+
+DPID = '00:00:00:00:00:00:00:01'
+
+
+def run_case(of_version, kind, count, repeats):
+    """Process ``repeats`` replies with ``count`` entries.
+
+    Counters are increased between repeats, outside the measurements, so
+    no sample is discarded as unchanged.
+
+    Returns:
+        dict: Throughput (entries per second), per-entry latency percentiles
+        (microseconds), peak memory (bytes) and the number of events.
+
+    """
+    controller = StubController()
+    napp = Main(controller)
+    switch = StubSwitch(DPID, of_version, count if kind == 'port' else 0)
+    controller.switches[DPID] = switch
+    messages = get_replies(of_version, kind, count)
+
+    def process(xid):
+        renumber(messages, xid)
+        advance(messages, kind, 1000)
+        expect_reply(napp, switch, messages[0])
+        start = time.perf_counter()
+        for message in messages:
+            napp._listen(  # pylint: disable=protected-access
+                get_event(switch, message), get_stats_type(message))
+        return time.perf_counter() - start
+
+    # The first reply creates the interface and flow stats objects.
+    process(1)
+    durations = sorted(process(xid) for xid in range(2, repeats + 2))
+    # tracemalloc slows everything down, so memory is measured apart.
+    tracemalloc.start()
+    process(repeats + 2)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = [duration / count * 1e6 for duration in durations]
+    result = {'of_version': of_version, 'kind': kind, 'entries': count,
+              'messages': len(messages), 'repeats': repeats,
+              'throughput': count * repeats / sum(durations),
+              'peak_memory': peak_memory,
+              'events': controller.buffers.app.count}
+    result['latency_us'] = {f'p{percentile}': _percentile(latencies,
+                                                          percentile)
+                            for percentile in PERCENTILES}
+    result['latency_us']['max'] = latencies[-1]
+    return result
+
+
+def _percentile(values, percentile):
+    """Return the nearest-rank percentile of sorted values."""
+    index = max(0, -(-len(values) * percentile // 100) - 1)
+    return values[index]
+
+
+def _case_key(result):
+    return (result['of_version'], result['kind'], result['entries'])
+
+
+def _get_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'],
+                              cwd=Path(__file__).parent, check=True,
+                              stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL,
+                              universal_newlines=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print the throughput change of each case.
+
+    Returns:
+        bool: Whether any case is slower than ``threshold`` (e.g. 0.1 for
+        10%).
+
+    """
+    old_results = {_case_key(result): result for result in baseline}
+    regression = False
+    for result in results:
+        old = old_results.get(_case_key(result))
+        if old is None:
+            continue
+        change = result['throughput'] / old['throughput'] - 1
+        slower = change < -threshold
+        regression |= slower
+        print('v0x{:02x} {:>5} {:>7} entries: {:+7.1%} throughput{}'.format(
+            *_case_key(result), change, ' REGRESSION' if slower else ''))
+    return regression
+
+
+def main(args=None):
+    """Run the benchmark cases from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--of-versions', nargs='+', type=int,
+                        default=[0x01, 0x04], choices=[0x01, 0x04],
+                        help='OpenFlow versions (1 or 4).')
+    parser.add_argument('--ports', nargs='+', type=int,
+                        default=[1, 48, 1000], help='Port counts.')
+    parser.add_argument('--flows', nargs='+', type=int,
+                        default=[1, 1000, 10000], help='Flow counts.')
+    parser.add_argument('--repeats', type=int, default=10,
+                        help='Replies measured per case.')
+    parser.add_argument('-o', '--output', type=Path,
+                        help='Save the results in this JSON file.')
+    parser.add_argument('--compare', type=Path,
+                        help='JSON file of a previous run.')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='Throughput loss taken as a regression.')
+    args = parser.parse_args(args)
+
+    cases = [(of_version, 'port', count) for of_version in args.of_versions
+             for count in args.ports]
+    cases += [(of_version, 'flow', count) for of_version in args.of_versions
+              for count in args.flows]
+    results = []
+    for of_version, kind, count in cases:
+        result = run_case(of_version, kind, count, args.repeats)
+        print('v0x{:02x} {:>5} {:>7} entries: {:>10.0f} entries/s, p99 {:.1f}'
+              ' us/entry, peak {:.1f} MiB'.format(
+                  of_version, kind, count, result['throughput'],
+                  result['latency_us']['p99'],
+                  result['peak_memory'] / 2**20))
+        results.append(result)
+
+    report = {'commit': _get_commit(), 'python': platform.python_version(),
+              'timestamp': time.time(), 'results': results}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())['results']
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Replay captured stats replies through the stats handlers.
+
+Replies recorded with the ``CAPTURE_FILE`` setting are fed to
+``Main._listen`` synchronously, with stub buffers and switches, as replies
+to requests of the NApp. Usage, from the NApp folder::
+
+    python -m benchmarks.replay capture.gz
+    python -m benchmarks.replay capture.gz --speed 10 -o results.json
+
+By default, replies are processed as fast as possible. With ``--speed``,
+the original gaps between replies are kept, divided by the speed. Sample
+timestamps are taken at processing time, so rates are computed over the
+replayed gaps.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from pyof.v0x01.common.utils import unpack_message as unpack01
+from pyof.v0x04.common.utils import unpack_message as unpack04
+
+from napps.kytos.of_stats.benchmarks.stubs import (StubController,
+                                                   StubInterface, StubSwitch,
+                                                   expect_reply, get_event,
+                                                   get_stats_type)
+from napps.kytos.of_stats.capture import read_capture
+from napps.kytos.of_stats.main import Main
+
+
+def load(path):
+    """Unpack the messages of a capture file, as of_core would do.
+
+    Returns:
+        list: ``(timestamp, dpid, of_version, message)`` tuples.
+
+    """
+    records = []
+    for timestamp, dpid, of_version, data in read_capture(path):
+        unpack = unpack01 if of_version == 0x01 else unpack04
+        records.append((timestamp, dpid, of_version, unpack(data)))
+    return records
+
+
+def replay(records, speed=None, sleep=time.sleep):
+    """Feed messages to a new NApp instance.
+
+    Args:
+        records (list): ``(timestamp, dpid, of_version, message)`` tuples.
+        speed (float): Divide the original gaps between replies by this
+            factor. As fast as possible if ``None``.
+        sleep (callable): Wait for a number of seconds.
+
+    Returns:
+        dict: Counts of messages, entries, switches and events, the seconds
+        spent in the handlers and in the whole replay, and the throughput
+        (entries per second of handler time).
+
+    """
+    controller = StubController()
+    napp = Main(controller)
+    switches = {}
+    for _, dpid, of_version, message in records:
+        switch = switches.get(dpid)
+        if switch is None:
+            switch = switches[dpid] = StubSwitch(dpid, of_version)
+            controller.switches[dpid] = switch
+        _add_interfaces(switch, message)
+
+    entries = 0
+    busy = 0
+    start = time.monotonic()
+    first = records[0][0] if records else 0
+    for timestamp, dpid, _, message in records:
+        if speed:
+            delay = (timestamp - first) / speed - (time.monotonic() - start)
+            if delay > 0:
+                sleep(delay)
+        expect_reply(napp, switches[dpid], message)
+        event = get_event(switches[dpid], message)
+        stats_type = get_stats_type(message)
+        handler_start = time.perf_counter()
+        napp._listen(event, stats_type)  # pylint: disable=protected-access
+        busy += time.perf_counter() - handler_start
+        entries += len(message.body) if isinstance(message.body, list) else 1
+    # pylint: disable=protected-access
+    if napp._offloader is not None:
+        # Wait for the replies processed by FLOW_STATS_OFFLOAD threads,
+        # which are not included in the handler time.
+        wait_start = time.perf_counter()
+        napp._offloader.shutdown(wait=True)
+        busy += time.perf_counter() - wait_start
+    return {'messages': len(records), 'entries': entries,
+            'switches': len(switches), 'busy_seconds': busy,
+            'elapsed_seconds': time.monotonic() - start,
+            'throughput': entries / busy if busy else None,
+            'events': controller.buffers.app.count}
+
+
+def _add_interfaces(switch, message):
+    """Create the interfaces of port stats entries, as of_core would do."""
+    for entry in message.body if isinstance(message.body, list) else []:
+        port_no = getattr(entry, 'port_no', None)
+        if port_no is not None and hasattr(entry, 'rx_bytes'):
+            switch.interfaces.setdefault(port_no.value,
+                                         StubInterface(port_no.value))
+
+
+def main(args=None):
+    """Replay a capture file from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('capture', type=Path, help='Capture file.')
+    parser.add_argument('--speed', type=float,
+                        help='Replay at this multiple of the original speed'
+                             ' instead of as fast as possible.')
+    parser.add_argument('-o', '--output', type=Path,
+                        help='Save the results in this JSON file.')
+    args = parser.parse_args(args)
+
+    result = replay(load(args.capture), args.speed)
+    print('{messages} messages, {entries} entries of {switches} switches in'
+          ' {elapsed_seconds:.2f} s ({busy_seconds:.2f} s in handlers),'
+          ' {events} events'.format(**result))
+    if result['throughput']:
+        print(f"{result['throughput']:.0f} entries/s")
+    if args.output:
+        args.output.write_text(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Build synthetic port and flow stats replies."""
+from pyof.foundation.basic_types import UBInt32, UBInt64
+from pyof.v0x01.common.flow_match import Match as Match01
+from pyof.v0x01.common.utils import unpack_message as unpack01
+from pyof.v0x01.controller2switch import common as common01
+from pyof.v0x01.controller2switch.stats_reply import StatsReply
+from pyof.v0x01.controller2switch.stats_request import StatsType
+from pyof.v0x04.common.flow_match import Match as Match04
+from pyof.v0x04.common.utils import unpack_message as unpack04
+from pyof.v0x04.controller2switch import multipart_reply as reply04
+from pyof.v0x04.controller2switch.common import MultipartType
+
+#: Maximum OpenFlow message size. Larger replies are split.
+MAX_MESSAGE_SIZE = 2**16 - 1
+
+#: OpenFlow header and stats/multipart reply fields before the body.
+REPLY_HEADER_SIZE = 16
+
+PORT_COUNTERS = ('rx_packets', 'tx_packets', 'rx_bytes', 'tx_bytes',
+                 'rx_dropped', 'tx_dropped', 'rx_errors', 'tx_errors')
+
+FLOW_COUNTERS = ('packet_count', 'byte_count')
+
+
+def get_port_stats(of_version, count):
+    """Return ``count`` port stats entries, numbered from 1."""
+    entries = []
+    for port_no in range(1, count + 1):
+        kwargs = dict(port_no=port_no, rx_frame_err=0, rx_over_err=0,
+                      rx_crc_err=0, collisions=0)
+        kwargs.update((counter, 0) for counter in PORT_COUNTERS)
+        if of_version == 0x01:
+            entries.append(common01.PortStats(**kwargs))
+        else:
+            entries.append(reply04.PortStats(duration_sec=0, duration_nsec=0,
+                                             **kwargs))
+    return entries
+
+
+def get_flow_stats(of_version, count):
+    """Return ``count`` flow stats entries with different cookies."""
+    entries = []
+    for cookie in range(count):
+        kwargs = dict(table_id=0, duration_sec=0, duration_nsec=0,
+                      priority=cookie % 2**16, idle_timeout=0,
+                      hard_timeout=0, cookie=cookie, packet_count=0,
+                      byte_count=0)
+        if of_version == 0x01:
+            entry = common01.FlowStats(match=Match01(), **kwargs)
+        else:
+            entry = reply04.FlowStats(match=Match04(), flags=0, **kwargs)
+        entry.length = entry.get_size()
+        entries.append(entry)
+    return entries
+
+
+def get_replies(of_version, kind, count, xid=1):
+    """Return unpacked stats reply messages, split as a switch would do.
+
+    Args:
+        of_version (int): 0x01 or 0x04.
+        kind (str): ``port`` or ``flow``.
+        count (int): Number of entries.
+        xid (int): Transaction id of the messages.
+
+    """
+    if kind == 'port':
+        entries = get_port_stats(of_version, count)
+    else:
+        entries = get_flow_stats(of_version, count)
+    if not entries:
+        return []
+    per_message = (MAX_MESSAGE_SIZE - REPLY_HEADER_SIZE) // \
+        entries[0].get_size()
+    chunks = [entries[start:start + per_message]
+              for start in range(0, len(entries), per_message)]
+    messages = []
+    for index, chunk in enumerate(chunks):
+        more = int(index < len(chunks) - 1)
+        messages.append(_get_message(of_version, kind, chunk, more, xid))
+    return messages
+
+
+def _get_message(of_version, kind, entries, more, xid):
+    if of_version == 0x01:
+        # v0x01 StatsReply only packs bytes or objects with pack()
+        body = b''.join(entry.pack() for entry in entries)
+        body_type = (StatsType.OFPST_PORT if kind == 'port'
+                     else StatsType.OFPST_FLOW)
+        message = StatsReply(xid=xid, body_type=body_type, flags=more,
+                             body=body)
+        return unpack01(message.pack())
+    multipart_type = (MultipartType.OFPMP_PORT_STATS if kind == 'port'
+                      else MultipartType.OFPMP_FLOW)
+    message = reply04.MultipartReply(xid=xid, multipart_type=multipart_type,
+                                     flags=more, body=entries)
+    return unpack04(message.pack())
+
+
+def advance(messages, kind, step):
+    """Increase the counters of all entries, as time goes by."""
+    counters = PORT_COUNTERS if kind == 'port' else FLOW_COUNTERS
+    for message in messages:
+        for entry in message.body:
+            for counter in counters:
+                value = getattr(entry, counter).value + step
+                setattr(entry, counter, UBInt64(value))
+
+
+def renumber(messages, xid):
+    """Set a new transaction id, so the reply is not taken as a late one."""
+    for message in messages:
+        message.header.xid = UBInt32(xid)
@@ -0,0 +1,100 @@
+"""Minimal controller objects to run the NApp without switches."""
+from types import SimpleNamespace
+
+
+class StubBuffer:
+    """Count the events instead of delivering them."""
+
+    def __init__(self):
+        """Start without events."""
+        self.count = 0
+
+    def put(self, event):  # pylint: disable=unused-argument
+        """Count an event."""
+        self.count += 1
+
+    @staticmethod
+    def qsize():
+        """Nothing is ever queued."""
+        return 0
+
+
+class StubInterface:
+    """Interface with the attributes used by of_stats."""
+
+    def __init__(self, port_number, speed=1250000000):
+        """Create a 10 Gbps interface without stats."""
+        self.port_number = port_number
+        self.speed = speed
+        self.stats = None
+
+    @staticmethod
+    def get_custom_speed():
+        """Stub interfaces have no custom speed."""
+        return None
+
+    def get_of_features_speed(self):
+        """Return the speed reported by the switch, in bytes/sec."""
+        return self.speed
+
+
+class StubSwitch:
+    """Connected switch with the attributes used by of_stats and of_core."""
+
+    def __init__(self, dpid, of_version, ports=0):
+        """Create a switch with ``ports`` interfaces, numbered from 1."""
+        self.id = dpid  # pylint: disable=invalid-name
+        self.dpid = dpid
+        self.connection = SimpleNamespace(
+            protocol=SimpleNamespace(version=of_version), switch=self)
+        self.interfaces = {port: StubInterface(port)
+                           for port in range(1, ports + 1)}
+        self.flows = []
+
+    @staticmethod
+    def is_connected():
+        """Stub switches are always connected."""
+        return True
+
+    def get_interface_by_port_no(self, port_no):
+        """Return the interface or None."""
+        return self.interfaces.get(port_no)
+
+    def get_flow_by_id(self, flow_id):
+        """Return a Flow using its id, None if not found."""
+        for flow in self.flows:
+            if flow.id == flow_id:
+                return flow
+        return None
+
+
+class StubController:
+    """Controller with the buffers and switches used by of_stats."""
+
+    def __init__(self):
+        """Create empty buffers and no switches."""
+        self.buffers = SimpleNamespace(msg_out=StubBuffer(),
+                                       app=StubBuffer())
+        self.switches = {}
+
+
+def get_event(switch, message):
+    """Return an event like the ones of_core sends for stats replies."""
+    return SimpleNamespace(content={'message': message},
+                           source=SimpleNamespace(switch=switch))
+
+
+def get_stats_type(message):
+    """Return the stats type of a reply, as the listen methods of Main do."""
+    if message.header.version.value == 0x01:
+        return message.body_type
+    return message.multipart_type
+
+
+def expect_reply(napp, switch, message):
+    """Register the request of a reply as sent, so the NApp processes it."""
+    # pylint: disable=protected-access
+    xid = message.header.xid.value
+    if not napp._inflight.is_outstanding(switch.id, xid):
+        stats = napp._stats[get_stats_type(message).value]
+        napp._inflight.sent(switch.id, stats.name, xid, stats=stats)
@@ -0,0 +1,91 @@
+"""Record raw stats replies to replay them offline.
+
+A capture file is a gzip stream of records. Each record has a header with
+the reception timestamp, the OpenFlow version and the lengths of the dpid
+and of the message, followed by the dpid and the packed message. Restarts
+append new gzip members to the same file.
+"""
+import gzip
+from struct import Struct
+from threading import Lock
+
+from kytos.core import log
+
+#: Timestamp, OpenFlow version, dpid length and message length.
+HEADER = Struct('!dBHI')
+
+
+def read_capture(path):
+    """Yield the ``(timestamp, dpid, of_version, data)`` records of a file.
+
+    Reading stops at a truncated record, e.g. if the controller was killed
+    while writing it.
+    """
+    with gzip.open(path, 'rb') as capture:
+        while True:
+            header = capture.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return
+            timestamp, of_version, dpid_length, length = \
+                HEADER.unpack(header)
+            dpid = capture.read(dpid_length)
+            data = capture.read(length)
+            if len(dpid) < dpid_length or len(data) < length:
+                log.warning('Truncated record at the end of %s.', path)
+                return
+            yield timestamp, dpid.decode(), of_version, data
+
+
+class CaptureWriter:
+    """Append stats reply messages to a capture file.
+
+    Recording stops once ``max_bytes`` bytes of messages are written, so a
+    forgotten capture cannot fill the disk.
+    """
+
+    def __init__(self, path, max_bytes=None):
+        """Open the capture file for appending.
+
+        Args:
+            path (str): Capture file.
+            max_bytes (int): Maximum bytes of messages. Unlimited if
+                ``None``.
+
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.written = 0
+        self._file = gzip.open(path, 'ab', compresslevel=1)
+        self._lock = Lock()
+
+    def record(self, dpid, message, timestamp):
+        """Write a message received from a switch."""
+        if self._file is None:
+            return
+        data = message.pack()
+        dpid = dpid.encode()
+        with self._lock:
+            if self._file is None:
+                return
+            if (self.max_bytes is not None
+                    and self.written + len(data) > self.max_bytes):
+                log.warning('Capture file %s is full. Recording stopped.',
+                            self.path)
+                self._close()
+                return
+            self._file.write(HEADER.pack(timestamp,
+                                         message.header.version.value,
+                                         len(dpid), len(data)))
+            self._file.write(dpid)
+            self._file.write(data)
+            self.written += len(data)
+
+    def close(self):
+        """Flush and close the capture file."""
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
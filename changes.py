@@ -0,0 +1,79 @@
+"""Skip samples whose values did not change since they were last saved."""
+from threading import Lock
+
+
+class ChangeFilter:
+    """Keep the last saved value of each namespace.
+
+    A sample is kept when its value differs from the last saved one or when
+    :attr:`heartbeat` seconds have passed since then, so idle series still
+    get a point from time to time. Only a hash of each value is stored.
+    """
+
+    def __init__(self, heartbeat, forget_after=3600):
+        """Set how often unchanged values are saved.
+
+        Args:
+            heartbeat (float): Seconds after which an unchanged value is
+                saved again. With 0, every sample is saved.
+            forget_after (float): Seconds after which namespaces that are no
+                longer seen are forgotten. At least twice the heartbeat.
+
+        """
+        self.heartbeat = heartbeat
+        self.forget_after = max(forget_after, 2 * heartbeat)
+        #: (namespace, value keys) -> (value hash, saved at)
+        self._saved = {}
+        self._last_sweep = None
+        self._lock = Lock()
+
+    def filter(self, samples, timestamp):
+        """Return the samples that should be saved and the change ratio.
+
+        Args:
+            samples (list): ``(namespace, value)`` tuples.
+            timestamp (float): When the samples were taken.
+
+        Returns:
+            tuple: The samples to be saved and the fraction of samples
+            already known whose value changed (``None`` if no sample was
+            known).
+
+        """
+        result = []
+        known = changed = 0
+        with self._lock:
+            saved = self._saved
+            for namespace, value in samples:
+                # In "record" mode, a flow has two samples with different
+                # keys in the same namespace.
+                key = (namespace, tuple(value))
+                value_hash = hash(tuple(value.values()))
+                last = saved.get(key)
+                if last is not None:
+                    known += 1
+                    if last[0] != value_hash:
+                        changed += 1
+                    elif timestamp - last[1] < self.heartbeat:
+                        continue
+                saved[key] = (value_hash, timestamp)
+                result.append((namespace, value))
+            self._sweep(timestamp)
+        return result, changed / known if known else None
+
+    def __len__(self):
+        return len(self._saved)
+
+    def _sweep(self, timestamp):
+        """Forget namespaces that are no longer seen.
+
+        Active namespaces are saved at least once per heartbeat.
+        """
+        if self._last_sweep is None:
+            self._last_sweep = timestamp
+        if timestamp - self._last_sweep < self.forget_after / 2:
+            return
+        self._last_sweep = timestamp
+        limit = timestamp - self.forget_after
+        self._saved = {key: last for key, last in self._saved.items()
+                       if last[1] >= limit}
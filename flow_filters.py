@@ -0,0 +1,58 @@
+"""Filters of flow stats requests."""
+
+
+class FlowFilter:
+    """Which flows are requested by a filtered flow stats request.
+
+    Filters are configured in ``settings.FLOW_STATS_FILTERS``. Fields that
+    are not set do not filter anything. OpenFlow 1.0 has no cookie in flow
+    stats requests, so cookies are filtered after the reply arrives.
+    """
+
+    FIELDS = ('table_id', 'cookie', 'cookie_mask', 'out_port', 'match')
+
+    def __init__(self, name, dpids=None, interval=None, table_id=None,
+                 cookie=0, cookie_mask=0, out_port=None, match=None):
+        """Create a filter.
+
+        Args:
+            name (str): Identifies the filter in logs and intervals.
+            dpids (list): Switches to poll. All switches if ``None``.
+            interval (float): Seconds between requests. Defaults to
+                ``settings.STATS_INTERVAL``.
+            table_id (int): Flow table. All tables if ``None``.
+            cookie (int): Cookie value, compared after applying the mask.
+            cookie_mask (int): Bits of the cookie to compare.
+            out_port (int): Output port. Any port if ``None``.
+            match (dict): Match fields, with the names used by of_core
+                (e.g. ``{'dl_vlan': 100}``).
+
+        """
+        if not name:
+            raise ValueError('Flow stats filters must have a name.')
+        self.name = name
+        self.dpids = set(dpids) if dpids is not None else None
+        self.interval = interval
+        self.table_id = table_id
+        self.cookie = cookie
+        self.cookie_mask = cookie_mask
+        self.out_port = out_port
+        self.match = match or {}
+
+    @classmethod
+    def from_dict(cls, config):
+        """Create a filter from a ``settings.FLOW_STATS_FILTERS`` item."""
+        unknown = set(config) - set(cls.FIELDS) - {'name', 'dpids',
+                                                   'interval'}
+        if unknown:
+            raise ValueError(f'Unknown flow stats filter fields: {unknown}')
+        config = dict(config)
+        return cls(config.pop('name', None), **config)
+
+    def applies_to(self, dpid):
+        """Return whether the switch should be polled with this filter."""
+        return self.dpids is None or dpid in self.dpids
+
+    def matches_cookie(self, cookie):
+        """Return whether a flow cookie passes the filter."""
+        return cookie & self.cookie_mask == self.cookie & self.cookie_mask
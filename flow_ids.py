@@ -0,0 +1,79 @@
+"""Cache flow ids to avoid building a Flow object for each stats entry."""
+from collections import OrderedDict
+from struct import Struct
+from threading import Lock
+
+_SCALARS = Struct('!BHHHHQ')
+
+
+def flow_key(flow_stat):
+    """Return the bytes that identify the flow of a flow stats entry.
+
+    It includes every field used by of_core to compute the flow id (and a
+    few more), but not the counters. Thus, entries with the same key belong
+    to the same flow.
+    """
+    flags = getattr(flow_stat, 'flags', None)  # OF 1.3 only
+    scalars = _SCALARS.pack(flow_stat.table_id.value,
+                            flow_stat.priority.value,
+                            flow_stat.idle_timeout.value,
+                            flow_stat.hard_timeout.value,
+                            flags.value if flags is not None else 0,
+                            flow_stat.cookie.value)
+    instructions = getattr(flow_stat, 'instructions', None)
+    if instructions is None:
+        instructions = flow_stat.actions
+    return scalars + flow_stat.match.pack() + instructions.pack()
+
+
+class FlowIdCache:
+    """Least recently used flow ids of each switch, keyed by flow_key."""
+
+    def __init__(self, max_size):
+        """Set the maximum number of flow ids per switch.
+
+        Args:
+            max_size (int): Flow ids kept for each switch.
+
+        """
+        self.max_size = max_size
+        #: dpid -> OrderedDict(flow key -> flow id)
+        self._ids = {}
+        self._lock = Lock()
+
+    def get(self, dpid, key):
+        """Return the flow id of ``key`` or ``None`` if it is not cached."""
+        ids = self._ids.get(dpid)
+        if ids is None:
+            return None
+        with self._lock:
+            flow_id = ids.get(key)
+            if flow_id is not None:
+                ids.move_to_end(key)
+        return flow_id
+
+    def set(self, dpid, key, flow_id):
+        """Cache a flow id, evicting the least recently used if needed."""
+        with self._lock:
+            ids = self._ids.setdefault(dpid, OrderedDict())
+            ids[key] = flow_id
+            if len(ids) > self.max_size:
+                ids.popitem(last=False)
+
+    def retain(self, dpid, keys):
+        """Keep only the given keys, e.g. the flows of a full table dump."""
+        with self._lock:
+            ids = self._ids.get(dpid)
+            if ids is not None:
+                self._ids[dpid] = OrderedDict(
+                    (key, flow_id) for key, flow_id in ids.items()
+                    if key in keys)
+
+    def forget(self, dpid):
+        """Remove all flow ids of a switch."""
+        with self._lock:
+            self._ids.pop(dpid, None)
+
+    def size(self, dpid):
+        """Return the number of cached flow ids of a switch."""
+        return len(self._ids.get(dpid, ()))
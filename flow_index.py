@@ -0,0 +1,43 @@
+"""Index the controller flows of each switch by flow id."""
+from threading import Lock
+
+
+class FlowIndex:
+    """Map flow ids to the flows in ``switch.flows``.
+
+    ``Switch.get_flow_by_id`` scans the flow list, which is quadratic when
+    done for every entry of a flow stats reply. The index of a switch is
+    rebuilt when its flow list is replaced or changes size, and is updated
+    by flow added/removed events in between.
+    """
+
+    def __init__(self):
+        """Start without indexes."""
+        #: dpid -> (indexed flow list, its length, {flow id: flow})
+        self._indexes = {}
+        self._lock = Lock()
+
+    def get(self, switch):
+        """Return a flow id to flow dictionary of the switch."""
+        flows = switch.flows
+        with self._lock:
+            cached = self._indexes.get(switch.id)
+            if (cached is not None and cached[0] is flows
+                    and cached[1] == len(flows)):
+                return cached[2]
+        index = {flow.id: flow for flow in flows}
+        with self._lock:
+            self._indexes[switch.id] = (flows, len(flows), index)
+        return index
+
+    def remove(self, dpid, flow_id):
+        """Remove a flow from the index of a switch."""
+        with self._lock:
+            cached = self._indexes.get(dpid)
+            if cached is not None:
+                cached[2].pop(flow_id, None)
+
+    def invalidate(self, dpid):
+        """Rebuild the index of a switch when it is used next time."""
+        with self._lock:
+            self._indexes.pop(dpid, None)
@@ -0,0 +1,215 @@
+"""Find the flows that count the most bytes in each switch."""
+import heapq
+from threading import Lock
+
+from napps.kytos.of_stats.rates import counter_delta
+
+
+class SpaceSaving:
+    """Weighted space-saving summary of the top ``k`` items of a stream.
+
+    At most ``k`` items are monitored. A new item replaces the one with the
+    smallest count and inherits its count as the maximum error, so counts
+    never underestimate. The minimum is found with a heap whose outdated
+    entries are skipped.
+    """
+
+    def __init__(self, k):
+        """Monitor up to ``k`` items."""
+        self.k = k
+        #: item -> [count, error]
+        self._items = {}
+        self._heap = []
+        self.total = 0
+
+    def add(self, item, weight):
+        """Count ``weight`` for ``item``."""
+        self.total += weight
+        counts = self._items.get(item)
+        if counts is None:
+            if len(self._items) < self.k:
+                counts = self._items[item] = [0, 0]
+            else:
+                minimum = self._pop_min()
+                counts = self._items[item] = [minimum, minimum]
+        counts[0] += weight
+        heapq.heappush(self._heap, (counts[0], item))
+        if len(self._heap) > 4 * self.k:
+            self._heap = [(item_counts[0], key)
+                          for key, item_counts in self._items.items()]
+            heapq.heapify(self._heap)
+
+    def top(self):
+        """Return ``(item, count, error)`` tuples, largest count first."""
+        return sorted(((item, count, error)
+                       for item, (count, error) in self._items.items()),
+                      key=lambda entry: entry[1], reverse=True)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def _pop_min(self):
+        while True:
+            count, item = heapq.heappop(self._heap)
+            counts = self._items.get(item)
+            if counts is not None and counts[0] == count:
+                del self._items[item]
+                return count
+
+
+class _SwitchHitters:
+    """Summary of the current window and previous counters of a switch."""
+
+    __slots__ = ('summary', 'window_start', 'byte_counts')
+
+    def __init__(self, k, now):
+        self.summary = SpaceSaving(k)
+        self.window_start = now
+        self.byte_counts = None
+
+
+class HeavyHitters:
+    """Top ``k`` flows by bytes counted in a time window, per switch.
+
+    Byte deltas between flow stats replies feed a :class:`SpaceSaving`
+    summary of each switch, restarted every ``window`` seconds. Only the
+    byte counters of the previous reply are kept besides the summary.
+    """
+
+    def __init__(self, k, window):
+        """Set the number of flows and the window length.
+
+        Args:
+            k (int): Number of flows in the top.
+            window (float): Seconds after which counts restart.
+
+        """
+        self.k = k
+        self.window = window
+        #: dpid -> _SwitchHitters
+        self._switches = {}
+        self._lock = Lock()
+
+    def update(self, dpid, byte_counts, now):
+        """Count the bytes of a flow stats reply.
+
+        Args:
+            dpid (str): Switch dpid.
+            byte_counts (dict): Byte counter of each flow id.
+            now (float): When the reply was received.
+
+        Returns:
+            set: Flow ids in the top of the switch, ``None`` for the first
+            reply, when no bytes were counted yet.
+
+        """
+        with self._lock:
+            hitters = self._switches.get(dpid)
+            if hitters is None or now - hitters.window_start >= self.window:
+                previous = hitters.byte_counts if hitters else None
+                hitters = self._switches[dpid] = _SwitchHitters(self.k, now)
+                hitters.byte_counts = previous
+            previous = hitters.byte_counts
+            hitters.byte_counts = byte_counts
+            if previous is None:
+                return None
+            summary = hitters.summary
+            for flow_id, byte_count in byte_counts.items():
+                old = previous.get(flow_id)
+                # New flows and counter resets count all their bytes
+                delta = (counter_delta(old, byte_count)
+                         if old is not None else None)
+                if delta is None:
+                    delta = byte_count
+                if delta:
+                    summary.add(flow_id, delta)
+            return {flow_id for flow_id, _, _ in hitters.summary.top()}
+
+    def top(self, dpid):
+        """Return the top flows of a switch in the current window.
+
+        Returns:
+            dict: ``window_start``, ``flows`` (``flow_id``, ``bytes`` and the
+            maximum overestimation ``error``) and ``other_bytes``, the bytes
+            of the other flows. ``None`` for unknown switches.
+
+        """
+        with self._lock:
+            hitters = self._switches.get(dpid)
+            if hitters is None:
+                return None
+            top = hitters.summary.top()
+            total = hitters.summary.total
+        flows = [{'flow_id': flow_id, 'bytes': count, 'error': error}
+                 for flow_id, count, error in top]
+        guaranteed = sum(count - error for _, count, error in top)
+        return {'window_start': hitters.window_start, 'flows': flows,
+                'other_bytes': max(0, total - guaranteed)}
+
+    def forget(self, dpid):
+        """Discard the counts of a switch."""
+        with self._lock:
+            self._switches.pop(dpid, None)
+
+
+class OtherFlows:
+    """Packet and byte rates of the flows that are not in the top.
+
+    Summing the counters of these flows would make the sum jump whenever a
+    flow enters or leaves the top, so the counters of all flows of the
+    previous reply are kept to compute what the other flows counted since
+    then.
+    """
+
+    def __init__(self):
+        """Start without previous counters."""
+        #: dpid -> (timestamp, {flow_id: (packet_count, byte_count)})
+        self._previous = {}
+        self._lock = Lock()
+
+    def update(self, dpid, flows, top, now):
+        """Return the rates of the flows of a reply that are not in ``top``.
+
+        Args:
+            dpid (str): Switch dpid.
+            flows (list): ``(flow_id, packet_count, byte_count)`` tuples.
+            top (set): Flow ids in the top. ``None`` if all flows are.
+            now (float): When the reply was received.
+
+        Returns:
+            dict: ``packets_per_sec`` and ``bytes_per_sec``, ``None`` for
+            the first reply of a switch.
+
+        """
+        counters = {flow_id: (packet_count, byte_count)
+                    for flow_id, packet_count, byte_count in flows}
+        with self._lock:
+            previous = self._previous.get(dpid)
+            self._previous[dpid] = (now, counters)
+        if previous is None or now <= previous[0]:
+            return None
+        old_time, old_counters = previous
+        packets = bytes_ = 0
+        for flow_id, (packet_count, byte_count) in counters.items():
+            if top is None or flow_id in top:
+                continue
+            old = old_counters.get(flow_id, (None, None))
+            packets += _increase(old[0], packet_count)
+            bytes_ += _increase(old[1], byte_count)
+        elapsed = now - old_time
+        return {'packets_per_sec': packets / elapsed,
+                'bytes_per_sec': bytes_ / elapsed}
+
+    def forget(self, dpid):
+        """Discard the previous counters of a switch."""
+        with self._lock:
+            self._previous.pop(dpid, None)
+
+
+def _increase(old, new):
+    """Return how much a counter increased since ``old``.
+
+    New flows and counter resets count their whole counter.
+    """
+    delta = counter_delta(old, new) if old is not None else None
+    return new if delta is None else delta
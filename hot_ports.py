@@ -0,0 +1,77 @@
+"""Poll a watch-list of ports more often than the other ones."""
+from os.path import dirname
+from pathlib import Path
+from threading import Lock
+
+from napps.kytos.of_stats.watched_file import WatchedFile
+
+
+class HotPorts:
+    """User-defined ports polled with single-port requests at their own rate.
+
+    ``hot_ports.json`` maps switch dpids to their watched ports and each
+    port to its interval in seconds. A ``null`` interval, or a list of ports
+    instead of a mapping, uses the ``default`` interval of the file or, if
+    missing, ``default_interval``. Call :meth:`refresh` periodically to load
+    changes.
+    """
+
+    _FILE = Path(dirname(__file__)) / 'hot_ports.json'
+
+    def __init__(self, default_interval=1, check_interval=5):
+        """Load user-created file.
+
+        Args:
+            default_interval (float): Seconds between polls of a port
+                without an interval in the file.
+            check_interval (float): Minimum seconds between checks for file
+                changes in :meth:`refresh`.
+
+        """
+        self.default_interval = default_interval
+        # Content: dpid -> {port_no: interval}
+        self._file = WatchedFile(self._FILE, self._build_table, 'hot ports',
+                                 check_interval)
+        #: (dpid, port_no) -> time of the next poll
+        self._next = {}
+        self._lock = Lock()
+
+    def refresh(self, now=None):
+        """Reload the file if it changed since it was last read."""
+        self._file.refresh(now)
+
+    def due(self, dpid, now):
+        """Return the watched ports of a switch that should be polled now.
+
+        A port that missed several polls is polled only once.
+        """
+        ports = self._file.content.get(dpid)
+        if not ports:
+            return []
+        result = []
+        with self._lock:
+            for port_no, interval in ports.items():
+                key = (dpid, port_no)
+                if now >= self._next.get(key, now):
+                    self._next[key] = now + interval
+                    result.append(port_no)
+        return result
+
+    def forget(self, dpid):
+        """Restart the polls of a switch when it reconnects."""
+        with self._lock:
+            for key in [key for key in self._next if key[0] == dpid]:
+                del self._next[key]
+
+    def _build_table(self, content):
+        """Convert ports to ``int`` and fill in the default intervals."""
+        default = content.get('default') or self.default_interval
+        table = {}
+        for dpid, ports in content.items():
+            if dpid == 'default':
+                continue
+            if isinstance(ports, list):
+                ports = dict.fromkeys(ports)
+            table[dpid] = {int(port): float(interval or default)
+                           for port, interval in ports.items()}
+        return table
@@ -0,0 +1,156 @@
+"""Track statistics requests that are waiting for a reply."""
+import time
+from threading import Lock
+
+from kytos.core import log
+
+
+class Latency:
+    """Round-trip time statistics of a switch and stats type."""
+
+    __slots__ = ('count', 'last', 'min', 'max', 'average', 'timeouts')
+
+    #: Weight of the newest sample in :attr:`average`.
+    ALPHA = 0.2
+
+    def __init__(self):
+        """Start without samples."""
+        self.count = 0
+        self.last = None
+        self.min = None
+        self.max = None
+        self.average = None
+        self.timeouts = 0
+
+    def add(self, rtt):
+        """Add a round-trip time sample, in seconds."""
+        self.count += 1
+        self.last = rtt
+        if self.count == 1:
+            self.min = self.max = self.average = rtt
+        else:
+            self.min = min(self.min, rtt)
+            self.max = max(self.max, rtt)
+            self.average += self.ALPHA * (rtt - self.average)
+
+    def as_dict(self):
+        """Return the statistics as a dictionary."""
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+
+class InFlightTracker:
+    """Keep, per switch and stats type, the request waiting for a reply.
+
+    A new request is not sent while there is an outstanding one, unless it
+    timed out. Replies are matched to requests by xid to measure the
+    round-trip time.
+    """
+
+    def __init__(self, timeout):
+        """Set the time to wait for a reply.
+
+        Args:
+            timeout (float): Seconds after which an unanswered request is
+                discarded.
+
+        """
+        self.timeout = timeout
+        #: (dpid, name) -> (xid, sent_at)
+        self._pending = {}
+        #: (dpid, xid) -> (name, stats)
+        self._names = {}
+        #: (dpid, name) -> Latency
+        self._latency = {}
+        # Requests are sent by the scheduler thread and replies are handled
+        # by event handler threads.
+        self._lock = Lock()
+
+    def can_request(self, dpid, name, now=None):
+        """Return whether a new request can be sent.
+
+        An outstanding request that is older than :attr:`timeout` is
+        discarded and counted as a timeout.
+        """
+        with self._lock:
+            pending = self._pending.get((dpid, name))
+            if pending is None:
+                return True
+            xid, sent_at = pending
+            if now is None:
+                now = time.time()
+            if now - sent_at < self.timeout:
+                log.debug('Skipping %s stats request for switch %s: xid %s'
+                          ' is still outstanding.', name, dpid, xid)
+                return False
+            log.warning('%s stats request %s for switch %s timed out.',
+                        name, xid, dpid)
+            self._discard(dpid, name, xid)
+            self._get_latency(dpid, name).timeouts += 1
+            return True
+
+    def sent(self, dpid, name, xid, now=None, stats=None):
+        """Register a request that was sent.
+
+        Args:
+            dpid (str): Switch dpid.
+            name (str): Name of the request, e.g. ``port`` or ``port.1``.
+            xid (int): Transaction id of the request.
+            now (float): When the request was sent.
+            stats (Stats): Handler of the reply, returned by
+                :meth:`received`.
+
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            self._pending[(dpid, name)] = (xid, now)
+            self._names[(dpid, xid)] = (name, stats)
+
+    def received(self, dpid, xid, now=None):
+        """Register the reply to a request.
+
+        Returns:
+            tuple: Name and stats handler of the request, or ``None`` if no
+            request with this xid is outstanding.
+
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            request = self._names.get((dpid, xid))
+            if request is None:
+                return None
+            name = request[0]
+            _, sent_at = self._pending[(dpid, name)]
+            self._discard(dpid, name, xid)
+            self._get_latency(dpid, name).add(now - sent_at)
+            return request
+
+    def is_outstanding(self, dpid, xid):
+        """Return whether ``xid`` was sent to ``dpid`` and is not answered."""
+        return (dpid, xid) in self._names
+
+    def forget(self, dpid):
+        """Discard outstanding requests of a switch."""
+        with self._lock:
+            for key in [key for key in self._pending if key[0] == dpid]:
+                xid, _ = self._pending[key]
+                self._discard(dpid, key[1], xid)
+
+    def latencies(self):
+        """Return round-trip time statistics by switch and stats type."""
+        result = {}
+        with self._lock:
+            for (dpid, name), latency in self._latency.items():
+                result.setdefault(dpid, {})[name] = latency.as_dict()
+        return result
+
+    def _get_latency(self, dpid, name):
+        latency = self._latency.get((dpid, name))
+        if latency is None:
+            latency = self._latency[(dpid, name)] = Latency()
+        return latency
+
+    def _discard(self, dpid, name, xid):
+        self._pending.pop((dpid, name), None)
+        self._names.pop((dpid, xid), None)
@@ -1,18 +1,41 @@
 """Statistics application."""
+import time
+from functools import partial
+
+from flask import Response, jsonify, request
 from pyof.v0x01.controller2switch.stats_request import StatsType
 
-from kytos.core import KytosNApp, log
+from kytos.core import KytosNApp, log, rest
 from kytos.core.helpers import listen_to
 from napps.kytos.of_stats import settings
-from napps.kytos.of_stats.stats import FlowStats, PortStats
+from napps.kytos.of_stats.adaptive import AdaptiveIntervals
+from napps.kytos.of_stats.capture import CaptureWriter
+from napps.kytos.of_stats.flow_filters import FlowFilter
+from napps.kytos.of_stats.heavy_hitters import HeavyHitters
+from napps.kytos.of_stats.hot_ports import HotPorts
+from napps.kytos.of_stats.inflight import InFlightTracker
+from napps.kytos.of_stats.metrics import Metrics
+from napps.kytos.of_stats.offload import FlowStatsOffloader
+from napps.kytos.of_stats.reassembly import REPLY_MORE, ReplyReassembler
+from napps.kytos.of_stats.rollups import Rollups
+from napps.kytos.of_stats.scheduler import PollScheduler
+from napps.kytos.of_stats.shards import HashRing, ShardWorkers
+from napps.kytos.of_stats.snapshot import StatsSnapshots
+from napps.kytos.of_stats.spool import SegmentLog, Spool
+from napps.kytos.of_stats.stats import (AggregateStats, FlowStats, PortStats,
+                                        Stats)
+from napps.kytos.of_stats.storage import KronosStorage
+from napps.kytos.of_stats.tiering import FlowDumpPolicy
+from napps.kytos.of_stats.timeseries import TimeSeriesStore
+from napps.kytos.of_stats.triggers import TriggeredPolls
 
 
 class Main(KytosNApp):
     """Main class for statistics application."""
 
     def setup(self):
-        """Initialize all statistics and set their loop interval."""
-        self.execute_as_loop(settings.STATS_INTERVAL)
+        """Initialize all statistics and the polling scheduler."""
+        self.execute_as_loop(settings.SCHEDULER_TICK)
 
         # Initialize statistics
         msg_out = self.controller.buffers.msg_out
@@ -20,23 +43,435 @@ class Main(KytosNApp):
         self._stats = {StatsType.OFPST_PORT.value: PortStats(msg_out,
                                                              app_buffer),
                        StatsType.OFPST_FLOW.value: FlowStats(msg_out,
-                                                             app_buffer)}
+                                                             app_buffer),
+                       StatsType.OFPST_AGGREGATE.value: AggregateStats(
+                           msg_out, app_buffer)}
+        self._stats_by_name = {stats.name: stats
+                               for stats in self._stats.values()}
+        polled = ['port', 'flow']
+        if (settings.TIERED_FLOW_STATS
+                or 'aggregate' in settings.STATS_INTERVALS):
+            polled.append('aggregate')
+        intervals = {name: settings.STATS_INTERVALS.get(
+                         name, settings.STATS_INTERVAL)
+                     for name in polled}
+        # Filtered flow stats are only requested by the scheduler. Their
+        # replies are found by xid and processed by their own FlowStats.
+        for config in settings.FLOW_STATS_FILTERS:
+            flow_filter = FlowFilter.from_dict(config)
+            stats = FlowStats(msg_out, app_buffer, flow_filter)
+            self._stats_by_name[stats.name] = stats
+            intervals[stats.name] = (flow_filter.interval
+                                     or settings.STATS_INTERVAL)
+        self._scheduler = PollScheduler(intervals, settings.STATS_JITTER)
+        self._adaptive = None
+        if settings.ADAPTIVE_INTERVALS:
+            self._adaptive = AdaptiveIntervals(
+                settings.ADAPTIVE_MIN_INTERVAL, settings.ADAPTIVE_MAX_INTERVAL,
+                settings.ADAPTIVE_MAX_LOAD,
+                settings.ADAPTIVE_MAX_ENTRIES_PER_SECOND)
+        self._flow_dumps = None
+        if settings.TIERED_FLOW_STATS:
+            self._flow_dumps = FlowDumpPolicy(settings.FLOW_DUMP_MIN_BYTES,
+                                              settings.FLOW_DUMP_MAX_INTERVAL)
+        self._inflight = InFlightTracker(settings.REQUEST_TIMEOUT)
+        self._reassembler = ReplyReassembler(settings.MULTIPART_MAX_PENDING,
+                                             settings.MULTIPART_MAX_ENTRIES,
+                                             settings.MULTIPART_TIMEOUT)
+        self._metrics = None
+        if settings.METRICS_ENABLED:
+            self._metrics = Metrics()
+            for stats in self._stats_by_name.values():
+                stats.enable_metrics(self._metrics)
+        self._series = None
+        if settings.RECENT_SAMPLES:
+            self._setup_series()
+        self._snapshots = None
+        if settings.STATS_SNAPSHOTS:
+            self._setup_snapshots()
+        self._heavy_hitters = None
+        if settings.FLOW_TOP_K:
+            # Filtered flows would be counted twice
+            self._heavy_hitters = HeavyHitters(settings.FLOW_TOP_K,
+                                               settings.FLOW_TOP_K_WINDOW)
+            flow_stats = self._stats_by_name['flow']
+            flow_stats.heavy_hitters = self._heavy_hitters
+            flow_stats.save_top_only = settings.FLOW_TOP_K_ONLY
+        self._rollups_expired_at = time.time()
+        if settings.ROLLUPS:
+            # Filtered flows have the same namespaces as unfiltered ones
+            for name in ('port', 'flow'):
+                self._stats_by_name[name].rollups = Rollups(settings.ROLLUPS)
+        self._hot_ports = HotPorts(settings.HOT_PORTS_INTERVAL,
+                                   settings.HOT_PORTS_CHECK_INTERVAL)
+        self._triggers = None
+        if settings.TRIGGERED_POLLS:
+            self._triggers = TriggeredPolls(settings.TRIGGER_DEBOUNCE,
+                                            settings.TRIGGER_MIN_INTERVAL,
+                                            settings.TRIGGER_MAX_PORTS)
+        self._spool = None
+        if settings.KRONOS_SPOOL:
+            self._setup_spool()
+        self._instances = None
+        if settings.SHARD_INSTANCES:
+            if settings.SHARD_INSTANCE not in settings.SHARD_INSTANCES:
+                raise ValueError(f'SHARD_INSTANCE {settings.SHARD_INSTANCE!r}'
+                                 ' is not in SHARD_INSTANCES.')
+            self._instances = HashRing(settings.SHARD_INSTANCES,
+                                       settings.SHARD_REPLICAS)
+        self._shard_workers = None
+        if settings.POLL_SHARDS > 1:
+            self._shard_workers = ShardWorkers(settings.POLL_SHARDS,
+                                               settings.SHARD_REPLICAS)
+        self._capture = None
+        if settings.CAPTURE_FILE:
+            self._capture = CaptureWriter(settings.CAPTURE_FILE,
+                                          settings.CAPTURE_MAX_BYTES)
+        self._offloader = None
+        if settings.FLOW_STATS_OFFLOAD:
+            self._offloader = FlowStatsOffloader(
+                settings.FLOW_STATS_OFFLOAD,
+                settings.FLOW_STATS_OFFLOAD_WORKERS,
+                settings.FLOW_STATS_OFFLOAD_MIN_ENTRIES)
+
+    def _setup_spool(self):
+        segment_log = SegmentLog(settings.SPOOL_DIR,
+                                 settings.SPOOL_SEGMENT_SIZE,
+                                 settings.SPOOL_MAX_SEGMENTS)
+        self._spool = Spool(segment_log, settings.KRONOS_SPOOL,
+                            settings.SPOOL_RETRY_INTERVAL)
+        for stats in self._stats_by_name.values():
+            stats.enable_spool(self._spool)
+        # Replayed samples are sent as they are. If kronos fails again,
+        # they go back to the spool.
+        # pylint: disable=protected-access
+        self._replay_storage = KronosStorage(
+            self.controller.buffers.app, Stats._save_event_callback,
+            queue_size=0)
+        self._replay_storage.spool = self._spool
+
+    def _setup_series(self):
+        try:
+            self._series = TimeSeriesStore(settings.RECENT_SAMPLES,
+                                           settings.RECENT_MAX_SERIES)
+        except RuntimeError as error:
+            log.error(f'Recent samples are not kept in memory: {error}')
+            return
+        for stats in self._stats_by_name.values():
+            if isinstance(stats, (PortStats, FlowStats)):
+                stats.series = self._series
+
+    def _setup_snapshots(self):
+        try:
+            self._snapshots = StatsSnapshots()
+        except RuntimeError as error:
+            log.error(f'Stats are kept in of_core objects: {error}')
+            return
+        for stats in self._stats_by_name.values():
+            if isinstance(stats, (PortStats, FlowStats)):
+                stats.snapshots = self._snapshots
 
     def execute(self):
-        """Query all switches sequentially and then sleep before repeating."""
-        switches = list(self.controller.switches.values())
+        """Query the switches whose poll slot has arrived."""
+        now = time.time()
+        self._stats_by_name['port'].user_speed.refresh(now)
+        self._hot_ports.refresh(now)
+        for stats in self._stats_by_name.values():
+            stats.flush()
+        if self._spool is not None:
+            self._replay_spool()
+        if (settings.ROLLUPS and now - self._rollups_expired_at
+                >= min(settings.ROLLUPS.values())):
+            self._rollups_expired_at = now
+            for stats in self._stats_by_name.values():
+                stats.expire_rollups(now)
+        switches = []
+        for switch in list(self.controller.switches.values()):
+            if self._owns(switch.id):
+                switches.append(switch)
+            elif self._scheduler.forget(switch.id):
+                # Another instance polls it now
+                self._forget_switch(switch.id)
+        if self._shard_workers is not None:
+            self._shard_workers.run(switches, self._poll, now)
+        else:
+            self._poll(switches, now)
+        if self._triggers is not None:
+            self._send_triggered(now)
+
+    def _poll(self, switches, now):
+        """Poll the due switches and forget the disconnected ones."""
         for switch in switches:
             if switch.is_connected():
-                self._update_stats(switch)
+                names = self._scheduler.due(switch.id, now)
+                self._update_stats(switch, names, now)
+                self._update_hot_ports(switch, now)
+            elif self._scheduler.forget(switch.id):
+                self._forget_switch(switch.id)
+
+    def _owns(self, dpid):
+        """Return whether this controller instance polls a switch."""
+        return (self._instances is None
+                or self._instances.node(dpid) == settings.SHARD_INSTANCE)
+
+    def _forget_switch(self, dpid):
+        self._hot_ports.forget(dpid)
+        for stats in self._stats_by_name.values():
+            stats.forget(dpid)
+        if self._triggers is not None:
+            self._triggers.forget(dpid)
+        self._inflight.forget(dpid)
+        if self._metrics is not None:
+            self._metrics.forget(dpid)
+        if self._series is not None:
+            self._series.forget(dpid)
+        if self._snapshots is not None:
+            self._snapshots.forget(dpid)
+        if self._heavy_hitters is not None:
+            self._heavy_hitters.forget(dpid)
+        if self._flow_dumps is not None:
+            self._flow_dumps.forget(dpid)
+        if self._offloader is not None:
+            self._offloader.forget(dpid)
 
     def shutdown(self):
         """End of the application."""
         log.debug('Shutting down...')
+        if self._shard_workers is not None:
+            self._shard_workers.shutdown()
+        if self._offloader is not None:
+            self._offloader.shutdown()
+        if self._spool is not None:
+            self._spool.log.close()
+        if self._capture is not None:
+            self._capture.close()
+
+    def _replay_spool(self):
+        """Send spooled samples to kronos, without filling the app buffer."""
+        self._spool.log.sync()
+        app_buffer = self.controller.buffers.app
+        for _ in range(settings.SPOOL_REPLAY_SEGMENTS):
+            if app_buffer.qsize() >= settings.KRONOS_MAX_BUFFERED_EVENTS:
+                break
+            records = self._spool.replay()
+            if not records:
+                break
+            log.debug('Replaying %d spooled stats records.', len(records))
+            for timestamp, samples in records:
+                self._replay_storage.send(samples, timestamp)
+
+    def _update_stats(self, switch, names, now):
+        for name in names:
+            if switch.connection is None:
+                break
+            stats = self._stats_by_name[name]
+            if not stats.applies_to(switch.id):
+                continue
+            if name != 'flow' or self._flow_dumps is None:
+                self._request(switch, stats, name, now)
+                continue
+            totals = self._stats_by_name['aggregate'].totals.get(switch.id)
+            if not self._flow_dumps.should_dump(switch.id, totals, now):
+                log.debug('Skipping flow dump of switch %s: no changes in'
+                          ' aggregate stats.', switch.id)
+            elif self._request(switch, stats, name, now):
+                # A dump skipped because of an unanswered request is retried
+                # on the next poll.
+                self._flow_dumps.dumped(switch.id, totals, now)
+
+    def _update_hot_ports(self, switch, now):
+        """Send single-port requests for the due ports of the watch-list."""
+        stats = self._stats_by_name['port']
+        for port_no in self._hot_ports.due(switch.id, now):
+            if switch.connection is None:
+                break
+            self._request(switch, stats, f'port.{port_no}', now,
+                          port_no=port_no)
+
+    def _send_triggered(self, now):
+        """Send the debounced polls triggered by events."""
+        for dpid, name, ports in self._triggers.due(now):
+            switch = self.controller.switches.get(dpid)
+            if (switch is None or not self._owns(dpid)
+                    or not switch.is_connected()
+                    or switch.connection is None):
+                continue
+            stats = self._stats_by_name[name]
+            if ports is None:
+                self._request(switch, stats, f'{name}.triggered', now)
+            for port_no in ports or []:
+                self._request(switch, stats, f'port.{port_no}', now,
+                              port_no=port_no)
+
+    def _request(self, switch, stats, name, now, **kwargs):
+        """Send a stats request unless the previous one is unanswered.
+
+        ``name`` identifies the request in the in-flight tracker. Requests
+        that are not the regular ones of ``stats`` have their own names
+        (e.g. ``port.1`` for a single port).
+
+        Returns:
+            bool: Whether the request was sent.
+
+        """
+        # pylint: disable=too-many-arguments
+        if self._inflight.can_request(switch.id, name, now):
+            conn = switch.connection
+            message = stats.get_request(conn.protocol.version, **kwargs)
+            # The reply may be handled as soon as the request is sent
+            self._inflight.sent(switch.id, name, message.header.xid, now,
+                                stats)
+            stats.send(message, conn)
+            if self._metrics is not None:
+                self._metrics.poll_started(switch.id, name, now)
+            return True
+        return False
+
+    def _adapt_interval(self, switch, stats, changed, entries, duration):
+        interval = self._scheduler.interval(switch.id, stats.name)
+        new_interval = self._adaptive.next_interval(interval, changed,
+                                                    entries, duration)
+        if new_interval != interval:
+            log.debug('%s stats interval of switch %s: %.1f s.', stats.name,
+                      switch.id, new_interval)
+            self._scheduler.set_switch_interval(switch.id, stats.name,
+                                                new_interval)
+
+    @rest('v1/latency')
+    def get_latency(self):
+        """Return the round-trip time of stats requests per switch."""
+        return jsonify(self._inflight.latencies())
+
+    @rest('v1/intervals')
+    def get_intervals(self):
+        """Return the current polling interval per switch and stats type."""
+        return jsonify(self._scheduler.switch_intervals())
 
-    def _update_stats(self, switch):
-        for stats in self._stats.values():
-            if switch.connection is not None:
-                stats.request(switch.connection)
+    @rest('v1/shards')
+    def get_shards(self):
+        """Return the switches polled by this instance, by worker shard."""
+        shards = {}
+        for dpid in list(self.controller.switches):
+            if not self._owns(dpid):
+                continue
+            shard = (self._shard_workers.ring.node(dpid)
+                     if self._shard_workers is not None else 0)
+            shards.setdefault(shard, []).append(dpid)
+        return jsonify({'instance': settings.SHARD_INSTANCE,
+                        'shards': shards})
+
+    @rest('v1/queues')
+    def get_queues(self):
+        """Return the samples waiting for kytos/kronos per stats type."""
+        return jsonify({name: stats.queue_counters()
+                        for name, stats in self._stats_by_name.items()})
+
+    @rest('v1/metrics')
+    def get_metrics(self):
+        """Return counters and histograms per switch and stats type."""
+        if self._metrics is None:
+            return jsonify({'error': 'Metrics are disabled.'}), 404
+        return jsonify(self._metrics.as_dict())
+
+    @rest('v1/metrics/prometheus')
+    def get_prometheus_metrics(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        if self._metrics is None:
+            return Response('Metrics are disabled.\n', status=404,
+                            mimetype='text/plain')
+        return Response(self._metrics.prometheus(),
+                        mimetype='text/plain; version=0.0.4')
+
+    @rest('v1/series/<dpid>/<kind>/<entry_id>')
+    def get_series(self, dpid, kind, entry_id):
+        """Return the recent samples of a port or flow kept in memory.
+
+        Query parameters: ``since`` (timestamp) returns only newer samples
+        and ``rates=true`` adds the rates per second of each counter.
+        """
+        if self._series is None:
+            return jsonify({'error': 'Recent samples are disabled.'}), 404
+        if kind not in ('port', 'flow'):
+            return jsonify({'error': f'Unknown kind: {kind}'}), 400
+        try:
+            if kind == 'port':
+                entry_id = int(entry_id)
+            since = request.args.get('since')
+            since = float(since) if since is not None else None
+        except ValueError as error:
+            return jsonify({'error': str(error)}), 400
+        rates = request.args.get('rates', '').lower() in ('1', 'true')
+        result = self._series.query(dpid, kind, entry_id, since, rates)
+        if result is None:
+            return jsonify({'error': 'No recent samples.'}), 404
+        return jsonify(result)
+
+    @rest('v1/snapshot/<dpid>')
+    def get_snapshot(self, dpid):
+        """Return the latest port and flow counters of a switch by column."""
+        if self._snapshots is None:
+            return jsonify({'error': 'Stats snapshots are disabled.'}), 404
+        tables = self._snapshots.tables(dpid)
+        if not tables:
+            return jsonify({'error': f'No stats of switch {dpid}.'}), 404
+        result = {}
+        for kind, table in tables.items():
+            keys, values = table.read()
+            rows = [row for row, key in enumerate(keys) if key is not None]
+            result[kind] = {'keys': [keys[row] for row in rows]}
+            for column, field in enumerate(table.fields):
+                result[kind][field] = values[rows, column].tolist()
+        return jsonify(result)
+
+    @rest('v1/top_flows/<dpid>')
+    def get_top_flows(self, dpid):
+        """Return the flows of a switch that counted the most bytes."""
+        if self._heavy_hitters is None:
+            return jsonify({'error': 'Top flows are disabled.'}), 404
+        top = self._heavy_hitters.top(dpid)
+        if top is None:
+            return jsonify({'error': f'No flow stats of switch {dpid}.'}), 404
+        return jsonify(top)
+
+    @listen_to('kytos/of_core.switch.interface.modified',
+               'kytos/of_core.switch.interface.link_up',
+               'kytos/of_core.switch.interface.link_down')
+    def on_interface_changed(self, event):
+        """Poll the port stats of an interface that changed."""
+        if self._triggers is None:
+            return
+        interface = event.content['interface']
+        self._triggers.trigger(interface.switch.id, 'port', time.time(),
+                               interface.port_number)
+
+    @listen_to(r'.*\.messages\.out\.ofpt_flow_mod')
+    def on_flow_mod(self, event):
+        """Poll the flow stats of a switch after flow mods.
+
+        Outgoing messages are named after the NApp that sends them, e.g.
+        ``kytos/flow_manager.messages.out.ofpt_flow_mod``.
+        """
+        if self._triggers is None:
+            return
+        switch = event.content['destination'].switch
+        self._triggers.trigger(switch.id, 'flow', time.time())
+
+    @listen_to('kytos/flow_manager.flow.added',
+               'kytos/flow_manager.flow.removed')
+    def on_flow_changed(self, event):
+        """Keep the flow index of the switch up to date."""
+        switch = event.content['datapath']
+        removed = event.name.endswith('.removed')
+        flow_id = event.content['flow'].id if removed else None
+        for stats in self._stats_by_name.values():
+            if not isinstance(stats, FlowStats):
+                continue
+            if removed:
+                stats.flow_index.remove(switch.id, flow_id)
+            else:
+                # The flow is only in switch.flows after of_core reads it
+                # back.
+                stats.flow_index.invalidate(switch.id)
 
     @listen_to('kytos/of_core.v0x01.messages.in.ofpt_stats_reply')
     def listen_v0x01(self, event):
@@ -58,12 +493,76 @@ class Main(KytosNApp):
         Note: v0x01 ``body_type`` and v0x04 ``multipart_type`` have the same
         values.  Besides, both ``msg.body`` have the fields/attributes we use.
         Thus, we can treat them the same way and reuse the code.
+
+        Only replies to outstanding requests of this NApp are processed.
+        Replies split in several messages are joined before being processed.
+        The v0x04 aggregate reply body is a single object instead of a list.
+        Large flow stats replies may be processed in the offload pool.
+        Replies are recorded as received if ``CAPTURE_FILE`` is set.
         """
         msg = event.content['message']
         if stats_type.value in self._stats:
-            stats = self._stats[stats_type.value]
-            stats_list = msg.body
-            stats.listen(event.source.switch, stats_list)
+            switch = event.source.switch
+            if self._capture is not None:
+                self._capture.record(switch.id, msg, time.time())
+            xid = msg.header.xid.value
+            if not self._inflight.is_outstanding(switch.id, xid):
+                self._drop_reply(switch, stats_type, xid)
+                return
+            more = bool(msg.flags.value & REPLY_MORE)
+            body = msg.body if isinstance(msg.body, list) else [msg.body]
+            stats_list = self._reassembler.add(switch.id, xid, body, more)
+            if stats_list is None:
+                return
+            # Filtered, single-port and triggered requests have their own
+            # names, and filtered flow stats their own handler.
+            request = self._inflight.received(switch.id, xid)
+            if request is None:
+                self._drop_reply(switch, stats_type, xid)
+                return
+            name, stats = request
+            if (self._offloader is not None
+                    and isinstance(stats, FlowStats)
+                    and self._offloader.should_offload(stats_list)):
+                self._offloader.submit(
+                    stats, switch, stats_list,
+                    partial(self._listened, switch, stats, name,
+                            len(stats_list)))
+                return
+            start = time.monotonic()
+            changed = stats.listen(switch, stats_list)
+            self._listened(switch, stats, name, len(stats_list), changed,
+                           time.monotonic() - start)
         else:
             log.debug('No listener for %s = %s in %s.', stats_type.name,
                       stats_type.value, list(self._stats.keys()))
+
+    @staticmethod
+    def _drop_reply(switch, stats_type, xid):
+        """Ignore a reply that does not answer an outstanding request.
+
+        Late replies to timed out requests and replies to requests of other
+        NApps, which may be filtered, would make the stats forget the flows
+        missing from them.
+        """
+        log.debug('Ignoring %s reply %s of switch %s: no request is'
+                  ' outstanding.', stats_type.name, xid, switch.id)
+
+    def _listened(self, switch, stats, name, entries, changed, duration):
+        """Adapt the interval and count metrics after processing a reply.
+
+        Only replies to the regular requests of ``stats`` adapt its
+        interval. Metrics are counted by request name.
+        """
+        # pylint: disable=too-many-arguments
+        if self._adaptive is not None and name == stats.name:
+            self._adapt_interval(switch, stats, changed, entries, duration)
+        if self._metrics is not None:
+            self._count_reply(switch, name, entries, duration)
+
+    def _count_reply(self, switch, name, entries, duration):
+        metrics = self._metrics
+        metrics.count(switch.id, name, 'replies_received')
+        metrics.count(switch.id, name, 'entries_processed', entries)
+        metrics.observe(switch.id, name, 'processing_seconds', duration)
+        metrics.poll_finished(switch.id, name, time.time())
@@ -0,0 +1,162 @@
+"""Counters and histograms of the work done by the NApp."""
+from bisect import bisect_left
+from threading import Lock
+
+#: Upper bounds, in seconds, of the histogram buckets.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1, 2.5, 5, 10, 30, 60)
+
+#: Counter names and descriptions.
+COUNTERS = {
+    'requests_sent': 'Stats requests sent.',
+    'replies_received': 'Stats replies received, after joining the'
+                        ' messages of split replies.',
+    'entries_processed': 'Ports or flows in stats replies.',
+    'events_emitted': 'Events sent to kytos/kronos.',
+}
+
+#: Histogram names and descriptions.
+HISTOGRAMS = {
+    'processing_seconds': 'Time spent processing a stats reply.',
+    'poll_cycle_seconds': 'Time from sending a stats request to the end of'
+                          ' the reply processing.',
+}
+
+
+class Histogram:
+    """Count observations in cumulative buckets, like Prometheus does."""
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self):
+        """Start without observations."""
+        # The last bucket is +Inf
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        """Add an observation."""
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Return (upper bound, observations up to the bound) pairs."""
+        total = 0
+        result = []
+        for bound, count in zip(BUCKETS + (float('inf'),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def as_dict(self):
+        """Return the histogram as a dictionary."""
+        return {'count': self.count, 'sum': self.sum,
+                'buckets': {str(bound): count
+                            for bound, count in self.cumulative()}}
+
+
+class Metrics:
+    """Counters and histograms by switch and stats type.
+
+    Metrics are only collected when ``settings.METRICS_ENABLED`` is set.
+    Otherwise, Main does not create this object and skips all measurements.
+    """
+
+    def __init__(self):
+        """Start without samples."""
+        #: (dpid, name, counter) -> int
+        self._counters = {}
+        #: (dpid, name, histogram) -> Histogram
+        self._histograms = {}
+        #: (dpid, name) -> time the last request was sent
+        self._polls = {}
+        # Requests are sent by the scheduler thread and replies are handled
+        # by event handler threads.
+        self._lock = Lock()
+
+    def count(self, dpid, name, counter, amount=1):
+        """Increase a counter."""
+        key = (dpid, name, counter)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, dpid, name, histogram, value):
+        """Add an observation to a histogram."""
+        key = (dpid, name, histogram)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram()
+            hist.observe(value)
+
+    def poll_started(self, dpid, name, now):
+        """Register a stats request, starting a poll cycle."""
+        with self._lock:
+            self._polls[(dpid, name)] = now
+        self.count(dpid, name, 'requests_sent')
+
+    def poll_finished(self, dpid, name, now):
+        """Register the end of the processing of a stats reply."""
+        with self._lock:
+            started = self._polls.pop((dpid, name), None)
+        if started is not None:
+            self.observe(dpid, name, 'poll_cycle_seconds', now - started)
+
+    def forget(self, dpid):
+        """Discard the poll cycles of a switch that disconnected."""
+        with self._lock:
+            for key in [key for key in self._polls if key[0] == dpid]:
+                del self._polls[key]
+
+    def as_dict(self):
+        """Return all metrics by switch and stats type."""
+        result = {}
+        with self._lock:
+            for (dpid, name, counter), value in self._counters.items():
+                result.setdefault(dpid, {}).setdefault(name, {})[counter] = \
+                    value
+            for (dpid, name, histogram), hist in self._histograms.items():
+                result.setdefault(dpid, {}).setdefault(name, {})[histogram] = \
+                    hist.as_dict()
+        return result
+
+    def prometheus(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, hist.cumulative(), hist.sum, hist.count)
+                                for key, hist in self._histograms.items())
+        for counter, description in COUNTERS.items():
+            metric = f'kytos_of_stats_{counter}_total'
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} counter')
+            for (dpid, name, key), value in counters:
+                if key == counter:
+                    lines.append(f'{metric}{_labels(dpid, name)} {value}')
+        for histogram, description in HISTOGRAMS.items():
+            metric = f'kytos_of_stats_{histogram}'
+            lines.append(f'# HELP {metric} {description}')
+            lines.append(f'# TYPE {metric} histogram')
+            for (dpid, name, key), buckets, total, count in histograms:
+                if key != histogram:
+                    continue
+                for bound, value in buckets:
+                    labels = _labels(dpid, name, le=_format_bound(bound))
+                    lines.append(f'{metric}_bucket{labels} {value}')
+                labels = _labels(dpid, name)
+                lines.append(f'{metric}_sum{labels} {total}')
+                lines.append(f'{metric}_count{labels} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(dpid, name, **extra):
+    labels = dict(dpid=dpid, stats_type=name, **extra)
+    return '{' + ','.join(f'{label}="{value}"'
+                          for label, value in labels.items()) + '}'
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
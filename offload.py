@@ -0,0 +1,120 @@
+"""Process large flow stats replies outside the event handler threads."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from threading import Lock
+
+from kytos.core import log
+
+MODES = ('thread',)
+
+
+class FlowStatsOffloader:
+    """Run ``FlowStats.listen`` of large replies in a thread pool.
+
+    The event handler thread returns right after submitting the reply.
+    Entries are only available unpacked, so sending them to worker
+    processes would require packing them again, which costs more than
+    processing them in a thread.
+
+    Replies of the same switch and stats name are applied one at a time and
+    never out of order: a reply that finishes decoding after a newer one was
+    applied is discarded, so stats never go back in time.
+    """
+
+    def __init__(self, mode, workers, min_entries):
+        """Create the pool.
+
+        Args:
+            mode (str): ``thread``.
+            workers (int): Number of threads.
+            min_entries (int): Smaller replies are processed by the event
+                handler.
+
+        """
+        if mode not in MODES:
+            raise ValueError(f'Invalid flow stats offload mode: {mode}')
+        self.mode = mode
+        self.min_entries = min_entries
+        self._threads = ThreadPoolExecutor(workers,
+                                           thread_name_prefix='of_stats')
+        #: Replies submitted and not processed yet
+        self._pending = set()
+        self._sequence = count(1)
+        #: (dpid, name) -> (Lock, sequence of the last applied reply)
+        self._applied = {}
+        self._lock = Lock()
+
+    def should_offload(self, entries):
+        """Return whether a reply is large enough to be offloaded."""
+        return len(entries) >= self.min_entries
+
+    def submit(self, stats, switch, entries, done=None):
+        """Process a reply in the pool.
+
+        Args:
+            stats (FlowStats): Processes the reply.
+            switch: Switch that sent the reply.
+            entries (list): Flow stats entries.
+            done: Called with the value returned by ``stats.listen`` and the
+                processing time after the reply is applied.
+
+        """
+        key = (switch.id, stats.name)
+        sequence = next(self._sequence)
+        future = self._threads.submit(self._run, key, sequence, stats,
+                                      switch, entries, done)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._finished)
+        return future
+
+    def shutdown(self, wait=False):
+        """Stop the pool.
+
+        Args:
+            wait (bool): Process the pending replies first. Otherwise, they
+                are discarded.
+
+        """
+        if not wait:
+            with self._lock:
+                pending = list(self._pending)
+            for future in pending:
+                future.cancel()
+        self._threads.shutdown(wait=wait)
+
+    def forget(self, dpid):
+        """Discard the order of the replies of a switch."""
+        with self._lock:
+            for key in [key for key in self._applied if key[0] == dpid]:
+                del self._applied[key]
+
+    def _run(self, key, sequence, stats, switch, entries, done):
+        # pylint: disable=too-many-arguments
+        lock = self._get_lock(key)
+        with lock:
+            # The switch may have been forgotten meanwhile
+            if sequence < self._applied.get(key, (lock, 0))[1]:
+                log.debug('Discarding %s stats reply of switch %s: a newer'
+                          ' one was already processed.', key[1], key[0])
+                return
+            self._applied[key] = (lock, sequence)
+            start = time.monotonic()
+            changed = stats.listen(switch, entries)
+            duration = time.monotonic() - start
+        if done is not None:
+            done(changed, duration)
+
+    def _get_lock(self, key):
+        with self._lock:
+            if key not in self._applied:
+                self._applied[key] = (Lock(), 0)
+            return self._applied[key][0]
+
+    def _finished(self, future):
+        with self._lock:
+            self._pending.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            log.error('Error processing flow stats reply: %s',
+                      future.exception())
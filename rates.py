@@ -0,0 +1,126 @@
+"""Compute port rates and utilization from cumulative counters."""
+from array import array
+from threading import Lock
+
+#: Port counters used to compute rates, in storage order.
+COUNTERS = ('rx_bytes', 'tx_bytes', 'rx_dropped', 'tx_dropped', 'rx_errors',
+            'tx_errors')
+
+#: Names of the computed rates, in the same order as :data:`COUNTERS`.
+RATES = tuple(f'{counter}_per_sec' for counter in COUNTERS)
+
+
+def counter_delta(old, new):
+    """Return how much a counter increased, or ``None`` after a reset.
+
+    A counter smaller than before either wrapped around or was reset by the
+    switch. Some switches use 32-bit counters, so the wrap size is guessed
+    from the previous value. It is considered a wrap only if the previous
+    value was in the upper half of the counter range.
+    """
+    if new >= old:
+        return new - old
+    size = 2**32 if old < 2**32 else 2**64
+    if old >= size // 2:
+        return size - old + new
+    return None
+
+
+class PortRates:
+    """Keep the previous counters of each port to compute rates.
+
+    Counters are stored in flat arrays, one slot per (dpid, port_no), to
+    keep memory low on switches with many ports.
+    """
+
+    def __init__(self, user_speed):
+        """Set where user-defined speeds come from.
+
+        Args:
+            user_speed (UserSpeed): Speeds that override OpenFlow ones.
+
+        """
+        self._user_speed = user_speed
+        #: dpid -> {port_no: slot}
+        self._slots = {}
+        self._free = []
+        self._counters = array('Q')
+        self._times = array('d')
+        self._lock = Lock()
+
+    def update(self, dpid, port_no, counters, timestamp, interface=None):
+        """Store new counters and return rates since the previous sample.
+
+        Args:
+            dpid (str): Switch dpid.
+            port_no (int): Port number.
+            counters (tuple): Values in the order of :data:`COUNTERS`.
+            timestamp (float): When the counters were received.
+            interface (Interface): Controller interface of the port. Its
+                custom speed, set by other NApps, overrides user-defined
+                speeds, which override the speed reported by the switch.
+
+        Returns:
+            dict: Rates per second and, if the speed is known, rx and tx
+            utilization (0 to 1). Empty for the first sample of a port or
+            after a counter reset.
+
+        """
+        with self._lock:
+            slot, previous = self._get_slot(dpid, port_no)
+            start = slot * len(COUNTERS)
+            old_counters = self._counters[start:start + len(COUNTERS)]
+            old_time = self._times[slot]
+            self._counters[start:start + len(COUNTERS)] = array('Q', counters)
+            self._times[slot] = timestamp
+
+        elapsed = timestamp - old_time
+        if not previous or elapsed <= 0:
+            return {}
+        rates = {}
+        for name, old, new in zip(RATES, old_counters, counters):
+            delta = counter_delta(old, new)
+            if delta is None:
+                return {}
+            rates[name] = delta / elapsed
+
+        speed = self._get_speed(dpid, port_no, interface)
+        if speed:
+            rates['rx_utilization'] = rates['rx_bytes_per_sec'] / speed
+            rates['tx_utilization'] = rates['tx_bytes_per_sec'] / speed
+        return rates
+
+    def _get_speed(self, dpid, port_no, interface):
+        """Return the speed of a port in bytes/sec, ``None`` if unknown.
+
+        ``Interface.speed`` is not used because it logs a warning on every
+        call when the speed is unknown.
+        """
+        speed = (interface.get_custom_speed()
+                 if interface is not None else None)
+        if not speed:
+            speed = self._user_speed.get_speed(dpid, port_no)
+        if not speed and interface is not None:
+            speed = interface.get_of_features_speed()
+        return speed
+
+    def forget(self, dpid):
+        """Free the slots of a switch."""
+        with self._lock:
+            ports = self._slots.pop(dpid, {})
+            self._free.extend(ports.values())
+
+    def _get_slot(self, dpid, port_no):
+        """Return the slot of a port and whether it was already there."""
+        ports = self._slots.setdefault(dpid, {})
+        slot = ports.get(port_no)
+        if slot is not None:
+            return slot, True
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._times)
+            self._counters.extend([0] * len(COUNTERS))
+            self._times.append(0)
+        ports[port_no] = slot
+        return slot, False
@@ -0,0 +1,125 @@
+"""Join stats replies split in several messages."""
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from kytos.core import log
+
+#: OFPSF_REPLY_MORE (OF 1.0) and OFPMPF_REPLY_MORE (OF 1.3) have this value.
+REPLY_MORE = 1 << 0
+
+
+class _PartialReply:
+    """Bodies received so far for a request."""
+
+    __slots__ = ('entries', 'updated_at')
+
+    def __init__(self, now):
+        self.entries = []
+        self.updated_at = now
+
+
+class ReplyReassembler:
+    """Buffer stats reply fragments until the last one arrives.
+
+    Fragments are keyed by (dpid, xid). Memory is bounded by the number of
+    partial replies (the least recently updated are evicted first) and by
+    the number of entries of each reply. Partial replies without updates for
+    :attr:`timeout` seconds are discarded.
+
+    Only fully reassembled bodies are returned. Replies that were completed
+    or discarded are remembered, so their remaining fragments (e.g. handled
+    out of order, or after the first ones timed out) are dropped instead of
+    being taken as a whole reply.
+    """
+
+    #: Number of finished replies remembered to drop their late fragments.
+    FINISHED_SIZE = 1024
+
+    def __init__(self, max_pending, max_entries, timeout):
+        """Set memory bounds.
+
+        Args:
+            max_pending (int): Maximum number of partial replies.
+            max_entries (int): Maximum number of entries of a reply.
+            timeout (float): Seconds to wait for the next fragment.
+
+        """
+        self.max_pending = max_pending
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._partial = OrderedDict()
+        self._finished = OrderedDict()
+        self._lock = Lock()
+
+    def add(self, dpid, xid, body, more, now=None):
+        """Add a reply fragment.
+
+        Args:
+            dpid (str): Switch dpid.
+            xid (int): Transaction id of the reply.
+            body: Reply body.
+            more (bool): Whether the REPLY_MORE flag is set.
+            now (float): Current time.
+
+        Returns:
+            The full body when the reply is complete, ``None`` otherwise or
+            if fragments of the reply were lost.
+
+        """
+        if now is None:
+            now = time.time()
+        key = (dpid, xid)
+        with self._lock:
+            self._evict_stale(now)
+            partial = self._partial.get(key)
+            if partial is None:
+                if key in self._finished:
+                    log.debug('Dropping late fragment of reply %s from'
+                              ' switch %s.', xid, dpid)
+                    return None
+                if not more:
+                    return body
+                partial = self._start(key, now)
+            self._partial.move_to_end(key)
+            partial.entries.extend(body)
+            partial.updated_at = now
+            if len(partial.entries) > self.max_entries:
+                log.error('Reply %s from switch %s exceeds %d entries and was'
+                          ' discarded.', xid, dpid, self.max_entries)
+                del self._partial[key]
+                self._finish(key)
+                return None
+            if more:
+                return None
+            del self._partial[key]
+            self._finish(key)
+            return partial.entries
+
+    def pending(self):
+        """Return the number of partial replies."""
+        return len(self._partial)
+
+    def _start(self, key, now):
+        if len(self._partial) >= self.max_pending:
+            old_key, _ = self._partial.popitem(last=False)
+            log.warning('Too many partial stats replies. Discarding reply %s'
+                        ' from switch %s.', old_key[1], old_key[0])
+            self._finish(old_key)
+        partial = self._partial[key] = _PartialReply(now)
+        return partial
+
+    def _finish(self, key):
+        self._finished[key] = None
+        if len(self._finished) > self.FINISHED_SIZE:
+            self._finished.popitem(last=False)
+
+    def _evict_stale(self, now):
+        while self._partial:
+            key, partial = next(iter(self._partial.items()))
+            if now - partial.updated_at < self.timeout:
+                break
+            del self._partial[key]
+            self._finish(key)
+            log.warning('Timed out waiting for the rest of reply %s from'
+                        ' switch %s.', key[1], key[0])
@@ -0,0 +1,177 @@
+"""Aggregate rates in fixed time windows before they are saved."""
+from threading import Lock
+
+from napps.kytos.of_stats.rates import counter_delta
+
+
+class _Window:
+    """Min, max, sum and last value of each field in a time window."""
+
+    __slots__ = ('start', 'count', 'mins', 'maxs', 'sums', 'lasts')
+
+    def __init__(self, start, values):
+        self.start = start
+        self.count = 1
+        self.mins = list(values)
+        self.maxs = list(values)
+        self.sums = list(values)
+        self.lasts = list(values)
+
+    def add(self, values):
+        self.count += 1
+        for index, value in enumerate(values):
+            if value < self.mins[index]:
+                self.mins[index] = value
+            if value > self.maxs[index]:
+                self.maxs[index] = value
+            self.sums[index] += value
+        self.lasts = list(values)
+
+    def as_dict(self, fields):
+        result = {'start': self.start, 'samples': self.count}
+        for index, field in enumerate(fields):
+            result[f'{field}_min'] = self.mins[index]
+            result[f'{field}_max'] = self.maxs[index]
+            result[f'{field}_avg'] = self.sums[index] / self.count
+            result[f'{field}_last'] = self.lasts[index]
+        return result
+
+
+class _Series:
+    """Open windows of a namespace and its previous counters."""
+
+    __slots__ = ('fields', 'windows', 'counters', 'counters_time',
+                 'updated_at')
+
+    def __init__(self, tiers):
+        self.fields = None
+        self.windows = [None] * tiers
+        self.counters = None
+        self.counters_time = None
+        self.updated_at = None
+
+
+class Rollups:
+    """Streaming min/max/avg/last of rates per namespace and time window.
+
+    Each tier (e.g. ``{'1m': 60, '1h': 3600}``) has one open window per
+    namespace, aligned to the clock. When a sample arrives after the end of
+    a window, the window is closed and returned as a sample of the
+    ``<namespace>.rollup_<tier>`` namespace. Only the open windows are kept,
+    so memory per namespace is bounded by the number of tiers and fields.
+    """
+
+    def __init__(self, tiers):
+        """Set the window lengths.
+
+        Args:
+            tiers (dict): Tier name -> window length in seconds.
+
+        """
+        self.tiers = sorted(tiers.items(), key=lambda tier: tier[1])
+        #: namespace -> _Series
+        self._series = {}
+        self._lock = Lock()
+
+    def add(self, namespace, rates, timestamp):
+        """Add rates to the open windows of a namespace.
+
+        Args:
+            namespace (str): Namespace of the sample.
+            rates (dict): Rate of each field.
+            timestamp (float): When the rates were computed.
+
+        Returns:
+            list: ``(namespace, value)`` samples of the closed windows.
+
+        """
+        if not rates:
+            return []
+        with self._lock:
+            series = self._get_series(namespace)
+            return self._add(namespace, series, rates, timestamp)
+
+    def add_counters(self, namespace, counters, timestamp):
+        """Compute rates from cumulative counters and add them.
+
+        The first sample of a namespace and samples after a counter reset
+        only update the previous counters.
+        """
+        with self._lock:
+            series = self._get_series(namespace)
+            old, old_time = series.counters, series.counters_time
+            series.counters, series.counters_time = counters, timestamp
+            series.updated_at = timestamp
+            if old is None or timestamp <= old_time:
+                return []
+            rates = {}
+            for field, value in counters.items():
+                delta = counter_delta(old.get(field, value), value)
+                if delta is None:
+                    return []
+                rates[f'{field}_per_sec'] = delta / (timestamp - old_time)
+            return self._add(namespace, series, rates, timestamp)
+
+    def expire(self, now):
+        """Close the windows that ended without new samples.
+
+        Namespaces without samples for two of the longest windows are
+        forgotten.
+
+        Returns:
+            list: ``(namespace, value)`` samples of the closed windows.
+
+        """
+        samples = []
+        longest = self.tiers[-1][1]
+        with self._lock:
+            for namespace, series in list(self._series.items()):
+                for index, (tier, seconds) in enumerate(self.tiers):
+                    window = series.windows[index]
+                    if window is not None and now >= window.start + seconds:
+                        samples.append(self._close(namespace, tier, series,
+                                                   window))
+                        series.windows[index] = None
+                if now - series.updated_at >= 2 * longest:
+                    del self._series[namespace]
+        return samples
+
+    def _get_series(self, namespace):
+        series = self._series.get(namespace)
+        if series is None:
+            series = self._series[namespace] = _Series(len(self.tiers))
+        return series
+
+    def _add(self, namespace, series, rates, timestamp):
+        samples = []
+        fields = tuple(rates)
+        if fields != series.fields:
+            # E.g., utilization is only known after the port speed is.
+            samples.extend(self._close_all(namespace, series))
+            series.fields = fields
+        values = tuple(rates.values())
+        series.updated_at = timestamp
+        for index, (tier, seconds) in enumerate(self.tiers):
+            window = series.windows[index]
+            if window is not None and timestamp >= window.start + seconds:
+                samples.append(self._close(namespace, tier, series, window))
+                window = None
+            if window is None:
+                start = timestamp - timestamp % seconds
+                series.windows[index] = _Window(start, values)
+            else:
+                window.add(values)
+        return samples
+
+    def _close_all(self, namespace, series):
+        samples = []
+        for index, (tier, _) in enumerate(self.tiers):
+            window = series.windows[index]
+            if window is not None:
+                samples.append(self._close(namespace, tier, series, window))
+                series.windows[index] = None
+        return samples
+
+    @staticmethod
+    def _close(namespace, tier, series, window):
+        return f'{namespace}.rollup_{tier}', window.as_dict(series.fields)
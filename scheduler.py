@@ -0,0 +1,111 @@
+"""Spread statistics requests over time instead of polling in bursts."""
+import random
+import time
+from zlib import crc32
+
+
+class PollScheduler:
+    """Decide when each switch should be polled for each stats type.
+
+    Every (dpid, stats type) pair has a stable phase offset inside its
+    interval, derived from the dpid. Thus, polls of different switches are
+    spread evenly across the interval and a given switch is always polled at
+    the same point of the cycle. An optional jitter (a fraction of the
+    interval) randomizes each poll around its slot without drifting.
+
+    The interval of a stats type can also be changed for a single switch.
+    """
+
+    def __init__(self, intervals, jitter=0.0):
+        """Set the interval of each stats type.
+
+        Args:
+            intervals (dict): Stats type name to interval in seconds.
+            jitter (float): Maximum random deviation from the slot, as a
+                fraction of the interval (0 disables it).
+
+        """
+        self.intervals = dict(intervals)
+        self.jitter = jitter
+        #: dpid -> {name: (slot, due time)}
+        self._next = {}
+        #: dpid -> {name: interval}
+        self._overrides = {}
+
+    @staticmethod
+    def phase(dpid, interval):
+        """Return the stable offset of ``dpid`` inside ``interval``."""
+        return crc32(str(dpid).encode()) / 2**32 * interval
+
+    def due(self, dpid, now=None):
+        """Return the stats type names that should be polled now.
+
+        Returned polls are rescheduled for the next slot.
+        """
+        if now is None:
+            now = time.time()
+        names = []
+        polls = self._next.setdefault(dpid, {})
+        overrides = self._overrides.get(dpid, {})
+        for name, interval in self.intervals.items():
+            interval = overrides.get(name, interval)
+            if name not in polls:
+                self._schedule(polls, name,
+                               self._first_slot(dpid, interval, now),
+                               interval)
+            slot, due_time = polls[name]
+            if now >= due_time:
+                names.append(name)
+                next_slot = slot + interval
+                if next_slot <= now:
+                    # We are late (e.g. controller was busy): skip slots
+                    # instead of sending several requests at once.
+                    next_slot += (now - next_slot) // interval * interval
+                    next_slot += interval
+                self._schedule(polls, name, next_slot, interval)
+        return names
+
+    def interval(self, dpid, name):
+        """Return the current interval of a switch and stats type."""
+        overrides = self._overrides.get(dpid, {})
+        return overrides.get(name, self.intervals[name])
+
+    def set_switch_interval(self, dpid, name, interval):
+        """Change the interval of a stats type for a single switch.
+
+        The next poll is moved to one new interval after the last one.
+        """
+        old_interval = self.interval(dpid, name)
+        self._overrides.setdefault(dpid, {})[name] = interval
+        polls = self._next.get(dpid, {})
+        if name in polls:
+            last_slot = polls[name][0] - old_interval
+            self._schedule(polls, name, last_slot + interval, interval)
+
+    def switch_intervals(self):
+        """Return the current intervals of each scheduled switch."""
+        return {dpid: {name: self.interval(dpid, name)
+                       for name in self.intervals}
+                for dpid in list(self._next)}
+
+    def forget(self, dpid):
+        """Remove all scheduled polls of a switch.
+
+        Returns:
+            bool: Whether the switch was scheduled.
+
+        """
+        self._overrides.pop(dpid, None)
+        return self._next.pop(dpid, None) is not None
+
+    def _first_slot(self, dpid, interval, now):
+        slot = now - now % interval + self.phase(dpid, interval)
+        if slot < now:
+            slot += interval
+        return slot
+
+    def _schedule(self, polls, name, slot, interval):
+        due_time = slot
+        if self.jitter:
+            due_time += random.uniform(-self.jitter, self.jitter) * interval
+        polls[name] = (slot, due_time)
@@ -2,3 +2,217 @@
 
 #: Seconds to wait before asking for more statistics.
 STATS_INTERVAL = 60
+
+#: Intervals (seconds) for specific stats types, overriding STATS_INTERVAL.
+#: Keys are "port", "flow" and "aggregate". Example: {'port': 10, 'flow': 60}.
+#: Aggregate stats are only polled if they have an interval here or if
+#: TIERED_FLOW_STATS is enabled.
+STATS_INTERVALS = {}
+
+#: Poll aggregate stats (total packets, bytes and flows) and only request all
+#: flows when they changed or every FLOW_DUMP_MAX_INTERVAL seconds. Set the
+#: "flow" interval in STATS_INTERVALS as the shortest time between dumps.
+TIERED_FLOW_STATS = False
+
+#: Additional flow stats requests, each one with its own filter and interval.
+#: Only "name" is required. "dpids" limits the switches that are polled and
+#: "match" uses the same field names as of_core flows. Example:
+#: [{'name': 'mef_eline', 'dpids': ['00:00:00:00:00:00:00:01'],
+#:   'interval': 10, 'table_id': 0, 'cookie': 0xaa << 56,
+#:   'cookie_mask': 0xff << 56, 'out_port': 1, 'match': {'dl_vlan': 100}}]
+FLOW_STATS_FILTERS = []
+
+#: Bytes counted by a switch since its last flow dump that trigger a new one.
+FLOW_DUMP_MIN_BYTES = 1
+
+#: Maximum seconds between flow dumps when TIERED_FLOW_STATS is enabled.
+FLOW_DUMP_MAX_INTERVAL = 600
+
+#: Random deviation of each poll from its slot, as a fraction of the interval.
+#: Polls of different switches are already spread across the interval; use 0
+#: to disable the jitter.
+STATS_JITTER = 0.05
+
+#: Seconds between checks for switches that should be polled.
+SCHEDULER_TICK = 1
+
+#: Number of worker threads that poll the switches. Switches are assigned to
+#: workers by consistent hashing of their dpids. With 1, switches are polled
+#: by the NApp loop thread.
+POLL_SHARDS = 1
+
+#: Names of the controller instances that share the switches. Each switch is
+#: polled only by the instance its dpid hashes to. Empty to poll all switches.
+SHARD_INSTANCES = []
+
+#: Name of this controller instance in SHARD_INSTANCES.
+SHARD_INSTANCE = None
+
+#: Points of each worker or instance on the consistent hashing ring. More
+#: points spread switches more evenly.
+SHARD_REPLICAS = 64
+
+#: Adapt the interval of each switch, within the limits below, to how fast
+#: its counters change and how expensive its replies are. The current
+#: intervals are available at the "v1/intervals" endpoint.
+ADAPTIVE_INTERVALS = False
+
+#: Shortest and longest adaptive intervals, in seconds.
+ADAPTIVE_MIN_INTERVAL = 10
+ADAPTIVE_MAX_INTERVAL = 300
+
+#: Maximum fraction of time spent processing the replies of a switch for a
+#: stats type. E.g., a 0.5-second reply is not requested more often than
+#: every 50 seconds with 0.01.
+ADAPTIVE_MAX_LOAD = 0.01
+
+#: Maximum number of entries (ports or flows) per second requested from a
+#: switch for a stats type.
+ADAPTIVE_MAX_ENTRIES_PER_SECOND = 1000
+
+#: Seconds to wait for a stats reply. While a request is outstanding, the
+#: switch is not polled again for the same stats type.
+REQUEST_TIMEOUT = 30
+
+#: How statistics are sent to kytos/kronos. "record" sends one
+#: "kytos.kronos.save" event per port and two per flow, as every kronos
+#: release expects. "batch" puts a single "kytos.kronos.save_batch" event per
+#: stats reply with all samples and a merged packet/byte record per flow.
+#: Only use it with a kronos version that handles batches; released ones
+#: ignore these events and the samples are lost.
+KRONOS_SAVE_MODE = 'record'
+
+#: Maximum number of samples in a single batch event.
+KRONOS_BATCH_SIZE = 5000
+
+#: Maximum number of samples of each stats type waiting for room in the app
+#: buffer when kytos/kronos falls behind. A newer sample replaces the unsent
+#: one of the same port or flow. Use 0 to put events in the app buffer right
+#: away, without bounds. Counters are available at the "v1/queues" endpoint.
+KRONOS_QUEUE_SIZE = 0
+
+#: Which sample is dropped when the queue is full: "drop_oldest" or
+#: "drop_newest".
+KRONOS_QUEUE_POLICY = 'drop_oldest'
+
+#: Queued samples are only sent while the app buffer has fewer events.
+KRONOS_MAX_BUFFERED_EVENTS = 1000
+
+#: Write samples to a local disk spool when kytos/kronos fails and replay
+#: them once it works again ("fallback"), or spool every sample before it is
+#: sent to kronos ("always"). None disables the spool.
+KRONOS_SPOOL = None
+
+#: Directory of the spool segment files.
+SPOOL_DIR = '/var/tmp/kytos/of_stats/spool'
+
+#: Bytes of each spool segment and maximum number of segments. The oldest
+#: segments are discarded when the spool is full.
+SPOOL_SEGMENT_SIZE = 16 * 2**20
+SPOOL_MAX_SEGMENTS = 64
+
+#: Seconds to wait before sending samples to kytos/kronos again after a
+#: failure. Meanwhile, new samples go to the spool and, in "always" mode,
+#: the spool is not replayed.
+SPOOL_RETRY_INTERVAL = 30
+
+#: Maximum number of spool segments replayed per scheduler tick.
+SPOOL_REPLAY_SEGMENTS = 1
+
+#: Samples whose values did not change (idle flows, down ports) are only
+#: saved again after this many seconds. Use 0 to save every sample.
+SAVE_HEARTBEAT = 300
+
+#: Maximum number of stats replies split in several messages (OpenFlow
+#: REPLY_MORE flag) being joined at the same time.
+MULTIPART_MAX_PENDING = 256
+
+#: Maximum number of entries (ports or flows) of a joined stats reply.
+MULTIPART_MAX_ENTRIES = 500000
+
+#: Seconds to wait for the next part of a stats reply.
+MULTIPART_TIMEOUT = 30
+
+#: Maximum number of cached flow ids per switch. Flow ids are computed by
+#: building a Flow object, which is only done for flows not in the cache.
+FLOW_ID_CACHE_SIZE = 200000
+
+#: Seconds between checks for changes in user_speed.json.
+USER_SPEED_CHECK_INTERVAL = 5
+
+#: Seconds between polls of the ports in hot_ports.json without their own
+#: interval. Intervals shorter than SCHEDULER_TICK are not honored.
+HOT_PORTS_INTERVAL = 1
+
+#: Seconds between checks for changes in hot_ports.json.
+HOT_PORTS_CHECK_INTERVAL = 5
+
+#: Collect counters and histograms of requests, replies, processed entries,
+#: kronos events and processing times per switch and stats type. They are
+#: available at the "v1/metrics" endpoint and, in the Prometheus text format,
+#: at "v1/metrics/prometheus".
+METRICS_ENABLED = False
+
+#: Number of recent samples kept in memory for each port and flow, served
+#: with their rates at the "v1/series" endpoint. Requires NumPy. Each sample
+#: takes 56 bytes for ports and 24 bytes for flows. Use 0 to disable.
+RECENT_SAMPLES = 0
+
+#: Maximum number of ports and flows with recent samples in memory.
+RECENT_MAX_SERIES = 10000
+
+#: Keep the latest port and flow counters of each switch in NumPy arrays.
+#: Interface and flow ``stats`` become views of these arrays instead of
+#: of_core objects replaced at every reply. Requires NumPy.
+STATS_SNAPSHOTS = False
+
+#: Process flow stats replies with at least FLOW_STATS_OFFLOAD_MIN_ENTRIES
+#: flows in a pool, so that event handlers are not blocked. "thread" uses a
+#: thread pool. None processes every reply in the event handler.
+FLOW_STATS_OFFLOAD = None
+
+#: Minimum number of flows of an offloaded flow stats reply.
+FLOW_STATS_OFFLOAD_MIN_ENTRIES = 10000
+
+#: Number of threads of the offload pool.
+FLOW_STATS_OFFLOAD_WORKERS = 2
+
+#: Number of flows of each switch, by bytes counted in FLOW_TOP_K_WINDOW,
+#: kept by a streaming heavy-hitter summary and served at the
+#: "v1/top_flows/<dpid>" endpoint. Use 0 to disable.
+FLOW_TOP_K = 0
+
+#: Seconds after which the top flows of a switch are counted again.
+FLOW_TOP_K_WINDOW = 300
+
+#: Only save the top flows of each switch in kytos/kronos, and their rollups,
+#: with the packets and bytes per second of the other flows in the
+#: "kytos.kronos.<dpid>.flow_id.other" namespace. Requires FLOW_TOP_K.
+FLOW_TOP_K_ONLY = False
+
+#: Rollup tiers: name -> seconds. For each tier, the min, max, average and
+#: last rates of each port and flow are saved in the
+#: "<namespace>.rollup_<name>" namespace when the window ends. Example:
+#: {'1m': 60, '5m': 300, '1h': 3600}. Empty to disable.
+ROLLUPS = {}
+
+#: Poll a switch right after of_core interface events (only the ports that
+#: changed) and after flow mods sent to it, besides the regular polls.
+TRIGGERED_POLLS = False
+
+#: Seconds to wait for more events before a triggered poll.
+TRIGGER_DEBOUNCE = 1
+
+#: Minimum seconds between triggered polls of a switch and stats type.
+TRIGGER_MIN_INTERVAL = 10
+
+#: Maximum number of single-port requests of a triggered poll. With more
+#: ports, all ports are requested.
+TRIGGER_MAX_PORTS = 4
+
+#: Record the stats replies received from switches in this file, to replay
+#: them with ``python -m benchmarks.replay``. Disabled if ``None``.
+CAPTURE_FILE = None
+
+#: Maximum bytes of recorded messages. Recording stops when it is reached.
+CAPTURE_MAX_BYTES = 2**30
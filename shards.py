@@ -0,0 +1,96 @@
+"""Partition switches among polling workers and controller instances."""
+from bisect import bisect
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import md5
+
+from kytos.core import log
+
+
+class HashRing:
+    """Consistent hashing of dpids to nodes.
+
+    Each node has ``replicas`` points on a ring of 64-bit hashes, and a dpid
+    belongs to the node of the first point after the dpid hash. Adding or
+    removing a node only moves the dpids between its points and the
+    previous ones, about ``1 / len(nodes)`` of them.
+    """
+
+    def __init__(self, nodes, replicas=64):
+        """Place the nodes on the ring.
+
+        Args:
+            nodes (iterable): Node names. They are converted to ``str`` to
+                be hashed, but returned as given.
+            replicas (int): Points of each node on the ring.
+
+        """
+        self.nodes = list(nodes)
+        if not self.nodes:
+            raise ValueError('A hash ring needs at least one node.')
+        points = sorted((self._hash(f'{node}#{replica}'), node)
+                        for node in self.nodes
+                        for replica in range(replicas))
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node(self, dpid):
+        """Return the node that owns a dpid."""
+        index = bisect(self._hashes, self._hash(dpid))
+        return self._nodes[index % len(self._nodes)]
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(md5(str(key).encode()).digest()[:8], 'big')
+
+
+class ShardWorkers:
+    """Poll each shard of switches in its own thread.
+
+    Switches are assigned to ``count`` shards by a :class:`HashRing`. A
+    shard is polled by a single thread, so the polls of a switch never run
+    concurrently. While a shard is still busy with a previous cycle, new
+    cycles of that shard are skipped instead of piling up.
+    """
+
+    def __init__(self, count, replicas=64):
+        """Start one worker thread per shard."""
+        self.ring = HashRing(range(count), replicas)
+        self._executors = [
+            ThreadPoolExecutor(1, thread_name_prefix=f'of_stats_shard{shard}')
+            for shard in range(count)]
+        self._running = [None] * count
+
+    def run(self, switches, function, *args):
+        """Call ``function(shard_switches, *args)`` in each shard worker.
+
+        Returns:
+            list: Shards skipped because they were still busy.
+
+        """
+        shards = {}
+        for switch in switches:
+            shards.setdefault(self.ring.node(switch.id), []).append(switch)
+        skipped = []
+        for shard, shard_switches in shards.items():
+            running = self._running[shard]
+            if running is not None and not running.done():
+                skipped.append(shard)
+                continue
+            self._running[shard] = self._executors[shard].submit(
+                self._call, shard, function, shard_switches, *args)
+        if skipped:
+            log.warning('Polling shards %s are busy. Skipping this cycle.',
+                        skipped)
+        return skipped
+
+    def shutdown(self, wait=True):
+        """Stop the worker threads."""
+        for executor in self._executors:
+            executor.shutdown(wait=wait)
+
+    @staticmethod
+    def _call(shard, function, switches, *args):
+        try:
+            function(switches, *args)
+        except Exception:  # pylint: disable=broad-except
+            log.exception('Error polling shard %d.', shard)
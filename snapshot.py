@@ -0,0 +1,229 @@
+"""Keep the latest port and flow counters of each switch in arrays."""
+from threading import Lock
+
+from napps.kytos.of_stats.rates import COUNTERS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+#: Fields of port stats entries, as in of_core PortStats.
+PORT_FIELDS = ('rx_packets', 'tx_packets') + COUNTERS + (
+    'rx_frame_err', 'rx_over_err', 'rx_crc_err', 'collisions',
+    'duration_sec', 'duration_nsec')
+
+#: Fields of flow stats entries, as in of_core FlowStats.
+FLOW_FIELDS = ('packet_count', 'byte_count', 'duration_sec', 'duration_nsec')
+
+
+class CounterView:
+    """Counters of a port or flow, read from its table.
+
+    Views replace the of_core stats objects of interfaces and flows. They
+    only hold the table and the key, so they never show the counters of
+    another entry, and fields are ``None`` once the entry is removed.
+    """
+
+    __slots__ = ('table', 'key')
+
+    #: Counter names, in the order of the table columns.
+    fields = ()
+
+    def __init__(self, table, key):
+        """Point to the row of ``key`` in ``table``."""
+        self.table = table
+        self.key = key
+
+    def update(self, of_stats):
+        """Write the counters of a pyof stats entry to the table."""
+        self.table.update([self.key], [of_stats])
+
+    def as_dict(self):
+        """Return the counters by name."""
+        return {field: getattr(self, field) for field in self.fields}
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.key!r}, {self.as_dict()})'
+
+
+def _view_class(name, fields, doc):
+    """Return a :class:`CounterView` with a property per field."""
+    attributes = {'__slots__': (), 'fields': fields, '__doc__': doc}
+    for index, field in enumerate(fields):
+        attributes[field] = property(
+            lambda view, index=index: view.table.get(view.key, index))
+    return type(name, (CounterView,), attributes)
+
+
+PortStatsView = _view_class('PortStatsView', PORT_FIELDS,
+                            'Counters of a port.')
+FlowStatsView = _view_class('FlowStatsView', FLOW_FIELDS,
+                            'Counters of a flow.')
+
+
+class CounterTable:
+    """Latest counters of the ports or flows of a switch.
+
+    Each key (port number or flow id) has a row of a 2-D ``uint64`` array.
+    Rows of removed keys are reused, and the array doubles when full.
+    Fields missing from the entries, e.g. OpenFlow 1.0 port durations, are
+    read as ``None``.
+    """
+
+    def __init__(self, view_class, capacity=16):
+        """Allocate the array.
+
+        Args:
+            view_class (type): :class:`CounterView` subclass of the rows.
+            capacity (int): Initial number of rows.
+
+        """
+        self.view_class = view_class
+        self.fields = view_class.fields
+        self._columns = {field: index for index, field in
+                         enumerate(self.fields)}
+        self._values = numpy.zeros((capacity, len(self.fields)),
+                                   dtype=numpy.uint64)
+        #: row -> key, ``None`` for free rows
+        self._keys = []
+        #: key -> row
+        self._rows = {}
+        self._free = []
+        self._present = frozenset()
+        self._lock = Lock()
+
+    def update(self, keys, entries):
+        """Write the counters of pyof stats entries.
+
+        Args:
+            keys (list): Port number or flow id of each entry.
+            entries (list): Port or flow stats entries of a reply.
+
+        """
+        if not entries:
+            return
+        fields = [field for field in self.fields
+                  if hasattr(entries[0], field)]
+        values = numpy.array([[getattr(entry, field).value
+                               for field in fields] for entry in entries],
+                             dtype=numpy.uint64)
+        columns = [self._columns[field] for field in fields]
+        with self._lock:
+            rows = [self._get_row(key) for key in keys]
+            if len(columns) == len(self.fields):
+                self._values[rows] = values
+            else:
+                self._values[numpy.ix_(rows, columns)] = values
+            self._present = frozenset(columns)
+
+    def get(self, key, column):
+        """Return a counter, ``None`` if unknown."""
+        row = self._rows.get(key)
+        if row is None or column not in self._present:
+            return None
+        return int(self._values[row, column])
+
+    def view(self, key):
+        """Return the counters of a key as an object."""
+        return self.view_class(self, key)
+
+    def retain(self, keys):
+        """Free the rows of the keys that are not in ``keys``."""
+        with self._lock:
+            for key in [key for key in self._rows if key not in keys]:
+                row = self._rows.pop(key)
+                self._keys[row] = None
+                self._values[row] = 0
+                self._free.append(row)
+
+    def read(self):
+        """Return all counters without copying them.
+
+        Returns:
+            tuple: The key of each row (``None`` for free rows) and a view of
+            the array, with a column per field. The array is updated in
+            place by the next replies; copy it for a consistent snapshot.
+
+        """
+        with self._lock:
+            return list(self._keys), self._values[:len(self._keys)]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _get_row(self, key):
+        row = self._rows.get(key)
+        if row is not None:
+            return row
+        if self._free:
+            row = self._free.pop()
+            self._keys[row] = key
+        else:
+            row = len(self._keys)
+            if row == len(self._values):
+                values = numpy.zeros((2 * row, len(self.fields)),
+                                     dtype=numpy.uint64)
+                values[:row] = self._values
+                self._values = values
+            self._keys.append(key)
+        self._rows[key] = row
+        return row
+
+
+class StatsSnapshots:
+    """Port and flow counter tables of each switch."""
+
+    def __init__(self):
+        """Start without switches.
+
+        Raises:
+            RuntimeError: NumPy is not installed.
+
+        """
+        if numpy is None:
+            raise RuntimeError('NumPy is required to keep stats snapshots.')
+        #: (dpid, kind) -> CounterTable
+        self._tables = {}
+        self._lock = Lock()
+
+    def ports(self, dpid):
+        """Return the port counters of a switch."""
+        return self._get_table(dpid, 'port', PortStatsView)
+
+    def flows(self, dpid):
+        """Return the flow counters of a switch."""
+        return self._get_table(dpid, 'flow', FlowStatsView)
+
+    def tables(self, dpid):
+        """Return the known ``port`` and ``flow`` tables of a switch."""
+        with self._lock:
+            return {kind: table for (table_dpid, kind), table
+                    in self._tables.items() if table_dpid == dpid}
+
+    def read(self, dpid):
+        """Return all counters of a switch, as in :meth:`CounterTable.read`.
+
+        Returns:
+            dict: ``port`` and ``flow`` (keys, array) tuples of the known
+            tables.
+
+        """
+        return {kind: table.read()
+                for kind, table in self.tables(dpid).items()}
+
+    def forget(self, dpid):
+        """Discard the tables of a switch."""
+        with self._lock:
+            for key in [key for key in self._tables if key[0] == dpid]:
+                del self._tables[key]
+
+    def _get_table(self, dpid, kind, view_class):
+        table = self._tables.get((dpid, kind))
+        if table is None:
+            with self._lock:
+                table = self._tables.get((dpid, kind))
+                if table is None:
+                    table = self._tables[(dpid, kind)] = \
+                        CounterTable(view_class)
+        return table
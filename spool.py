@@ -0,0 +1,282 @@
+r"""Keep samples on local disk while kytos/kronos is unavailable.
+
+Samples are appended to memory-mapped segment files. Each record has a
+header with the payload length, its CRC32 and the samples timestamp, and a
+zlib-compressed JSON payload with the ``(namespace, value)`` samples. A zero
+length marks the end of a segment.
+
+Segments can be exported as JSON lines from the command line::
+
+    python3 -m napps.kytos.of_stats.spool list /var/tmp/of_stats_spool
+    python3 -m napps.kytos.of_stats.spool export /var/tmp/of_stats_spool \
+        -o samples.jsonl
+"""
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+import zlib
+from pathlib import Path
+from struct import Struct
+from threading import Lock
+
+from kytos.core import log
+
+#: Payload length, payload CRC32 and timestamp.
+HEADER = Struct('!IId')
+
+SUFFIX = '.spool'
+
+
+def read_segment(path):
+    """Yield the ``(timestamp, samples)`` records of a segment file.
+
+    Reading stops at the end of the written records or at a corrupted one.
+    """
+    data = Path(path).read_bytes()
+    offset = 0
+    while offset + HEADER.size <= len(data):
+        length, crc, timestamp = HEADER.unpack_from(data, offset)
+        start = offset + HEADER.size
+        payload = data[start:start + length]
+        if not length or len(payload) < length:
+            return
+        if zlib.crc32(payload) != crc:
+            log.warning('Corrupted record in spool segment %s at offset %d.',
+                        path, offset)
+            return
+        samples = json.loads(zlib.decompress(payload))
+        yield timestamp, [tuple(sample) for sample in samples]
+        offset = start + length
+
+
+class SegmentLog:
+    """Append-only log of samples in rotated, memory-mapped segments.
+
+    The active segment is preallocated with ``segment_size`` bytes and
+    mapped in memory. When a record does not fit, the segment is sealed
+    (flushed and truncated to its records) and a new one is created. At
+    most ``max_segments`` segments are kept; the oldest ones are deleted.
+    """
+
+    def __init__(self, directory, segment_size, max_segments):
+        """Open the log directory, keeping the segments already there.
+
+        Args:
+            directory (str): Where segment files are written.
+            segment_size (int): Bytes of each segment.
+            max_segments (int): Maximum number of segments on disk.
+
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        #: Sealed segments, oldest first.
+        self._sealed = sorted(self.directory.glob(f'*{SUFFIX}'))
+        self._next_index = (int(self._sealed[-1].stem) + 1
+                            if self._sealed else 0)
+        self._file = None
+        self._map = None
+        self._path = None
+        self._offset = 0
+        self._lock = Lock()
+
+    def append(self, timestamp, samples):
+        """Write a record with the samples."""
+        payload = zlib.compress(json.dumps(samples).encode(), 1)
+        record = HEADER.pack(len(payload), zlib.crc32(payload), timestamp) \
+            + payload
+        with self._lock:
+            if (self._map is not None
+                    and self._offset + len(record) > len(self._map)):
+                self._seal()
+            if self._map is None:
+                self._open(max(self.segment_size, len(record)))
+            self._map[self._offset:self._offset + len(record)] = record
+            self._offset += len(record)
+
+    def sync(self):
+        """Flush the active segment to disk."""
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+
+    def seal(self):
+        """Seal the active segment, if it has records."""
+        with self._lock:
+            if self._map is not None and self._offset:
+                self._seal()
+
+    def pop_segment(self):
+        """Remove the oldest sealed segment and return its records.
+
+        Returns:
+            list: ``(timestamp, samples)`` records, ``None`` if there is no
+            sealed segment.
+
+        """
+        with self._lock:
+            if not self._sealed:
+                return None
+            path = self._sealed.pop(0)
+        records = list(read_segment(path))
+        path.unlink()
+        return records
+
+    def segments(self):
+        """Return the number of sealed segments."""
+        return len(self._sealed)
+
+    def close(self):
+        """Seal the active segment."""
+        self.seal()
+
+    def _open(self, size):
+        self._path = self.directory / f'{self._next_index:012d}{SUFFIX}'
+        self._next_index += 1
+        self._file = open(self._path, 'w+b')  # pylint: disable=R1732
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._offset = 0
+
+    def _seal(self):
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(self._offset)
+        self._file.close()
+        self._sealed.append(self._path)
+        self._map = self._file = self._path = None
+        while len(self._sealed) > self.max_segments:
+            oldest = self._sealed.pop(0)
+            log.warning('Spool is full. Discarding segment %s.', oldest)
+            oldest.unlink()
+
+
+class Spool:
+    """Send samples to the disk log while kytos/kronos fails.
+
+    In ``fallback`` mode, samples of failed kronos events are written to the
+    log. New samples also go to the log for ``retry_interval`` seconds after
+    a failure; then kronos is tried again. Once a save succeeds, the log is
+    replayed. In ``always`` mode, every sample is written to the log first
+    and the log is replayed continuously, except for ``retry_interval``
+    seconds after a failure.
+    """
+
+    MODES = ('fallback', 'always')
+
+    def __init__(self, segment_log, mode='fallback', retry_interval=30):
+        """Set when the log is used.
+
+        Args:
+            segment_log (SegmentLog): Where samples are written.
+            mode (str): ``fallback`` or ``always``.
+            retry_interval (float): Seconds to wait before trying kronos
+                again after a failure.
+
+        """
+        if mode not in self.MODES:
+            raise ValueError(f'Invalid spool mode: {mode}')
+        self.log = segment_log
+        self.mode = mode
+        self.retry_interval = retry_interval
+        self._failed_at = None
+
+    def active(self, now=None):
+        """Return whether new samples should be written to the log."""
+        if self.mode == 'always':
+            return True
+        failed_at = self._failed_at
+        if failed_at is None:
+            return False
+        if now is None:
+            now = time.time()
+        return now - failed_at < self.retry_interval
+
+    def append(self, timestamp, samples):
+        """Write samples to the log."""
+        self.log.append(timestamp, samples)
+
+    def saved(self, event, error, now=None):
+        """Handle the result of a kronos save event.
+
+        The samples of failed events are written to the log.
+        """
+        if not error:
+            self._failed_at = None
+            return
+        self._failed_at = time.time() if now is None else now
+        content = event.content
+        if 'samples' in content:
+            samples = [(sample['namespace'], sample['value'])
+                       for sample in content['samples']]
+        else:
+            samples = [(content['namespace'], content['value'])]
+        self.append(content.get('timestamp', self._failed_at), samples)
+
+    def replay(self, now=None):
+        """Return the records of the oldest segment if kronos is available.
+
+        After a failure, ``fallback`` mode waits for a new sample to be
+        saved. In ``always`` mode, new samples never reach kronos, so a
+        segment is replayed again after ``retry_interval`` seconds.
+
+        Returns:
+            list: ``(timestamp, samples)`` records, empty if there is
+            nothing to replay.
+
+        """
+        failed_at = self._failed_at
+        if failed_at is not None:
+            if self.mode == 'fallback':
+                return []
+            if now is None:
+                now = time.time()
+            if now - failed_at < self.retry_interval:
+                return []
+        if not self.log.segments():
+            self.log.seal()
+        return self.log.pop_segment() or []
+
+
+def main(args=None):
+    """List or export spool segments."""
+    parser = argparse.ArgumentParser(description='of_stats spool segments')
+    parser.add_argument('command', choices=['list', 'export'])
+    parser.add_argument('directory', type=Path)
+    parser.add_argument('-o', '--output', type=Path,
+                        help='JSON lines file. Defaults to stdout.')
+    parser.add_argument('--delete', action='store_true',
+                        help='Delete segments after exporting them.')
+    args = parser.parse_args(args)
+
+    paths = sorted(args.directory.glob(f'*{SUFFIX}'))
+    if args.command == 'list':
+        for path in paths:
+            records = list(read_segment(path))
+            samples = sum(len(samples) for _, samples in records)
+            print(f'{path.name} {os.path.getsize(path)} bytes,'
+                  f' {len(records)} records, {samples} samples')
+        return 0
+
+    output = args.output.open('w') if args.output else sys.stdout
+    try:
+        for path in paths:
+            for timestamp, samples in read_segment(path):
+                for namespace, value in samples:
+                    output.write(json.dumps({'timestamp': timestamp,
+                                             'namespace': namespace,
+                                             'value': value}) + '\n')
+            if args.delete:
+                path.unlink()
+    finally:
+        if args.output:
+            output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
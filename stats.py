@@ -1,4 +1,5 @@
 """Module with Classes to handle statistics."""
+import logging
 import time
 from abc import ABCMeta, abstractmethod
 
@@ -14,12 +15,25 @@ from pyof.v0x04.controller2switch.multipart_request import MultipartRequest
 from kytos.core import KytosEvent, log
 # v0x01 and v0x04 PortStats are version independent
 from napps.kytos.of_core.flow import FlowFactory
+from napps.kytos.of_core.flow import FlowStats as OFCoreFlowStats
 from napps.kytos.of_core.flow import PortStats as OFCorePortStats
+from napps.kytos.of_core.v0x01.flow import Match as Match01
+from napps.kytos.of_core.v0x04.flow import Match as Match04
+from napps.kytos.of_stats import settings
+from napps.kytos.of_stats.flow_ids import FlowIdCache, flow_key
+from napps.kytos.of_stats.flow_index import FlowIndex
+from napps.kytos.of_stats.heavy_hitters import OtherFlows
+from napps.kytos.of_stats.rates import COUNTERS, PortRates
+from napps.kytos.of_stats.storage import KronosStorage
+from napps.kytos.of_stats.user_speed import UserSpeed
 
 
 class Stats(metaclass=ABCMeta):
     """Abstract class for Statistics implementation."""
 
+    #: Name used in settings and by the scheduler.
+    name = None
+
     def __init__(self, msg_out_buffer, msg_app_buffer):
         """Store a reference to the controller's buffers.
 
@@ -30,14 +44,71 @@ class Stats(metaclass=ABCMeta):
         """
         self._buffer = msg_out_buffer
         self._app_buffer = msg_app_buffer
+        self._storage = KronosStorage(msg_app_buffer,
+                                      self._save_event_callback)
+        #: Keeps recent samples in memory, set by Main if enabled.
+        self.series = None
+        #: Aggregates rates in time windows, set by Main if enabled.
+        self.rollups = None
+        #: Latest counters in arrays, set by Main if enabled.
+        self.snapshots = None
 
     @abstractmethod
-    def request(self, conn):
-        """Request statistics."""
+    def get_request(self, of_version):
+        """Return a statistics request message.
+
+        The transaction id (xid) of the message is set when it is built, so
+        the request can be tracked before it is sent.
+        """
+
+    def send(self, request, conn):
+        """Send a request built by :meth:`get_request`."""
+        self._send_event(request, conn)
+        log.debug('%s stats request for switch %s sent.', self.name,
+                  conn.switch.id)
+
+    def flush(self):
+        """Send samples queued while kytos/kronos was behind."""
+        return self._storage.flush()
+
+    def expire_rollups(self, now):
+        """Save the rollup windows that ended without new samples."""
+        if self.rollups is not None:
+            samples = self.rollups.expire(now)
+            if samples:
+                self._storage.save(samples, now)
+
+    def queue_counters(self):
+        """Return the counters of the queue of samples, if enabled."""
+        if self._storage.queue is None:
+            return None
+        return self._storage.queue.counters()
+
+    def enable_metrics(self, metrics):
+        """Count the events sent to kronos in ``metrics``."""
+        self._storage.metrics = metrics
+
+    def enable_spool(self, spool):
+        """Write samples to ``spool`` while kronos fails."""
+        self._storage.spool = spool
+
+    @staticmethod
+    def applies_to(_dpid):
+        """Return whether the switch should be polled by this class."""
+        return True
+
+    def forget(self, dpid):
+        """Discard what is kept about a switch that is gone."""
 
     @abstractmethod
     def listen(self, switch, stats):
-        """Listen statistic replies."""
+        """Listen statistic replies.
+
+        Returns:
+            float: Fraction of the samples that changed since the previous
+            reply, ``None`` if unknown.
+
+        """
 
     def _send_event(self, req, conn):
         event = KytosEvent(
@@ -56,21 +127,39 @@ class Stats(metaclass=ABCMeta):
 class PortStats(Stats):
     """Deal with PortStats messages."""
 
-    def request(self, conn):
-        """Ask for port stats."""
-        request = self._get_versioned_request(conn.protocol.version)
-        self._send_event(request, conn)
-        log.debug('PortStats request for switch %s sent.', conn.switch.id)
+    name = 'port'
+
+    def __init__(self, msg_out_buffer, msg_app_buffer):
+        """Also keep previous counters to compute rates."""
+        super().__init__(msg_out_buffer, msg_app_buffer)
+        #: Refreshed by Main, outside the reply handlers.
+        self.user_speed = UserSpeed(settings.USER_SPEED_CHECK_INTERVAL)
+        self._rates = PortRates(self.user_speed)
+
+    def forget(self, dpid):
+        """Discard the previous counters of a switch."""
+        self._rates.forget(dpid)
 
     @staticmethod
-    def _get_versioned_request(of_version):
+    def get_request(of_version, port_no=None):
+        """Ask for port stats.
+
+        Args:
+            of_version (int): OpenFlow version of the switch.
+            port_no (int): Single port to ask for. All ports if ``None``.
+
+        """
         if of_version == 0x01:
+            if port_no is None:
+                port_no = Port.OFPP_NONE  # All ports
             return StatsRequest(
                 body_type=StatsType.OFPST_PORT,
-                body=v0x01.PortStatsRequest(Port.OFPP_NONE))  # All ports
+                body=v0x01.PortStatsRequest(port_no))
+        body = v0x04.PortStatsRequest()
+        if port_no is not None:
+            body.port_no = port_no
         return MultipartRequest(
-            multipart_type=MultipartType.OFPMP_PORT_STATS,
-            body=v0x04.PortStatsRequest())
+            multipart_type=MultipartType.OFPMP_PORT_STATS, body=body)
 
     def listen(self, switch, ports_stats):
         """Receive port stats."""
@@ -78,126 +167,292 @@ class PortStats(Stats):
                     ' tx_bytes %s, rx_dropped %s, tx_dropped %s,' \
                     ' rx_errors %s, tx_errors %s'
 
+        debug = log.isEnabledFor(logging.DEBUG)
+        recent = [] if self.series is not None else None
+        samples = []
+        rollups = []
+        timestamp = time.time()
+        table = None
+        if self.snapshots is not None:
+            table = self.snapshots.ports(switch.id)
+            table.update([port_stat.port_no.value
+                          for port_stat in ports_stats], ports_stats)
         for port_stat in ports_stats:
-            self._update_controller_interface(switch, port_stat)
+            iface = self._update_controller_interface(switch, port_stat,
+                                                      table)
 
-            statistics_to_send = {'rx_bytes': port_stat.rx_bytes.value,
-                                  'tx_bytes': port_stat.tx_bytes.value,
-                                  'rx_dropped': port_stat.rx_dropped.value,
-                                  'tx_dropped': port_stat.tx_dropped.value,
-                                  'rx_errors': port_stat.rx_errors.value,
-                                  'tx_errors': port_stat.tx_errors.value}
+            counters = tuple(getattr(port_stat, counter).value
+                             for counter in COUNTERS)
+            statistics_to_send = dict(zip(COUNTERS, counters))
 
             port_no = port_stat.port_no.value
+            rates = self._rates.update(switch.id, port_no, counters,
+                                       timestamp, iface)
+            statistics_to_send.update(rates)
 
             namespace = f'kytos.kronos.{switch.id}.port_no.{port_no}'
-            content = {'namespace': namespace,
-                       'value': statistics_to_send,
-                       'callback': self._save_event_callback,
-                       'timestamp': time.time()}
-            event = KytosEvent(name='kytos.kronos.save', content=content)
-            self._app_buffer.put(event)
-
-            log.debug(debug_msg, port_stat.port_no.value, switch.id,
-                      port_stat.rx_bytes.value, port_stat.tx_bytes.value,
-                      port_stat.rx_dropped.value, port_stat.tx_dropped.value,
-                      port_stat.rx_errors.value, port_stat.tx_errors.value)
+            samples.append((namespace, statistics_to_send))
+            if self.rollups is not None:
+                rollups.extend(self.rollups.add(namespace, rates, timestamp))
+
+            if recent is not None:
+                recent.append((port_no, counters))
+            if debug:
+                log.debug(debug_msg, port_no, switch.id, *counters)
+
+        if recent is not None:
+            self.series.add(switch.id, 'port', timestamp, recent)
+        samples.extend(rollups)
+        return self._storage.save(samples, timestamp,
+                                  source=(switch.id, self.name))
 
     @staticmethod
-    def _update_controller_interface(switch, port_stats):
+    def _update_controller_interface(switch, port_stats, table=None):
+        """Update the stats of an interface or point them to ``table``."""
         port_no = port_stats.port_no.value
         iface = switch.get_interface_by_port_no(port_no)
         if iface is not None:
-            if iface.stats is None:
-                iface.stats = OFCorePortStats()
-            iface.stats.update(port_stats)
+            if table is not None:
+                if getattr(iface.stats, 'table', None) is not table:
+                    iface.stats = table.view(port_no)
+            else:
+                if iface.stats is None:
+                    iface.stats = OFCorePortStats()
+                iface.stats.update(port_stats)
+        return iface
 
 
 class AggregateStats(Stats):
-    """Deal with AggregateStats message."""
+    """Deal with AggregateStats message.
+
+    Aggregate stats are cheap to request and reply, so they can be used to
+    decide whether a full flow dump is needed.
+    """
+
+    name = 'aggregate'
+
+    def __init__(self, msg_out_buffer, msg_app_buffer):
+        """Also keep the latest totals of each switch."""
+        super().__init__(msg_out_buffer, msg_app_buffer)
+        #: dpid -> (packet_count, byte_count, flow_count)
+        self.totals = {}
+
+    def forget(self, dpid):
+        """Discard the totals of a switch."""
+        self.totals.pop(dpid, None)
 
-    def request(self, conn):
-        """Ask for flow stats."""
-        body = AggregateStatsRequest()  # Port.OFPP_NONE and All Tables
-        req = StatsRequest(body_type=StatsType.OFPST_AGGREGATE, body=body)
-        self._send_event(req, conn)
-        log.debug('Aggregate Stats request for switch %s sent.',
-                  conn.switch.dpid)
+    @staticmethod
+    def get_request(of_version):
+        """Ask for aggregate stats of all flows of all tables."""
+        if of_version == 0x01:
+            return StatsRequest(
+                body_type=StatsType.OFPST_AGGREGATE,
+                body=AggregateStatsRequest())
+        return MultipartRequest(
+            multipart_type=MultipartType.OFPMP_AGGREGATE,
+            body=v0x04.AggregateStatsRequest())
 
     def listen(self, switch, aggregate_stats):
-        """Receive flow stats."""
-        debug_msg = 'Received aggregate stats from switch {}:' \
-                    ' packet_count {}, byte_count {}, flow_count {}'
+        """Receive aggregate stats."""
+        debug_msg = 'Received aggregate stats from switch %s:' \
+                    ' packet_count %s, byte_count %s, flow_count %s'
 
+        samples = []
         for aggregate in aggregate_stats:
-            # need to choose the _id to aggregate_stats
-            # this class isn't used yet.
-
-            log.debug(debug_msg, switch.id, aggregate.packet_count.value,
-                      aggregate.byte_count.value, aggregate.flow_count.value)
+            totals = (aggregate.packet_count.value,
+                      aggregate.byte_count.value,
+                      aggregate.flow_count.value)
+            self.totals[switch.id] = totals
+            log.debug(debug_msg, switch.id, *totals)
 
             # Save aggregate stats using kytos/kronos
             namespace = f'kytos.kronos.aggregated_stats.{switch.id}'
-            stats_to_send = {'aggregate_id': aggregate.id,
-                             'packet_count': aggregate.packet_count.value,
-                             'byte_count': aggregate.byte_count.value,
-                             'flow_count': aggregate.flow_count.value}
-
-            content = {'namespace': namespace,
-                       'value': stats_to_send,
-                       'callback': self._save_event_callback,
-                       'timestamp': time.time()}
+            stats_to_send = {'packet_count': totals[0],
+                             'byte_count': totals[1],
+                             'flow_count': totals[2]}
+            samples.append((namespace, stats_to_send))
 
-            event = KytosEvent(name='kytos.kronos.save', content=content)
-            self._app_buffer.put(event)
+        return self._storage.save(samples, source=(switch.id, self.name))
 
 
 class FlowStats(Stats):
-    """Deal with FlowStats message."""
+    """Deal with FlowStats message.
 
-    def request(self, conn):
-        """Ask for flow stats."""
-        request = self._get_versioned_request(conn.protocol.version)
-        self._send_event(request, conn)
-        log.debug('FlowStats request for switch %s sent.', conn.switch.id)
+    Without a filter, all flows of all tables are requested. Each filter of
+    ``settings.FLOW_STATS_FILTERS`` has its own instance, named
+    ``flow.<filter name>``.
+    """
 
-    @staticmethod
-    def _get_versioned_request(of_version):
+    name = 'flow'
+
+    def __init__(self, msg_out_buffer, msg_app_buffer, flow_filter=None):
+        """Also cache flow ids of the stats entries.
+
+        Args:
+            msg_out_buffer: Where to send events.
+            msg_app_buffer: Where to send events to other NApps.
+            flow_filter (FlowFilter): Which flows to request.
+
+        """
+        super().__init__(msg_out_buffer, msg_app_buffer)
+        self._filter = flow_filter
+        if flow_filter is not None:
+            self.name = f'flow.{flow_filter.name}'
+        self._flow_ids = FlowIdCache(settings.FLOW_ID_CACHE_SIZE)
+        #: Controller flows by id, updated by Main on flow events.
+        self.flow_index = FlowIndex()
+        #: Top flows by bytes, set by Main if enabled.
+        self.heavy_hitters = None
+        #: Only save the top flows and the rates of the others.
+        self.save_top_only = False
+        self._other_flows = OtherFlows()
+
+    def applies_to(self, dpid):
+        """Return whether the switch is polled by the filter."""
+        return self._filter is None or self._filter.applies_to(dpid)
+
+    def forget(self, dpid):
+        """Discard the cached flow ids and the flow index of a switch."""
+        self._flow_ids.forget(dpid)
+        self.flow_index.invalidate(dpid)
+        self._other_flows.forget(dpid)
+
+    def get_request(self, of_version):
+        """Ask for flow stats, with the filter of this instance."""
+        flow_filter = self._filter
         if of_version == 0x01:
-            return StatsRequest(
-                body_type=StatsType.OFPST_FLOW,
-                body=v0x01.FlowStatsRequest())
-        return MultipartRequest(
-            multipart_type=MultipartType.OFPMP_FLOW,
-            body=v0x04.FlowStatsRequest())
+            body = v0x01.FlowStatsRequest()
+            if flow_filter is not None:
+                if flow_filter.table_id is not None:
+                    body.table_id = flow_filter.table_id
+                if flow_filter.out_port is not None:
+                    body.out_port = flow_filter.out_port
+                if flow_filter.match:
+                    body.match = Match01(**flow_filter.match).as_of_match()
+            return StatsRequest(body_type=StatsType.OFPST_FLOW, body=body)
+        body = v0x04.FlowStatsRequest()
+        if flow_filter is not None:
+            if flow_filter.table_id is not None:
+                body.table_id = flow_filter.table_id
+            if flow_filter.out_port is not None:
+                body.out_port = flow_filter.out_port
+            body.cookie = flow_filter.cookie
+            body.cookie_mask = flow_filter.cookie_mask
+            if flow_filter.match:
+                body.match = Match04(**flow_filter.match).as_of_match()
+        return MultipartRequest(multipart_type=MultipartType.OFPMP_FLOW,
+                                body=body)
 
     def listen(self, switch, flows_stats):
-        """Receive flow stats."""
-        flow_class = FlowFactory.get_class(switch)
-        for flow_stat in flows_stats:
-            flow = flow_class.from_of_flow_stats(flow_stat, switch)
+        """Receive flow stats.
+
+        A Flow object is only built for entries whose flow id is not cached.
+        """
+        flows = []
+        keys = set()
+        timestamp = time.time()
+        controller_flows = self.flow_index.get(switch)
+        entries = zip(flows_stats, map(flow_key, flows_stats))
+        if self._filter is not None and self._filter.cookie_mask:
+            # OpenFlow 1.0 requests can't filter by cookie
+            entries = [(flow_stat, key) for flow_stat, key in entries
+                       if self._filter.matches_cookie(flow_stat.cookie.value)]
+        table = None
+        if self.snapshots is not None:
+            table = self.snapshots.flows(switch.id)
+            updated = []
+        for flow_stat, key in entries:
+            keys.add(key)
+            flow_id = self._get_flow_id(switch, key, flow_stat)
+            controller_flow = controller_flows.get(flow_id)
+            if table is not None:
+                updated.append(flow_stat)
+                # Update controller's flow
+                if (controller_flow
+                        and getattr(controller_flow.stats, 'table',
+                                    None) is not table):
+                    controller_flow.stats = table.view(flow_id)
+                flows.append((flow_id, flow_stat.packet_count.value,
+                              flow_stat.byte_count.value))
+                continue
+            stats = OFCoreFlowStats()
+            stats.update(flow_stat)
 
             # Update controller's flow
-            controller_flow = switch.get_flow_by_id(flow.id)
             if controller_flow:
-                controller_flow.stats = flow.stats
-
-            # Save packet_count using kytos/kronos
-            namespace = f'kytos.kronos.{switch.id}.flow_id.{flow.id}'
-            content = {'namespace': namespace,
-                       'value': {'packet_count': flow.stats.packet_count},
-                       'callback': self._save_event_callback,
-                       'timestamp': time.time()}
-
-            event = KytosEvent(name='kytos.kronos.save', content=content)
-            self._app_buffer.put(event)
-
-            # Save byte_count using kytos/kronos
-            namespace = f'kytos.kronos.{switch.id}.flow_id.{flow.id}'
-            content = {'namespace': namespace,
-                       'value': {'byte_count': flow.stats.byte_count},
-                       'callback': self._save_event_callback,
-                       'timestamp': time.time()}
-
-            event = KytosEvent(name='kytos.kronos.save', content=content)
-            self._app_buffer.put(event)
+                controller_flow.stats = stats
+
+            flows.append((flow_id, stats.packet_count, stats.byte_count))
+
+        # Forget flows that were removed from the switch
+        self._flow_ids.retain(switch.id, keys)
+        if table is not None:
+            table.update([flow_id for flow_id, _, _ in flows], updated)
+            if self._filter is None:
+                table.retain({flow_id for flow_id, _, _ in flows})
+        if self.series is not None:
+            self.series.add(switch.id, 'flow', timestamp,
+                            [(flow_id, (packet_count, byte_count))
+                             for flow_id, packet_count, byte_count in flows])
+            if self._filter is None:
+                self.series.retain(switch.id, 'flow',
+                                   {flow_id for flow_id, _, _ in flows})
+        top = None
+        if self.heavy_hitters is not None:
+            top = self.heavy_hitters.update(
+                switch.id, {flow_id: byte_count
+                            for flow_id, _, byte_count in flows}, timestamp)
+        if not self.save_top_only:
+            top = None
+        # Without a top yet, e.g. for the first reply, all flows are saved
+        samples = self._get_samples(switch, flows, timestamp, top)
+        if self.rollups is not None:
+            for flow_id, packet_count, byte_count in flows:
+                if top is not None and flow_id not in top:
+                    continue
+                namespace = f'kytos.kronos.{switch.id}.flow_id.{flow_id}'
+                samples.extend(self.rollups.add_counters(
+                    namespace, {'packet_count': packet_count,
+                                'byte_count': byte_count}, timestamp))
+        return self._storage.save(samples, timestamp,
+                                  source=(switch.id, self.name))
+
+    def _get_samples(self, switch, flows, timestamp, top=None):
+        """Return packet_count and byte_count samples of the flows.
+
+        If ``top`` is given, only flows in it have their own samples. With
+        :attr:`save_top_only`, the packets and bytes per second of the other
+        flows are saved in the ``other`` namespace.
+        """
+        samples = []
+        for flow_id, packet_count, byte_count in flows:
+            if top is not None and flow_id not in top:
+                continue
+            namespace = f'kytos.kronos.{switch.id}.flow_id.{flow_id}'
+            self._add_samples(samples, namespace,
+                              {'packet_count': packet_count,
+                               'byte_count': byte_count})
+        if self.save_top_only:
+            rates = self._other_flows.update(switch.id, flows, top,
+                                             timestamp)
+            if rates is not None:
+                namespace = f'kytos.kronos.{switch.id}.flow_id.other'
+                self._add_samples(samples, namespace, rates)
+        return samples
+
+    def _add_samples(self, samples, namespace, values):
+        # Save packet and byte values using kytos/kronos
+        if self._storage.batched:
+            samples.append((namespace, values))
+        else:
+            samples.extend((namespace, {field: value})
+                           for field, value in values.items())
+
+    def _get_flow_id(self, switch, key, flow_stat):
+        flow_id = self._flow_ids.get(switch.id, key)
+        if flow_id is None:
+            flow_class = FlowFactory.get_class(switch)
+            flow = flow_class.from_of_flow_stats(flow_stat, switch)
+            flow_id = flow.id
+            self._flow_ids.set(switch.id, key, flow_id)
+        return flow_id
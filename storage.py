@@ -0,0 +1,169 @@
+"""Persist statistics samples using kytos/kronos."""
+import time
+
+from kytos.core import KytosEvent
+from napps.kytos.of_stats import settings
+from napps.kytos.of_stats.backpressure import SampleQueue
+from napps.kytos.of_stats.changes import ChangeFilter
+
+
+class KronosStorage:
+    """Turn statistics samples into kytos/kronos save events.
+
+    A sample is a ``(namespace, value)`` tuple. In ``batch`` mode, all samples
+    of a stats reply (up to :attr:`batch_size` samples) are sent in a single
+    ``kytos.kronos.save_batch`` event sharing the same timestamp. In
+    ``record`` mode, each sample becomes one ``kytos.kronos.save`` event, as
+    in previous versions.
+
+    When ``settings.SAVE_HEARTBEAT`` is set, samples whose value did not change
+    since they were last saved are skipped until the heartbeat expires. The
+    fraction of changed samples is returned to measure how busy a switch is.
+
+    When ``settings.KRONOS_QUEUE_SIZE`` is set, samples go through a bounded
+    :class:`SampleQueue` and are only put in the app buffer while it has
+    less than ``settings.KRONOS_MAX_BUFFERED_EVENTS`` events. Unsent samples
+    of a namespace are replaced by newer ones.
+
+    When a :class:`Spool` is set, samples of failed kronos events, and new
+    samples while kronos is failing, are written to local disk to be
+    replayed later.
+    """
+
+    MODES = ('batch', 'record')
+
+    def __init__(self, app_buffer, callback, mode=None, batch_size=None,
+                 heartbeat=None, queue_size=None, max_buffered=None):
+        """Store the buffer where kronos events are put.
+
+        Args:
+            app_buffer: Where to send events to other NApps.
+            callback: Function called by kronos after saving data.
+            mode (str): ``batch`` or ``record``. Defaults to
+                ``settings.KRONOS_SAVE_MODE``.
+            batch_size (int): Maximum number of samples per batch event.
+                Defaults to ``settings.KRONOS_BATCH_SIZE``.
+            heartbeat (float): Seconds after which unchanged values are saved
+                again. Defaults to ``settings.SAVE_HEARTBEAT``. Zero saves
+                every sample.
+            queue_size (int): Maximum number of queued samples. Defaults to
+                ``settings.KRONOS_QUEUE_SIZE``. Zero puts events in the app
+                buffer right away.
+            max_buffered (int): App buffer size above which queued samples
+                wait. Defaults to ``settings.KRONOS_MAX_BUFFERED_EVENTS``.
+
+        """
+        self._app_buffer = app_buffer
+        self._callback = callback
+        self.mode = mode or settings.KRONOS_SAVE_MODE
+        if self.mode not in self.MODES:
+            raise ValueError(f'Invalid kronos save mode: {self.mode}')
+        self.batch_size = batch_size or settings.KRONOS_BATCH_SIZE
+        if heartbeat is None:
+            heartbeat = settings.SAVE_HEARTBEAT
+        self._changes = ChangeFilter(heartbeat)
+        #: Counts the events sent, if metrics are enabled.
+        self.metrics = None
+        if queue_size is None:
+            queue_size = settings.KRONOS_QUEUE_SIZE
+        self.queue = None
+        if queue_size:
+            self.queue = SampleQueue(queue_size, settings.KRONOS_QUEUE_POLICY)
+        self.max_buffered = max_buffered or settings.KRONOS_MAX_BUFFERED_EVENTS
+        #: Keeps samples on disk while kronos fails, set by Main if enabled.
+        self.spool = None
+
+    @property
+    def batched(self):
+        """Whether samples are grouped in batch events."""
+        return self.mode == 'batch'
+
+    def save(self, samples, timestamp=None, source=None):
+        """Send samples to kronos.
+
+        Args:
+            samples (list): ``(namespace, value)`` tuples.
+            timestamp (float): Shared by all samples. Defaults to now.
+            source (tuple): (dpid, stats name) of the samples, for metrics.
+
+        Returns:
+            float: Fraction of the samples that changed since they were last
+            saved, or ``None`` if they were not seen before.
+
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        samples, changed = self._changes.filter(samples, timestamp)
+        if not samples:
+            return changed
+        if self.spool is not None and self.spool.active(timestamp):
+            self.spool.append(timestamp, samples)
+        elif self.queue is not None:
+            self.queue.add(samples, timestamp, source)
+            self.flush()
+        else:
+            self.send(samples, timestamp, source)
+        return changed
+
+    def flush(self):
+        """Send queued samples while the app buffer is not behind.
+
+        Returns:
+            int: Number of samples sent.
+
+        """
+        if self.queue is None:
+            return 0
+        room = self.max_buffered - self._app_buffer.qsize()
+        if room <= 0:
+            return 0
+        if self.batched:
+            room *= self.batch_size
+        # Samples of a stats reply share their timestamp and source.
+        groups = {}
+        samples = self.queue.pop(room)
+        for namespace, value, timestamp, source in samples:
+            groups.setdefault((timestamp, source), []).append((namespace,
+                                                               value))
+        for (timestamp, source), group in groups.items():
+            self.send(group, timestamp, source)
+        return len(samples)
+
+    def send(self, samples, timestamp, source=None):
+        """Put events with the samples in the app buffer right away.
+
+        Unlike :meth:`save`, unchanged samples are not skipped.
+        """
+        if self.batched:
+            starts = range(0, len(samples), self.batch_size)
+            for start in starts:
+                chunk = samples[start:start + self.batch_size]
+                self._put_batch(chunk, timestamp)
+            events = len(starts)
+        else:
+            for namespace, value in samples:
+                self._put_record(namespace, value, timestamp)
+            events = len(samples)
+        if self.metrics is not None and source is not None:
+            self.metrics.count(*source, 'events_emitted', events)
+
+    def _on_saved(self, event, data, error):
+        if self.spool is not None:
+            self.spool.saved(event, error)
+        self._callback(event, data, error)
+
+    def _put_batch(self, samples, timestamp):
+        content = {'samples': [{'namespace': namespace, 'value': value}
+                               for namespace, value in samples],
+                   'callback': self._on_saved,
+                   'timestamp': timestamp}
+        event = KytosEvent(name='kytos.kronos.save_batch', content=content)
+        self._app_buffer.put(event)
+
+    def _put_record(self, namespace, value, timestamp):
+        content = {'namespace': namespace,
+                   'value': value,
+                   'callback': self._on_saved,
+                   'timestamp': timestamp}
+        event = KytosEvent(name='kytos.kronos.save', content=content)
+        self._app_buffer.put(event)
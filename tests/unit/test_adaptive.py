@@ -0,0 +1,34 @@
+"""Test AdaptiveIntervals."""
+import unittest
+
+from napps.kytos.of_stats.adaptive import AdaptiveIntervals
+
+
+class TestAdaptiveIntervals(unittest.TestCase):
+    """Test AdaptiveIntervals."""
+
+    def setUp(self):
+        """Create intervals from 10 to 300 seconds."""
+        self.adaptive = AdaptiveIntervals(min_interval=10, max_interval=300,
+                                          max_load=0.01,
+                                          max_entries_per_sec=100)
+
+    def test_busy(self):
+        """Busy switches should be polled more often."""
+        self.assertEqual(30, self.adaptive.next_interval(60, 0.9, 10, 0))
+        self.assertEqual(10, self.adaptive.next_interval(15, 0.9, 10, 0))
+
+    def test_idle(self):
+        """Idle switches should be polled less often."""
+        self.assertEqual(90, self.adaptive.next_interval(60, 0, 10, 0))
+        self.assertEqual(300, self.adaptive.next_interval(250, 0, 10, 0))
+
+    def test_unknown(self):
+        """The interval should not change without information."""
+        self.assertEqual(60, self.adaptive.next_interval(60, None, 10, 0))
+        self.assertEqual(60, self.adaptive.next_interval(60, 0.1, 10, 0))
+
+    def test_cost(self):
+        """Expensive replies should limit how often a switch is polled."""
+        self.assertEqual(50, self.adaptive.next_interval(20, 0.9, 10, 0.5))
+        self.assertEqual(100, self.adaptive.next_interval(20, 0.9, 10000, 0))
@@ -0,0 +1,60 @@
+"""Test SampleQueue."""
+import unittest
+
+from napps.kytos.of_stats.backpressure import SampleQueue
+
+
+class TestSampleQueue(unittest.TestCase):
+    """Test SampleQueue."""
+
+    def test_coalesce(self):
+        """A newer sample should replace the unsent one in its place."""
+        queue = SampleQueue(10)
+        queue.add([('ns1', {'a': 1}), ('ns2', {'a': 2})], 1, ('dpid', 'port'))
+        queue.add([('ns1', {'a': 3})], 2, ('dpid', 'port'))
+        self.assertEqual([('ns1', {'a': 3}, 2, ('dpid', 'port')),
+                          ('ns2', {'a': 2}, 1, ('dpid', 'port'))],
+                         queue.pop())
+        counters = queue.counters()
+        self.assertEqual(1, counters['coalesced'])
+        self.assertEqual(2, counters['sent'])
+        self.assertEqual(0, counters['pending'])
+
+    def test_value_keys(self):
+        """Samples of a namespace with other value keys should not coalesce."""
+        queue = SampleQueue(10)
+        queue.add([('ns1', {'packet_count': 1}), ('ns1', {'byte_count': 2})],
+                  1)
+        queue.add([('ns1', {'byte_count': 3})], 2)
+        self.assertEqual([('ns1', {'packet_count': 1}, 1, None),
+                          ('ns1', {'byte_count': 3}, 2, None)],
+                         queue.pop())
+        self.assertEqual(1, queue.counters()['coalesced'])
+
+    def test_drop_oldest(self):
+        """The oldest sample should be dropped when full."""
+        queue = SampleQueue(2, 'drop_oldest')
+        queue.add([('ns1', 1), ('ns2', 2), ('ns3', 3)], 1)
+        self.assertEqual(['ns2', 'ns3'],
+                         [sample[0] for sample in queue.pop()])
+        self.assertEqual(1, queue.counters()['dropped'])
+
+    def test_drop_newest(self):
+        """The new sample should be dropped when full."""
+        queue = SampleQueue(2, 'drop_newest')
+        queue.add([('ns1', 1), ('ns2', 2), ('ns3', 3)], 1)
+        self.assertEqual(['ns1', 'ns2'],
+                         [sample[0] for sample in queue.pop()])
+        self.assertEqual(1, queue.counters()['dropped'])
+
+    def test_pop_count(self):
+        """Only the requested number of samples should be removed."""
+        queue = SampleQueue(10)
+        queue.add([('ns1', 1), ('ns2', 2), ('ns3', 3)], 1)
+        self.assertEqual(2, len(queue.pop(2)))
+        self.assertEqual(1, len(queue))
+
+    def test_invalid_policy(self):
+        """Unknown policies should be rejected."""
+        with self.assertRaises(ValueError):
+            SampleQueue(10, 'drop_random')
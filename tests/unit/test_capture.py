@@ -0,0 +1,77 @@
+"""Test the capture file of stats replies."""
+import gzip
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+
+from pyof.v0x01.common.utils import unpack_message
+from pyof.v0x01.controller2switch.common import PortStats
+from pyof.v0x01.controller2switch.stats_reply import StatsReply
+from pyof.v0x01.controller2switch.stats_request import StatsType
+
+from napps.kytos.of_stats.capture import CaptureWriter, read_capture
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+def get_message(xid):
+    """Return an unpacked v0x01 port stats reply."""
+    stats = PortStats(port_no=1, rx_packets=xid, tx_packets=0, rx_bytes=0,
+                      tx_bytes=0, rx_dropped=0, tx_dropped=0, rx_errors=0,
+                      tx_errors=0, rx_frame_err=0, rx_over_err=0,
+                      rx_crc_err=0, collisions=0)
+    message = StatsReply(xid=xid, body_type=StatsType.OFPST_PORT, flags=0,
+                         body=stats.pack())
+    return unpack_message(message.pack())
+
+
+class TestCapture(unittest.TestCase):
+    """Test CaptureWriter and read_capture."""
+
+    def setUp(self):
+        """Capture in a temporary directory."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'capture.gz'
+
+    def test_round_trip(self):
+        """Messages should be read as they were recorded."""
+        writer = CaptureWriter(self.path)
+        writer.record('dpid1', get_message(1), 100.5)
+        writer.record('dpid2', get_message(2), 101)
+        writer.close()
+        # A restart appends to the same file
+        writer = CaptureWriter(self.path)
+        writer.record('dpid1', get_message(3), 102)
+        writer.close()
+
+        records = list(read_capture(self.path))
+        self.assertEqual([(100.5, 'dpid1', 1), (101, 'dpid2', 1),
+                          (102, 'dpid1', 1)],
+                         [record[:3] for record in records])
+        message = unpack_message(records[2][3])
+        self.assertEqual(3, message.header.xid.value)
+        self.assertEqual(3, message.body[0].rx_packets.value)
+
+    def test_max_bytes(self):
+        """Recording should stop when the maximum size is reached."""
+        size = len(get_message(1).pack())
+        writer = CaptureWriter(self.path, max_bytes=2 * size)
+        for xid in range(5):
+            writer.record('dpid', get_message(xid), 100)
+        writer.close()
+        self.assertEqual(2 * size, writer.written)
+        self.assertEqual(2, len(list(read_capture(self.path))))
+
+    def test_truncated(self):
+        """A truncated record should be ignored."""
+        writer = CaptureWriter(self.path)
+        writer.record('dpid', get_message(1), 100)
+        writer.record('dpid', get_message(2), 101)
+        writer.close()
+        with gzip.open(self.path) as capture:
+            data = capture.read()
+        with gzip.open(self.path, 'wb') as capture:
+            capture.write(data[:-10])
+        self.assertEqual(1, len(list(read_capture(self.path))))
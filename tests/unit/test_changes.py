@@ -0,0 +1,55 @@
+"""Test ChangeFilter."""
+import unittest
+
+from napps.kytos.of_stats.changes import ChangeFilter
+
+
+class TestChangeFilter(unittest.TestCase):
+    """Test ChangeFilter."""
+
+    def setUp(self):
+        """Create a filter with a 60-second heartbeat."""
+        self.changes = ChangeFilter(heartbeat=60)
+
+    def test_changed(self):
+        """Changed values should be kept."""
+        sample = ('ns', {'packet_count': 1, 'byte_count': 2})
+        self.assertEqual(([sample], None), self.changes.filter([sample], 0))
+        sample = ('ns', {'packet_count': 2, 'byte_count': 4})
+        self.assertEqual(([sample], 1), self.changes.filter([sample], 10))
+
+    def test_unchanged(self):
+        """Unchanged values should be kept only after the heartbeat."""
+        sample = ('ns', {'packet_count': 1})
+        self.changes.filter([sample], 0)
+        self.assertEqual(([], 0), self.changes.filter([sample], 59))
+        self.assertEqual(([sample], 0), self.changes.filter([sample], 60))
+
+    def test_different_keys(self):
+        """Values with different keys in a namespace are independent."""
+        packets = ('ns', {'packet_count': 1})
+        data = ('ns', {'byte_count': 1})
+        self.assertEqual([packets, data],
+                         self.changes.filter([packets, data], 0)[0])
+        self.assertEqual([], self.changes.filter([packets, data], 10)[0])
+
+    def test_change_ratio(self):
+        """Return the fraction of known samples that changed."""
+        self.changes.filter([('a', {'v': 1}), ('b', {'v': 1})], 0)
+        samples = [('a', {'v': 2}), ('b', {'v': 1}), ('c', {'v': 1})]
+        self.assertEqual(0.5, self.changes.filter(samples, 10)[1])
+
+    def test_no_heartbeat(self):
+        """Every sample should be kept without heartbeat."""
+        changes = ChangeFilter(heartbeat=0)
+        sample = ('ns', {'packet_count': 1})
+        changes.filter([sample], 0)
+        self.assertEqual(([sample], 0), changes.filter([sample], 1))
+
+    def test_sweep(self):
+        """Namespaces that are no longer seen should be forgotten."""
+        self.changes = ChangeFilter(heartbeat=60, forget_after=120)
+        self.changes.filter([('old', {'value': 1})], 0)
+        self.changes.filter([('new', {'value': 1})], 100)
+        self.changes.filter([('new', {'value': 2})], 200)
+        self.assertEqual(1, len(self.changes))
@@ -0,0 +1,37 @@
+"""Test FlowFilter."""
+import unittest
+
+from napps.kytos.of_stats.flow_filters import FlowFilter
+
+
+class TestFlowFilter(unittest.TestCase):
+    """Test FlowFilter."""
+
+    def test_from_dict(self):
+        """Create a filter from settings."""
+        flow_filter = FlowFilter.from_dict({'name': 'mef', 'table_id': 1,
+                                            'dpids': ['dpid']})
+        self.assertEqual('mef', flow_filter.name)
+        self.assertEqual(1, flow_filter.table_id)
+        self.assertIsNone(flow_filter.out_port)
+
+    def test_invalid(self):
+        """Filters without name or with unknown fields are invalid."""
+        with self.assertRaises(ValueError):
+            FlowFilter.from_dict({'name': 'mef', 'tableid': 1})
+        with self.assertRaises(ValueError):
+            FlowFilter.from_dict({'table_id': 1})
+
+    def test_applies_to(self):
+        """Only the given switches should be polled."""
+        self.assertTrue(FlowFilter('all').applies_to('dpid'))
+        flow_filter = FlowFilter('some', dpids=['dpid'])
+        self.assertTrue(flow_filter.applies_to('dpid'))
+        self.assertFalse(flow_filter.applies_to('dpid2'))
+
+    def test_matches_cookie(self):
+        """Cookies should be compared after the mask."""
+        flow_filter = FlowFilter('mef', cookie=0xaa00, cookie_mask=0xff00)
+        self.assertTrue(flow_filter.matches_cookie(0xaa12))
+        self.assertFalse(flow_filter.matches_cookie(0xab12))
+        self.assertTrue(FlowFilter('all').matches_cookie(0xab12))
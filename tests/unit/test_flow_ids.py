@@ -0,0 +1,71 @@
+"""Test FlowIdCache."""
+import unittest
+
+from pyof.v0x01.common.flow_match import Match as Match01
+from pyof.v0x01.controller2switch.common import FlowStats as FlowStats01
+from pyof.v0x04.common.flow_match import Match as Match04
+from pyof.v0x04.controller2switch.multipart_reply import \
+    FlowStats as FlowStats04
+
+from napps.kytos.of_stats.flow_ids import FlowIdCache, flow_key
+
+
+class TestFlowKey(unittest.TestCase):
+    """Test flow_key."""
+
+    def test_counters_are_ignored(self):
+        """Entries of the same flow should have the same key."""
+        for flow_stats, match in ((FlowStats01, Match01),
+                                  (FlowStats04, Match04)):
+            flow1 = flow_stats(table_id=0, match=match(), priority=10,
+                               idle_timeout=0, hard_timeout=0, cookie=1,
+                               duration_sec=1, duration_nsec=1,
+                               packet_count=1, byte_count=1)
+            flow2 = flow_stats(table_id=0, match=match(), priority=10,
+                               idle_timeout=0, hard_timeout=0, cookie=1,
+                               duration_sec=2, duration_nsec=2,
+                               packet_count=2, byte_count=2)
+            flow3 = flow_stats(table_id=0, match=match(), priority=20,
+                               idle_timeout=0, hard_timeout=0, cookie=1,
+                               duration_sec=1, duration_nsec=1,
+                               packet_count=1, byte_count=1)
+            if flow_stats is FlowStats04:
+                for flow in flow1, flow2, flow3:
+                    flow.flags = 0
+            for flow in flow1, flow2, flow3:
+                flow.length = flow.get_size()
+                flow.unpack(flow.pack())
+            self.assertEqual(flow_key(flow1), flow_key(flow2))
+            self.assertNotEqual(flow_key(flow1), flow_key(flow3))
+
+
+class TestFlowIdCache(unittest.TestCase):
+    """Test FlowIdCache."""
+
+    def setUp(self):
+        """Create a cache of 2 flows per switch."""
+        self.cache = FlowIdCache(max_size=2)
+
+    def test_get(self):
+        """Return cached ids per switch."""
+        self.assertIsNone(self.cache.get('dpid', b'a'))
+        self.cache.set('dpid', b'a', 'id_a')
+        self.assertEqual('id_a', self.cache.get('dpid', b'a'))
+        self.assertIsNone(self.cache.get('dpid2', b'a'))
+
+    def test_lru(self):
+        """The least recently used id should be evicted."""
+        self.cache.set('dpid', b'a', 'id_a')
+        self.cache.set('dpid', b'b', 'id_b')
+        self.cache.get('dpid', b'a')
+        self.cache.set('dpid', b'c', 'id_c')
+        self.assertEqual('id_a', self.cache.get('dpid', b'a'))
+        self.assertIsNone(self.cache.get('dpid', b'b'))
+
+    def test_retain(self):
+        """Removed flows should be forgotten."""
+        self.cache.set('dpid', b'a', 'id_a')
+        self.cache.set('dpid', b'b', 'id_b')
+        self.cache.retain('dpid', {b'b'})
+        self.assertEqual(1, self.cache.size('dpid'))
+        self.assertIsNone(self.cache.get('dpid', b'a'))
@@ -0,0 +1,49 @@
+"""Test FlowIndex."""
+import unittest
+from unittest.mock import MagicMock
+
+from napps.kytos.of_stats.flow_index import FlowIndex
+
+
+def get_flow(flow_id):
+    """Return a flow mock with the given id."""
+    flow = MagicMock()
+    flow.id = flow_id
+    return flow
+
+
+class TestFlowIndex(unittest.TestCase):
+    """Test FlowIndex."""
+
+    def setUp(self):
+        """Create a switch with two flows."""
+        self.index = FlowIndex()
+        self.switch = MagicMock()
+        self.switch.id = 'dpid'
+        self.switch.flows = [get_flow('a'), get_flow('b')]
+
+    def test_get(self):
+        """Flows should be indexed by id."""
+        index = self.index.get(self.switch)
+        self.assertIs(self.switch.flows[1], index['b'])
+        self.assertIs(index, self.index.get(self.switch))
+
+    def test_flows_changed(self):
+        """The index should be rebuilt when the flow list changes."""
+        self.index.get(self.switch)
+        self.switch.flows.append(get_flow('c'))
+        self.assertIn('c', self.index.get(self.switch))
+        self.switch.flows = [get_flow('d')]
+        self.assertEqual(['d'], list(self.index.get(self.switch)))
+
+    def test_remove(self):
+        """Removed flows should leave the index."""
+        self.index.get(self.switch)
+        self.index.remove('dpid', 'a')
+        self.assertEqual(['b'], list(self.index.get(self.switch)))
+
+    def test_invalidate(self):
+        """Invalidated indexes should be rebuilt."""
+        index = self.index.get(self.switch)
+        self.index.invalidate('dpid')
+        self.assertIsNot(index, self.index.get(self.switch))
@@ -0,0 +1,124 @@
+"""Test SpaceSaving and HeavyHitters."""
+import unittest
+
+from napps.kytos.of_stats.heavy_hitters import (HeavyHitters, OtherFlows,
+                                                SpaceSaving)
+
+
+class TestSpaceSaving(unittest.TestCase):
+    """Test SpaceSaving."""
+
+    def test_exact(self):
+        """Counts should be exact while there is room for all items."""
+        summary = SpaceSaving(3)
+        for item, weight in (('a', 5), ('b', 1), ('a', 2), ('c', 3)):
+            summary.add(item, weight)
+        self.assertEqual([('a', 7, 0), ('c', 3, 0), ('b', 1, 0)],
+                         summary.top())
+        self.assertEqual(11, summary.total)
+
+    def test_replace_minimum(self):
+        """A new item should replace the smallest one, inheriting its count."""
+        summary = SpaceSaving(2)
+        for item, weight in (('a', 10), ('b', 1), ('b', 2), ('c', 4)):
+            summary.add(item, weight)
+        self.assertEqual([('a', 10, 0), ('c', 7, 3)], summary.top())
+        self.assertNotIn('b', summary)
+
+    def test_heavy_items(self):
+        """Items with a large share of the stream should be found."""
+        summary = SpaceSaving(5)
+        for index in range(10000):
+            summary.add(f'mouse{index}', 1)
+            if index % 10 == 0:
+                summary.add('elephant', 100)
+        self.assertEqual('elephant', summary.top()[0][0])
+
+
+class TestHeavyHitters(unittest.TestCase):
+    """Test HeavyHitters."""
+
+    def setUp(self):
+        """Track the top 2 flows in 60-second windows."""
+        self.hitters = HeavyHitters(k=2, window=60)
+        self.hitters.update('dpid', {'f1': 1000, 'f2': 10, 'f3': 100}, 0)
+
+    def test_first_reply(self):
+        """There should be no top before bytes are counted."""
+        self.assertIsNone(self.hitters.update('dpid2', {'f1': 1000}, 0))
+        self.assertEqual(set(), self.hitters.update('dpid2', {'f1': 1000}, 1))
+
+    def test_deltas(self):
+        """Flows should be ranked by bytes counted since the first reply."""
+        top = self.hitters.update('dpid', {'f1': 1010, 'f2': 510,
+                                           'f3': 200}, 10)
+        self.assertEqual({'f2', 'f3'}, top)
+        result = self.hitters.top('dpid')
+        self.assertEqual(['f2', 'f3'],
+                         [flow['flow_id'] for flow in result['flows']])
+        self.assertEqual(10, result['other_bytes'])
+
+    def test_new_flow(self):
+        """New flows should count all their bytes."""
+        top = self.hitters.update('dpid', {'f1': 1000, 'f2': 10, 'f3': 100,
+                                           'f4': 50}, 10)
+        self.assertEqual({'f4'}, top)
+
+    def test_window(self):
+        """Counts should restart when the window closes."""
+        self.hitters.update('dpid', {'f1': 2000, 'f2': 10, 'f3': 100}, 10)
+        self.hitters.update('dpid', {'f1': 2000, 'f2': 20, 'f3': 100}, 70)
+        result = self.hitters.top('dpid')
+        self.assertEqual(70, result['window_start'])
+        self.assertEqual([{'flow_id': 'f2', 'bytes': 10, 'error': 0}],
+                         result['flows'])
+
+    def test_forget(self):
+        """Disconnected switches should be forgotten."""
+        self.hitters.forget('dpid')
+        self.assertIsNone(self.hitters.top('dpid'))
+
+
+class TestOtherFlows(unittest.TestCase):
+    """Test OtherFlows."""
+
+    def setUp(self):
+        """Keep the counters of a first reply."""
+        self.other = OtherFlows()
+        self.assertIsNone(self.other.update(
+            'dpid', [('f1', 10, 1000), ('f2', 1, 100), ('f3', 2, 200)],
+            {'f1'}, 0))
+
+    def test_rates(self):
+        """Only what the other flows counted since then should be saved."""
+        rates = self.other.update(
+            'dpid', [('f1', 20, 2000), ('f2', 3, 300), ('f3', 2, 200)],
+            {'f1'}, 10)
+        self.assertEqual({'packets_per_sec': 0.2, 'bytes_per_sec': 20},
+                         rates)
+
+    def test_top_changes(self):
+        """Flows leaving the top should not make the rates jump."""
+        rates = self.other.update(
+            'dpid', [('f1', 10, 1000), ('f2', 1, 100), ('f3', 12, 1200)],
+            {'f3'}, 10)
+        self.assertEqual({'packets_per_sec': 0, 'bytes_per_sec': 0}, rates)
+
+    def test_new_flow(self):
+        """New flows should count all their packets and bytes."""
+        rates = self.other.update(
+            'dpid', [('f1', 10, 1000), ('f2', 1, 100), ('f3', 2, 200),
+                     ('f4', 5, 50)], {'f1'}, 10)
+        self.assertEqual({'packets_per_sec': 0.5, 'bytes_per_sec': 5},
+                         rates)
+
+    def test_no_top(self):
+        """Without a top, all flows are in it."""
+        rates = self.other.update('dpid', [('f1', 20, 2000)], None, 10)
+        self.assertEqual({'packets_per_sec': 0, 'bytes_per_sec': 0}, rates)
+
+    def test_forget(self):
+        """Forgotten switches should start again without rates."""
+        self.other.forget('dpid')
+        self.assertIsNone(self.other.update('dpid', [('f1', 20, 2000)],
+                                            set(), 10))
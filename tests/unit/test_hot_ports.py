@@ -0,0 +1,80 @@
+"""Test HotPorts."""
+import logging
+import unittest
+from pathlib import Path
+from unittest.mock import mock_open, patch  # noqa (isort conflict)
+
+from napps.kytos.of_stats.hot_ports import HotPorts
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+class TestHotPorts(unittest.TestCase):
+    """Test HotPorts."""
+
+    def setUp(self):
+        """Path().exists() mock."""
+        patcher = patch.object(Path, 'exists', return_value=True)
+        self.file_exists = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def set_file_content(self, content):
+        """Mock for the user configuration file."""
+        open_method = mock_open(read_data=content)
+        patcher = patch.object(Path, 'open', open_method)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_no_file(self):
+        """No port should be polled without user file."""
+        self.file_exists.return_value = False
+        self.assertEqual([], HotPorts().due('dpid', 100))
+
+    def test_intervals(self):
+        """Ports should be polled at their own or the default interval."""
+        self.set_file_content('{"default": 2, "dpid": {"1": null, "2": 5}}')
+        hot_ports = HotPorts(default_interval=1)
+        self.assertEqual([1, 2], hot_ports.due('dpid', 100))
+        self.assertEqual([], hot_ports.due('dpid', 101))
+        self.assertEqual([1], hot_ports.due('dpid', 102))
+        self.assertEqual([1, 2], hot_ports.due('dpid', 105))
+        self.assertEqual([], hot_ports.due('other', 105))
+
+    def test_list(self):
+        """A list of ports should use the setting interval."""
+        self.set_file_content('{"dpid": [3, 4]}')
+        hot_ports = HotPorts(default_interval=10)
+        self.assertEqual([3, 4], hot_ports.due('dpid', 100))
+        self.assertEqual([], hot_ports.due('dpid', 109))
+        self.assertEqual([3, 4], hot_ports.due('dpid', 110))
+
+    def test_missed_polls(self):
+        """Missed polls should not be sent in a burst."""
+        self.set_file_content('{"dpid": [1]}')
+        hot_ports = HotPorts(default_interval=1)
+        self.assertEqual([1], hot_ports.due('dpid', 100))
+        self.assertEqual([1], hot_ports.due('dpid', 110))
+        self.assertEqual([], hot_ports.due('dpid', 110.5))
+
+    def test_forget(self):
+        """A reconnected switch should be polled right away."""
+        self.set_file_content('{"dpid": {"1": 60}}')
+        hot_ports = HotPorts()
+        hot_ports.due('dpid', 100)
+        hot_ports.forget('dpid')
+        self.assertEqual([1], hot_ports.due('dpid', 101))
+
+    @patch('napps.kytos.of_stats.watched_file.WatchedFile._get_mtime')
+    def test_refresh(self, get_mtime):
+        """Changes should be loaded and invalid files ignored."""
+        get_mtime.return_value = 1
+        self.set_file_content('{"dpid": [1]}')
+        hot_ports = HotPorts(check_interval=5)
+        self.set_file_content('{"dpid": ["a"]}')
+        get_mtime.return_value = 2
+        hot_ports.refresh(hot_ports._file._checked_at + 5)
+        self.assertEqual([1], hot_ports.due('dpid', 100))
+        self.set_file_content('{"dpid": [2]}')
+        get_mtime.return_value = 3
+        hot_ports.refresh(hot_ports._file._checked_at + 5)
+        self.assertEqual([2], hot_ports.due('dpid', 100))
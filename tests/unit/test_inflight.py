@@ -0,0 +1,65 @@
+"""Test InFlightTracker."""
+import unittest
+
+from napps.kytos.of_stats.inflight import InFlightTracker
+
+
+class TestInFlightTracker(unittest.TestCase):
+    """Test InFlightTracker."""
+
+    def setUp(self):
+        """Create a tracker with a 10-second timeout."""
+        self.tracker = InFlightTracker(timeout=10)
+
+    def test_skip_outstanding(self):
+        """A new request should wait for the reply of the previous one."""
+        self.assertTrue(self.tracker.can_request('dpid', 'port', now=0))
+        self.tracker.sent('dpid', 'port', 42, now=0)
+        self.assertFalse(self.tracker.can_request('dpid', 'port', now=5))
+        self.assertTrue(self.tracker.can_request('dpid', 'flow', now=5))
+        self.assertTrue(self.tracker.can_request('dpid2', 'port', now=5))
+
+    def test_reply(self):
+        """A reply should release the switch and record the latency."""
+        self.tracker.sent('dpid', 'port', 42, now=0)
+        self.assertEqual(('port', None),
+                         self.tracker.received('dpid', 42, now=2))
+        self.assertTrue(self.tracker.can_request('dpid', 'port', now=3))
+        latency = self.tracker.latencies()['dpid']['port']
+        self.assertEqual(1, latency['count'])
+        self.assertEqual(2, latency['last'])
+
+    def test_filtered_reply(self):
+        """Replies should be matched to the request of their filter."""
+        flow, web = object(), object()
+        self.tracker.sent('dpid', 'flow', 42, now=0, stats=flow)
+        self.tracker.sent('dpid', 'flow.web', 43, now=0, stats=web)
+        self.assertEqual(('flow.web', web),
+                         self.tracker.received('dpid', 43, now=1))
+        self.assertTrue(self.tracker.is_outstanding('dpid', 42))
+        self.assertFalse(self.tracker.can_request('dpid', 'flow', now=1))
+        self.assertEqual(('flow', flow),
+                         self.tracker.received('dpid', 42, now=1))
+
+    def test_unknown_reply(self):
+        """Replies to requests of other NApps should be ignored."""
+        self.tracker.sent('dpid', 'port', 42, now=0)
+        self.assertIsNone(self.tracker.received('dpid', 43, now=1))
+        self.assertIsNone(self.tracker.received('dpid2', 42, now=1))
+        self.assertTrue(self.tracker.is_outstanding('dpid', 42))
+
+    def test_timeout(self):
+        """Requests without reply should time out."""
+        self.tracker.sent('dpid', 'port', 42, now=0)
+        self.assertTrue(self.tracker.can_request('dpid', 'port', now=10))
+        self.assertFalse(self.tracker.is_outstanding('dpid', 42))
+        self.assertIsNone(self.tracker.received('dpid', 42, now=11))
+        latency = self.tracker.latencies()['dpid']['port']
+        self.assertEqual(1, latency['timeouts'])
+        self.assertEqual(0, latency['count'])
+
+    def test_forget(self):
+        """Outstanding requests of a switch should be discarded."""
+        self.tracker.sent('dpid', 'port', 42, now=0)
+        self.tracker.forget('dpid')
+        self.assertTrue(self.tracker.can_request('dpid', 'port', now=1))
@@ -0,0 +1,228 @@
+"""Test how Main handles stats replies and events."""
+import re
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from pyof.foundation.basic_types import UBInt64
+
+from napps.kytos.of_stats import settings
+from napps.kytos.of_stats.benchmarks.replies import advance, get_replies
+from napps.kytos.of_stats.benchmarks.stubs import (StubController, StubSwitch,
+                                                   expect_reply, get_event,
+                                                   get_stats_type)
+
+try:
+    from napps.kytos.of_stats.main import Main
+except ImportError:
+    # kytos/of_core is only installed with the controller
+    Main = None
+
+DPID = '00:00:00:00:00:00:00:01'
+
+
+@unittest.skipIf(Main is None, 'kytos/of_core is not installed')
+class TestListen(unittest.TestCase):
+    """Test that replies reach the stats of their request."""
+
+    def setUp(self):
+        """Create the NApp with a flow filter and triggered polls."""
+        patches = [patch.object(settings, 'FLOW_STATS_FILTERS',
+                                [{'name': 'web', 'table_id': 1}]),
+                   patch.object(settings, 'TRIGGERED_POLLS', True)]
+        for setting in patches:
+            setting.start()
+            self.addCleanup(setting.stop)
+        self.controller = StubController()
+        self.controller.buffers.msg_out = MagicMock()
+        self.napp = Main(self.controller)
+        self.switch = StubSwitch(DPID, 0x04, ports=2)
+        self.controller.switches[DPID] = self.switch
+        # pylint: disable=protected-access
+        self.stats = self.napp._stats_by_name
+        for stats in self.stats.values():
+            listen = patch.object(stats, 'listen', return_value=None)
+            listen.start()
+            self.addCleanup(listen.stop)
+
+    def sent_xids(self):
+        """Return the xids of the requests put in the buffer."""
+        put = self.controller.buffers.msg_out.put
+        xids = [call[0][0].content['message'].header.xid
+                for call in put.call_args_list]
+        put.reset_mock()
+        return xids
+
+    def reply(self, kind, xid):
+        """Handle the reply to a request."""
+        for message in get_replies(0x04, kind, 2, xid):
+            self.napp._listen(  # pylint: disable=protected-access
+                get_event(self.switch, message), get_stats_type(message))
+
+    def assert_handled(self, name, request_name):
+        """Check the reply was processed once, by the stats named ``name``."""
+        for stats_name, stats in self.stats.items():
+            self.assertEqual(int(stats_name == name),
+                             stats.listen.call_count, stats_name)
+            stats.listen.reset_mock()
+        latency = self.napp._inflight.latencies()[DPID][request_name]
+        self.assertEqual(1, latency['count'])
+
+    def test_regular(self):
+        """Replies to regular polls should reach their stats type."""
+        # pylint: disable=protected-access
+        self.napp._update_stats(self.switch, ['port'], 0)
+        self.reply('port', *self.sent_xids())
+        self.assert_handled('port', 'port')
+
+    def test_filtered(self):
+        """Filtered flow replies should reach their own flow stats."""
+        # pylint: disable=protected-access
+        self.napp._update_stats(self.switch, ['flow.web'], 0)
+        self.reply('flow', *self.sent_xids())
+        self.assert_handled('flow.web', 'flow.web')
+
+    def test_single_port(self):
+        """Single-port replies should reach the port stats."""
+        # pylint: disable=protected-access
+        self.napp._request(self.switch, self.stats['port'], 'port.2', 0,
+                           port_no=2)
+        self.reply('port', *self.sent_xids())
+        self.assert_handled('port', 'port.2')
+
+    def test_triggered(self):
+        """Replies to triggered polls should reach their stats type."""
+        # pylint: disable=protected-access
+        self.napp._triggers.trigger(DPID, 'flow', 0)
+        self.napp._send_triggered(settings.TRIGGER_DEBOUNCE)
+        self.reply('flow', *self.sent_xids())
+        self.assert_handled('flow', 'flow.triggered')
+
+    def test_reply_before_send_returns(self):
+        """A reply handled while the request is being sent should count."""
+        def reply(event):
+            self.reply('port', event.content['message'].header.xid)
+
+        self.controller.buffers.msg_out.put.side_effect = reply
+        # pylint: disable=protected-access
+        self.napp._update_stats(self.switch, ['port'], 0)
+        self.assert_handled('port', 'port')
+
+    def test_unknown_xid(self):
+        """Replies to requests of other NApps should be dropped."""
+        self.reply('flow', 1234)
+        for stats in self.stats.values():
+            stats.listen.assert_not_called()
+
+
+@unittest.skipIf(Main is None, 'kytos/of_core is not installed')
+class TestFlowMods(unittest.TestCase):
+    """Test the polls triggered by flow mods."""
+
+    def test_flow_manager_flow_mod(self):
+        """Flow mods sent by kytos/flow_manager should trigger a poll."""
+        name = 'kytos/flow_manager.messages.out.ofpt_flow_mod'
+        self.assertTrue(any(re.match(pattern, name)
+                            for pattern in Main.on_flow_mod.events))
+        self.assertFalse(any(
+            re.match(pattern, 'kytos/of_core.v0x04.messages.in.ofpt_flow_mod')
+            for pattern in Main.on_flow_mod.events))
+        with patch.object(settings, 'TRIGGERED_POLLS', True):
+            napp = Main(StubController())
+        switch = StubSwitch(DPID, 0x04)
+        event = SimpleNamespace(name=name, content={
+            'destination': switch.connection, 'message': None})
+        # listen_to runs the handler in a new thread
+        with patch('kytos.core.helpers.Thread') as thread:
+            napp.on_flow_mod(event)
+        kwargs = thread.call_args[1]
+        kwargs['target'](*kwargs['args'])
+        # pylint: disable=protected-access
+        due = napp._triggers.due(time.time() + settings.TRIGGER_DEBOUNCE)
+        self.assertEqual([(DPID, 'flow', None)], due)
+
+
+@unittest.skipIf(Main is None, 'kytos/of_core is not installed')
+class TestFlowDumps(unittest.TestCase):
+    """Test full flow dumps decided by aggregate stats."""
+
+    def setUp(self):
+        """Create the NApp with tiered flow stats."""
+        with patch.object(settings, 'TIERED_FLOW_STATS', True):
+            self.controller = StubController()
+            self.controller.buffers.msg_out = MagicMock()
+            self.napp = Main(self.controller)
+        self.switch = StubSwitch(DPID, 0x04)
+        # pylint: disable=protected-access
+        self.totals = self.napp._stats_by_name['aggregate'].totals
+
+    def flow_requests(self, now):
+        """Poll the flow stats and return how many requests were sent."""
+        put = self.controller.buffers.msg_out.put
+        put.reset_mock()
+        # pylint: disable=protected-access
+        self.napp._update_stats(self.switch, ['flow'], now)
+        return put.call_count
+
+    def test_outstanding_dump(self):
+        """A dump skipped while a request is unanswered should be retried."""
+        self.totals[DPID] = (1, 100, 1)
+        self.assertEqual(1, self.flow_requests(0))
+        self.totals[DPID] = (2, 200, 1)
+        # The previous dump is still in flight
+        self.assertEqual(0, self.flow_requests(1))
+        # pylint: disable=protected-access
+        self.napp._inflight.forget(DPID)
+        self.assertEqual(1, self.flow_requests(2))
+        self.napp._inflight.forget(DPID)
+        # Unchanged since the last dump
+        self.assertEqual(0, self.flow_requests(3))
+
+    def test_forget(self):
+        """Totals of removed switches should be discarded."""
+        self.totals[DPID] = (1, 100, 1)
+        self.napp._forget_switch(DPID)  # pylint: disable=protected-access
+        self.assertNotIn(DPID, self.totals)
+
+
+@unittest.skipIf(Main is None, 'kytos/of_core is not installed')
+class TestTopFlows(unittest.TestCase):
+    """Test saving only the top flows."""
+
+    def setUp(self):
+        """Create the NApp keeping the top flow of each switch."""
+        patches = [patch.object(settings, 'FLOW_TOP_K', 1),
+                   patch.object(settings, 'FLOW_TOP_K_ONLY', True)]
+        for setting in patches:
+            setting.start()
+            self.addCleanup(setting.stop)
+        self.controller = StubController()
+        self.controller.buffers.app = MagicMock()
+        self.controller.buffers.app.qsize.return_value = 0
+        self.napp = Main(self.controller)
+        self.switch = StubSwitch(DPID, 0x04)
+        self.messages = get_replies(0x04, 'flow', 3)
+
+    def saved_namespaces(self):
+        """Handle the flow stats reply and return the saved namespaces."""
+        put = self.controller.buffers.app.put
+        put.reset_mock()
+        for message in self.messages:
+            expect_reply(self.napp, self.switch, message)
+            self.napp._listen(  # pylint: disable=protected-access
+                get_event(self.switch, message), get_stats_type(message))
+        return {call[0][0].content['namespace']
+                for call in put.call_args_list}
+
+    def test_first_reply(self):
+        """All flows should be saved until the top is known."""
+        namespaces = self.saved_namespaces()
+        self.assertEqual(3, len(namespaces))
+        self.assertFalse(any(namespace.endswith('.other')
+                             for namespace in namespaces))
+        advance(self.messages, 'flow', 1)
+        self.messages[0].body[1].byte_count = UBInt64(1000)
+        namespaces = self.saved_namespaces()
+        self.assertEqual(2, len(namespaces))
+        self.assertIn(f'kytos.kronos.{DPID}.flow_id.other', namespaces)
@@ -0,0 +1,69 @@
+"""Test Metrics."""
+import unittest
+
+from napps.kytos.of_stats.metrics import Histogram, Metrics
+
+
+class TestHistogram(unittest.TestCase):
+    """Test Histogram."""
+
+    def test_cumulative(self):
+        """Buckets should count observations up to their bound."""
+        hist = Histogram()
+        for value in (0.0001, 0.001, 0.002, 100):
+            hist.observe(value)
+        buckets = dict(hist.cumulative())
+        self.assertEqual(1, buckets[0.0005])
+        self.assertEqual(2, buckets[0.001])
+        self.assertEqual(3, buckets[0.0025])
+        self.assertEqual(3, buckets[60])
+        self.assertEqual(4, buckets[float('inf')])
+        self.assertEqual(4, hist.count)
+        self.assertAlmostEqual(100.0031, hist.sum)
+
+
+class TestMetrics(unittest.TestCase):
+    """Test Metrics."""
+
+    def setUp(self):
+        """Create metrics with a poll of a switch."""
+        self.metrics = Metrics()
+        self.metrics.poll_started('dpid', 'port', 10)
+        self.metrics.count('dpid', 'port', 'entries_processed', 48)
+        self.metrics.observe('dpid', 'port', 'processing_seconds', 0.02)
+        self.metrics.poll_finished('dpid', 'port', 12)
+
+    def test_as_dict(self):
+        """Metrics should be grouped by switch and stats type."""
+        port = self.metrics.as_dict()['dpid']['port']
+        self.assertEqual(1, port['requests_sent'])
+        self.assertEqual(48, port['entries_processed'])
+        self.assertEqual(1, port['processing_seconds']['count'])
+        self.assertEqual(2, port['poll_cycle_seconds']['sum'])
+
+    def test_poll_finished_without_request(self):
+        """Replies to requests of other NApps have no poll cycle."""
+        self.metrics.poll_finished('dpid', 'flow', 12)
+        self.assertNotIn('flow', self.metrics.as_dict()['dpid'])
+
+    def test_forget(self):
+        """Disconnected switches should not finish their poll cycle."""
+        self.metrics.poll_started('dpid', 'port', 20)
+        self.metrics.forget('dpid')
+        self.metrics.poll_finished('dpid', 'port', 30)
+        cycles = self.metrics.as_dict()['dpid']['port']['poll_cycle_seconds']
+        self.assertEqual(1, cycles['count'])
+
+    def test_prometheus(self):
+        """Metrics should be in the Prometheus text format."""
+        lines = self.metrics.prometheus().splitlines()
+        self.assertIn('# TYPE kytos_of_stats_requests_sent_total counter',
+                      lines)
+        self.assertIn('kytos_of_stats_requests_sent_total{dpid="dpid",'
+                      'stats_type="port"} 1', lines)
+        self.assertIn('kytos_of_stats_processing_seconds_bucket{dpid="dpid",'
+                      'stats_type="port",le="0.025"} 1', lines)
+        self.assertIn('kytos_of_stats_processing_seconds_bucket{dpid="dpid",'
+                      'stats_type="port",le="+Inf"} 1', lines)
+        self.assertIn('kytos_of_stats_poll_cycle_seconds_count{dpid="dpid",'
+                      'stats_type="port"} 1', lines)
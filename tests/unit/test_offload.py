@@ -0,0 +1,90 @@
+"""Test FlowStatsOffloader."""
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from napps.kytos.of_stats.offload import FlowStatsOffloader
+
+
+class TestFlowStatsOffloader(unittest.TestCase):
+    """Test FlowStatsOffloader in thread mode."""
+
+    def setUp(self):
+        """Create an offloader with a single thread."""
+        self.offloader = FlowStatsOffloader('thread', workers=1,
+                                            min_entries=2)
+        self.stats = MagicMock()
+        self.stats.name = 'flow'
+        self.switch = MagicMock(id='dpid')
+
+    def tearDown(self):
+        """Stop the pool."""
+        self.offloader.shutdown()
+
+    def test_should_offload(self):
+        """Only large replies should be offloaded."""
+        self.assertFalse(self.offloader.should_offload([1]))
+        self.assertTrue(self.offloader.should_offload([1, 2]))
+
+    def test_submit(self):
+        """The reply should be processed and ``done`` called."""
+        self.stats.listen.return_value = 0.5
+        done = MagicMock()
+        future = self.offloader.submit(self.stats, self.switch, [1, 2], done)
+        future.result(timeout=5)
+        self.stats.listen.assert_called_once_with(self.switch, [1, 2])
+        self.assertEqual(0.5, done.call_args[0][0])
+
+    def test_forget(self):
+        """Replies of forgotten switches should not be tracked."""
+        self.offloader.submit(self.stats, self.switch, [1, 2]).result(5)
+        other = MagicMock(id='other')
+        self.offloader.submit(self.stats, other, [1, 2]).result(5)
+        self.offloader.forget('dpid')
+        # pylint: disable=protected-access
+        self.assertEqual([('other', 'flow')], list(self.offloader._applied))
+        self.offloader.submit(self.stats, self.switch, [1, 2]).result(5)
+        self.assertEqual(3, self.stats.listen.call_count)
+
+    def test_out_of_order(self):
+        """An older reply applied after a newer one should be discarded."""
+        # pylint: disable=protected-access
+        late = self.offloader.submit(self.stats, self.switch, [1])
+        late.result(timeout=5)
+        # A newer reply than the next one was already applied
+        lock, _ = self.offloader._applied[('dpid', 'flow')]
+        self.offloader._applied[('dpid', 'flow')] = (lock, 100)
+        late = self.offloader.submit(self.stats, self.switch, [2])
+        late.result(timeout=5)
+        self.assertEqual(1, self.stats.listen.call_count)
+
+    def test_shutdown(self):
+        """Pending replies should be discarded unless waiting for them."""
+        started, release = threading.Event(), threading.Event()
+
+        def listen(*_):
+            started.set()
+            release.wait(5)
+
+        self.stats.listen.side_effect = listen
+        running = self.offloader.submit(self.stats, self.switch, [1])
+        started.wait(5)
+        pending = self.offloader.submit(self.stats, self.switch, [2])
+        self.offloader.shutdown()
+        release.set()
+        running.result(timeout=5)
+        self.assertTrue(pending.cancelled())
+        self.assertEqual(1, self.stats.listen.call_count)
+
+    def test_shutdown_wait(self):
+        """Pending replies should be processed before stopping."""
+        for entries in [1], [2]:
+            self.offloader.submit(self.stats, self.switch, entries)
+        self.offloader.shutdown(wait=True)
+        self.assertEqual(2, self.stats.listen.call_count)
+
+    def test_invalid_mode(self):
+        """Unknown modes and the removed process mode should be rejected."""
+        for mode in 'fork', 'process':
+            with self.assertRaises(ValueError):
+                FlowStatsOffloader(mode, 1, 1)
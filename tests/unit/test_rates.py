@@ -0,0 +1,108 @@
+"""Test PortRates."""
+import unittest
+from unittest.mock import MagicMock
+
+from napps.kytos.of_stats.rates import PortRates, counter_delta
+
+
+class TestCounterDelta(unittest.TestCase):
+    """Test counter_delta."""
+
+    def test_increase(self):
+        """Return the difference when the counter increases."""
+        self.assertEqual(10, counter_delta(5, 15))
+
+    def test_wrap(self):
+        """Consider wraps of 64 and 32-bit counters."""
+        self.assertEqual(15, counter_delta(2**64 - 5, 10))
+        self.assertEqual(15, counter_delta(2**32 - 5, 10))
+
+    def test_reset(self):
+        """Return None when the counter was reset."""
+        self.assertIsNone(counter_delta(1000, 10))
+
+
+def get_interface(custom_speed=None, of_speed=None):
+    """Return an interface mock with the given speeds."""
+    return MagicMock(**{'get_custom_speed.return_value': custom_speed,
+                        'get_of_features_speed.return_value': of_speed})
+
+
+class TestPortRates(unittest.TestCase):
+    """Test PortRates."""
+
+    def setUp(self):
+        """Create PortRates without user-defined speeds."""
+        self.user_speed = MagicMock()
+        self.user_speed.get_speed.return_value = None
+        self.rates = PortRates(self.user_speed)
+
+    def test_first_sample(self):
+        """There are no rates for the first sample."""
+        self.assertEqual({}, self.rates.update('dpid', 1, (0,) * 6, 0))
+
+    def test_rates(self):
+        """Rates and utilization should be computed."""
+        interface = get_interface(of_speed=100)
+        self.rates.update('dpid', 1, (0, 0, 0, 0, 0, 0), 0, interface)
+        rates = self.rates.update('dpid', 1, (100, 200, 10, 0, 0, 20), 10,
+                                  interface)
+        self.assertEqual(10, rates['rx_bytes_per_sec'])
+        self.assertEqual(20, rates['tx_bytes_per_sec'])
+        self.assertEqual(1, rates['rx_dropped_per_sec'])
+        self.assertEqual(2, rates['tx_errors_per_sec'])
+        self.assertEqual(0.1, rates['rx_utilization'])
+        self.assertEqual(0.2, rates['tx_utilization'])
+
+    def test_user_speed(self):
+        """User-defined speeds should override the OpenFlow speed."""
+        self.user_speed.get_speed.return_value = 20
+        interface = get_interface(of_speed=100)
+        self.rates.update('dpid', 1, (0,) * 6, 0, interface)
+        rates = self.rates.update('dpid', 1, (100,) * 6, 10, interface)
+        self.assertEqual(0.5, rates['rx_utilization'])
+
+    def test_user_speed_first(self):
+        """The OpenFlow speed should not be read if the user defined one."""
+        self.user_speed.get_speed.return_value = 20
+        interface = get_interface(of_speed=100)
+        self.rates.update('dpid', 1, (0,) * 6, 0, interface)
+        self.rates.update('dpid', 1, (100,) * 6, 10, interface)
+        interface.get_of_features_speed.assert_not_called()
+
+    def test_custom_speed(self):
+        """Custom speeds of the interface should override the others."""
+        self.user_speed.get_speed.return_value = 20
+        interface = get_interface(custom_speed=40, of_speed=100)
+        self.rates.update('dpid', 1, (0,) * 6, 0, interface)
+        rates = self.rates.update('dpid', 1, (100,) * 6, 10, interface)
+        self.assertEqual(0.25, rates['rx_utilization'])
+        self.user_speed.get_speed.assert_not_called()
+
+    def test_no_speed(self):
+        """There is no utilization without speed."""
+        self.rates.update('dpid', 1, (0,) * 6, 0)
+        rates = self.rates.update('dpid', 1, (100,) * 6, 10)
+        self.assertNotIn('rx_utilization', rates)
+
+    def test_reset(self):
+        """There are no rates after a counter reset."""
+        self.rates.update('dpid', 1, (1000,) * 6, 0)
+        self.assertEqual({}, self.rates.update('dpid', 1, (10,) * 6, 10))
+        rates = self.rates.update('dpid', 1, (20,) * 6, 20)
+        self.assertEqual(1, rates['rx_bytes_per_sec'])
+
+    def test_ports_are_independent(self):
+        """Each (dpid, port) should have its own previous sample."""
+        self.rates.update('dpid', 1, (0,) * 6, 0)
+        self.rates.update('dpid', 2, (50,) * 6, 0)
+        self.rates.update('dpid2', 1, (70,) * 6, 0)
+        rates = self.rates.update('dpid', 2, (100,) * 6, 10)
+        self.assertEqual(5, rates['rx_bytes_per_sec'])
+
+    def test_forget(self):
+        """Slots of a forgotten switch should be reused."""
+        self.rates.update('dpid', 1, (0,) * 6, 0)
+        self.rates.forget('dpid')
+        self.assertEqual({}, self.rates.update('dpid2', 1, (100,) * 6, 10))
+        self.assertEqual({}, self.rates.update('dpid', 1, (100,) * 6, 10))
@@ -0,0 +1,60 @@
+"""Test ReplyReassembler."""
+import logging
+import unittest
+
+from napps.kytos.of_stats.reassembly import ReplyReassembler
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+class TestReplyReassembler(unittest.TestCase):
+    """Test ReplyReassembler."""
+
+    def setUp(self):
+        """Create a reassembler."""
+        self.reassembler = ReplyReassembler(max_pending=2, max_entries=5,
+                                            timeout=10)
+
+    def test_single_message(self):
+        """A reply without REPLY_MORE should be returned as is."""
+        body = [1, 2]
+        self.assertIs(body, self.reassembler.add('dpid', 1, body, False))
+
+    def test_fragments(self):
+        """Fragments should be joined when the last one arrives."""
+        self.assertIsNone(self.reassembler.add('dpid', 1, [1, 2], True, 0))
+        self.assertIsNone(self.reassembler.add('dpid', 2, [9], True, 0))
+        self.assertIsNone(self.reassembler.add('dpid', 1, [3], True, 1))
+        self.assertEqual([1, 2, 3, 4],
+                         self.reassembler.add('dpid', 1, [4], False, 2))
+        self.assertEqual(1, self.reassembler.pending())
+
+    def test_max_entries(self):
+        """Replies that are too large should be discarded."""
+        self.reassembler.add('dpid', 1, [1, 2, 3], True, 0)
+        self.assertIsNone(self.reassembler.add('dpid', 1, [4, 5, 6], True, 0))
+        self.assertEqual(0, self.reassembler.pending())
+        self.assertIsNone(self.reassembler.add('dpid', 1, [7], False, 0))
+
+    def test_max_pending(self):
+        """The oldest partial reply should be evicted."""
+        self.reassembler.add('dpid', 1, [1], True, 0)
+        self.reassembler.add('dpid', 2, [2], True, 0)
+        self.reassembler.add('dpid', 3, [3], True, 0)
+        self.assertEqual(2, self.reassembler.pending())
+        # The rest of the evicted reply is incomplete
+        self.assertIsNone(self.reassembler.add('dpid', 1, [4], False, 0))
+
+    def test_timeout(self):
+        """Stale partial replies should be discarded."""
+        self.reassembler.add('dpid', 1, [1], True, 0)
+        self.assertIsNone(self.reassembler.add('dpid', 1, [2], False, 10))
+        self.assertEqual(0, self.reassembler.pending())
+
+    def test_late_fragment(self):
+        """Fragments after the last one should be dropped."""
+        self.reassembler.add('dpid', 1, [1], True, 0)
+        self.reassembler.add('dpid', 1, [2], False, 0)
+        self.assertIsNone(self.reassembler.add('dpid', 1, [3], True, 0))
+        self.assertIsNone(self.reassembler.add('dpid', 1, [4], False, 0))
+        self.assertEqual(0, self.reassembler.pending())
@@ -0,0 +1,57 @@
+"""Test Rollups."""
+import unittest
+
+from napps.kytos.of_stats.rollups import Rollups
+
+
+class TestRollups(unittest.TestCase):
+    """Test Rollups."""
+
+    def setUp(self):
+        """Create 1-minute and 5-minute tiers."""
+        self.rollups = Rollups({'5m': 300, '1m': 60})
+
+    def test_window(self):
+        """A window should be saved when a later sample arrives."""
+        for timestamp, rate in ((0, 10), (20, 30), (40, 20)):
+            self.assertEqual([], self.rollups.add('ns', {'rx': rate},
+                                                  timestamp))
+        samples = self.rollups.add('ns', {'rx': 5}, 60)
+        self.assertEqual([('ns.rollup_1m',
+                           {'start': 0, 'samples': 3, 'rx_min': 10,
+                            'rx_max': 30, 'rx_avg': 20, 'rx_last': 20})],
+                         samples)
+
+    def test_counters(self):
+        """Rates should be computed from counters."""
+        self.rollups.add_counters('ns', {'bytes': 0}, 0)
+        self.rollups.add_counters('ns', {'bytes': 100}, 10)
+        self.rollups.add_counters('ns', {'bytes': 400}, 20)
+        samples = self.rollups.add_counters('ns', {'bytes': 400}, 60)
+        self.assertEqual(1, len(samples))
+        value = samples[0][1]
+        self.assertEqual(2, value['samples'])
+        self.assertEqual(10, value['bytes_per_sec_min'])
+        self.assertEqual(30, value['bytes_per_sec_max'])
+
+    def test_counter_reset(self):
+        """Counter resets should not create samples."""
+        self.rollups.add_counters('ns', {'bytes': 100}, 0)
+        self.rollups.add_counters('ns', {'bytes': 10}, 10)
+        self.assertEqual([], self.rollups.expire(1000))
+
+    def test_expire(self):
+        """Windows without new samples should be closed."""
+        self.rollups.add('ns', {'rx': 1}, 10)
+        self.assertEqual([], self.rollups.expire(59))
+        self.assertEqual(['ns.rollup_1m'],
+                         [name for name, _ in self.rollups.expire(60)])
+        self.assertEqual(['ns.rollup_5m'],
+                         [name for name, _ in self.rollups.expire(300)])
+
+    def test_new_fields(self):
+        """Windows should be closed when the fields change."""
+        self.rollups.add('ns', {'rx': 1}, 0)
+        samples = self.rollups.add('ns', {'rx': 1, 'util': 0.5}, 10)
+        self.assertEqual(['ns.rollup_1m', 'ns.rollup_5m'],
+                         [name for name, _ in samples])
@@ -0,0 +1,67 @@
+"""Test PollScheduler."""
+import unittest
+
+from napps.kytos.of_stats.scheduler import PollScheduler
+
+
+class TestPollScheduler(unittest.TestCase):
+    """Test PollScheduler."""
+
+    def test_phase_is_stable(self):
+        """The phase of a dpid should not change and be inside interval."""
+        phase = PollScheduler.phase('00:00:00:00:00:00:00:01', 60)
+        self.assertEqual(phase,
+                         PollScheduler.phase('00:00:00:00:00:00:00:01', 60))
+        self.assertTrue(0 <= phase < 60)
+
+    def test_polls_are_spread(self):
+        """Switches should be polled at different moments of the interval."""
+        scheduler = PollScheduler({'port': 60})
+        dpids = [f'00:00:00:00:00:00:00:{i:02x}' for i in range(100)]
+        first_polls = {}
+        for second in range(121):
+            for dpid in dpids:
+                if scheduler.due(dpid, second) and dpid not in first_polls:
+                    first_polls[dpid] = second
+        self.assertEqual(100, len(first_polls))
+        self.assertGreater(len(set(first_polls.values())), 30)
+
+    def test_interval_per_type(self):
+        """Each stats type should be polled at its own interval."""
+        scheduler = PollScheduler({'port': 10, 'flow': 60})
+        polls = {'port': 0, 'flow': 0}
+        for second in range(600):
+            for name in scheduler.due('dpid', second):
+                polls[name] += 1
+        self.assertEqual(60, polls['port'])
+        self.assertEqual(10, polls['flow'])
+
+    def test_late_tick(self):
+        """Missed slots should result in a single poll."""
+        scheduler = PollScheduler({'port': 10})
+        scheduler.due('dpid', 0)
+        self.assertEqual(['port'], scheduler.due('dpid', 1000))
+        self.assertEqual([], scheduler.due('dpid', 1000.5))
+
+    def test_jitter(self):
+        """Jitter should keep polls close to their slots."""
+        scheduler = PollScheduler({'port': 10}, jitter=0.1)
+        times = [second / 10 for second in range(1000)
+                 if scheduler.due('dpid', second / 10)]
+        gaps = [after - before for before, after in zip(times, times[1:])]
+        self.assertTrue(all(8 <= gap <= 12 for gap in gaps))
+
+    def test_switch_interval(self):
+        """A switch can have its own interval."""
+        scheduler = PollScheduler({'port': 10})
+        scheduler.due('dpid', 0)
+        scheduler.due('dpid2', 0)
+        scheduler.set_switch_interval('dpid', 'port', 20)
+        self.assertEqual({'dpid': {'port': 20}, 'dpid2': {'port': 10}},
+                         scheduler.switch_intervals())
+        polls = {'dpid': 0, 'dpid2': 0}
+        for second in range(1, 201):
+            for dpid in polls:
+                polls[dpid] += len(scheduler.due(dpid, second))
+        self.assertEqual(10, polls['dpid'])
+        self.assertEqual(20, polls['dpid2'])
@@ -0,0 +1,108 @@
+"""Test HashRing and ShardWorkers."""
+import logging
+import threading
+import unittest
+from collections import Counter
+from unittest.mock import MagicMock
+
+from napps.kytos.of_stats.shards import HashRing, ShardWorkers
+
+logging.basicConfig(level=logging.CRITICAL)
+
+DPIDS = [f'00:00:00:00:00:00:{index // 256:02x}:{index % 256:02x}'
+         for index in range(2000)]
+
+
+class TestHashRing(unittest.TestCase):
+    """Test HashRing."""
+
+    def test_balance(self):
+        """Switches should be spread evenly among the nodes."""
+        ring = HashRing(range(4))
+        counts = Counter(ring.node(dpid) for dpid in DPIDS)
+        self.assertEqual({0, 1, 2, 3}, set(counts))
+        for count in counts.values():
+            self.assertLess(abs(count - 500), 150)
+
+    def test_rebalance(self):
+        """Adding a node should only move switches to the new node."""
+        old = HashRing(['a', 'b', 'c', 'd'])
+        new = HashRing(['a', 'b', 'c', 'd', 'e'])
+        moved = [dpid for dpid in DPIDS if old.node(dpid) != new.node(dpid)]
+        self.assertTrue(all(new.node(dpid) == 'e' for dpid in moved))
+        # About 1/5 of the switches, far from a full reshuffle
+        self.assertLess(len(moved), len(DPIDS) * 0.3)
+
+    def test_simulated_instances(self):
+        """Each switch should be polled by exactly one instance."""
+        names = ['kytos1', 'kytos2', 'kytos3']
+        owned = {}
+        for name in names:
+            # Every instance builds its own ring from the same settings
+            ring = HashRing(names)
+            owned[name] = {dpid for dpid in DPIDS if ring.node(dpid) == name}
+        self.assertEqual(len(DPIDS), sum(map(len, owned.values())))
+        self.assertEqual(set(DPIDS), set.union(*owned.values()))
+
+    def test_no_nodes(self):
+        """A ring needs nodes."""
+        with self.assertRaises(ValueError):
+            HashRing([])
+
+
+class TestShardWorkers(unittest.TestCase):
+    """Test ShardWorkers."""
+
+    def setUp(self):
+        """Start 3 shard workers."""
+        self.workers = ShardWorkers(3)
+        self.addCleanup(self.workers.shutdown)
+        self.switches = []
+        for dpid in DPIDS[:30]:
+            switch = MagicMock()
+            switch.id = dpid
+            self.switches.append(switch)
+
+    def test_run(self):
+        """Each shard should poll its own switches in its own thread."""
+        polled = {}
+        lock = threading.Lock()
+
+        def poll(switches, now):
+            with lock:
+                polled[threading.current_thread().name] = (
+                    [switch.id for switch in switches], now)
+
+        self.assertEqual([], self.workers.run(self.switches, poll, 100))
+        self.workers.shutdown()
+        self.assertEqual(3, len(polled))
+        dpids = [dpid for dpids, _ in polled.values() for dpid in dpids]
+        self.assertCountEqual(DPIDS[:30], dpids)
+        for dpids, now in polled.values():
+            self.assertEqual(100, now)
+            self.assertEqual(1, len({self.workers.ring.node(dpid)
+                                     for dpid in dpids}))
+
+    def test_busy(self):
+        """A shard still polling should skip the next cycle."""
+        release = threading.Event()
+        calls = []
+
+        def poll(switches):
+            calls.append(switches)
+            release.wait(5)
+
+        self.workers.run(self.switches, poll)
+        self.assertCountEqual([0, 1, 2],
+                              self.workers.run(self.switches, poll))
+        release.set()
+        self.workers.shutdown()
+        self.assertEqual(3, len(calls))
+
+    def test_error(self):
+        """An error in a shard should not stop its worker."""
+        poll = MagicMock(side_effect=[RuntimeError, None, None, None, None,
+                                      None])
+        self.workers.run(self.switches, poll)
+        self.workers.shutdown()
+        self.assertEqual(3, poll.call_count)
@@ -0,0 +1,112 @@
+"""Test StatsSnapshots."""
+import unittest
+
+from pyof.foundation.basic_types import UBInt64
+from pyof.v0x01.controller2switch.common import PortStats
+from pyof.v0x04.common.flow_match import Match
+from pyof.v0x04.controller2switch.multipart_reply import FlowStats
+
+from napps.kytos.of_stats.snapshot import (FLOW_FIELDS, PORT_FIELDS,
+                                           CounterTable, FlowStatsView,
+                                           StatsSnapshots)
+
+
+def unpacked(entry):
+    """Return the entry as received, with pyof types instead of ints."""
+    result = type(entry)()
+    result.unpack(entry.pack())
+    return result
+
+
+def get_port_stats(port_no, rx_bytes):
+    """Return a v0x01 port stats entry, which has no durations."""
+    return unpacked(PortStats(
+        port_no=port_no, rx_packets=1, tx_packets=2, rx_bytes=rx_bytes,
+        tx_bytes=3, rx_dropped=0, tx_dropped=0, rx_errors=0, tx_errors=0,
+        rx_frame_err=0, rx_over_err=0, rx_crc_err=0, collisions=0))
+
+
+def get_flow_stats(packet_count, byte_count):
+    """Return a v0x04 flow stats entry."""
+    entry = FlowStats(table_id=0, duration_sec=5, duration_nsec=0,
+                      priority=0, idle_timeout=0, hard_timeout=0, flags=0,
+                      cookie=0, packet_count=packet_count,
+                      byte_count=byte_count, match=Match())
+    entry.length = entry.get_size()
+    return unpacked(entry)
+
+
+class TestStatsSnapshots(unittest.TestCase):
+    """Test StatsSnapshots, CounterTable and the views."""
+
+    def setUp(self):
+        """Create an empty store."""
+        self.snapshots = StatsSnapshots()
+
+    def test_port_views(self):
+        """Views should read the latest counters of their port."""
+        table = self.snapshots.ports('dpid')
+        view = table.view(2)
+        self.assertIsNone(view.rx_bytes)
+        table.update([1, 2], [get_port_stats(1, 10), get_port_stats(2, 20)])
+        self.assertEqual(20, view.rx_bytes)
+        self.assertEqual(2, view.tx_packets)
+        # OpenFlow 1.0 replies have no durations
+        self.assertIsNone(view.duration_sec)
+        table.update([2], [get_port_stats(2, 2**64 - 1)])
+        self.assertEqual(2**64 - 1, view.rx_bytes)
+        self.assertEqual(10, table.view(1).rx_bytes)
+        self.assertEqual(set(PORT_FIELDS), set(view.as_dict()))
+
+    def test_flow_rows(self):
+        """Rows of removed flows should be reused without stale views."""
+        table = self.snapshots.flows('dpid')
+        table.update(['a', 'b'], [get_flow_stats(1, 100),
+                                  get_flow_stats(2, 200)])
+        view_a = table.view('a')
+        self.assertIsInstance(view_a, FlowStatsView)
+        self.assertEqual(5, view_a.duration_sec)
+        table.retain({'b'})
+        self.assertIsNone(view_a.byte_count)
+        table.update(['c'], [get_flow_stats(3, 300)])
+        self.assertIsNone(view_a.byte_count)
+        self.assertEqual(300, table.view('c').byte_count)
+        self.assertEqual(2, len(table))
+
+    def test_update_through_view(self):
+        """Consumers updating a view should write to the table."""
+        table = self.snapshots.flows('dpid')
+        view = table.view('a')
+        entry = get_flow_stats(1, 100)
+        view.update(entry)
+        entry.byte_count = UBInt64(150)
+        view.update(entry)
+        self.assertEqual(150, view.byte_count)
+
+    def test_grow(self):
+        """Tables should grow and keep their rows."""
+        table = CounterTable(FlowStatsView, capacity=2)
+        keys = list(range(5))
+        table.update(keys, [get_flow_stats(key, key * 10) for key in keys])
+        self.assertEqual([0, 10, 20, 30, 40],
+                         [table.view(key).byte_count for key in keys])
+
+    def test_read(self):
+        """All counters of a switch should be read without copies."""
+        self.snapshots.flows('dpid').update(
+            ['a', 'b'], [get_flow_stats(1, 100), get_flow_stats(2, 200)])
+        self.snapshots.ports('other').update([1], [get_port_stats(1, 10)])
+        tables = self.snapshots.read('dpid')
+        self.assertEqual(['flow'], list(tables))
+        keys, values = tables['flow']
+        self.assertEqual(['a', 'b'], keys)
+        byte_count = FLOW_FIELDS.index('byte_count')
+        self.assertEqual([100, 200], values[:, byte_count].tolist())
+        self.snapshots.flows('dpid').update(['a'], [get_flow_stats(1, 110)])
+        self.assertEqual(110, values[0, byte_count])
+
+    def test_forget(self):
+        """Forgotten switches should have no tables."""
+        self.snapshots.ports('dpid').update([1], [get_port_stats(1, 10)])
+        self.snapshots.forget('dpid')
+        self.assertEqual({}, self.snapshots.read('dpid'))
@@ -0,0 +1,130 @@
+"""Test SegmentLog and Spool."""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from napps.kytos.of_stats.spool import SegmentLog, Spool, main, read_segment
+
+
+class TestSegmentLog(unittest.TestCase):
+    """Test SegmentLog."""
+
+    def setUp(self):
+        """Create a log in a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp.name)
+        self.log = SegmentLog(self.directory, segment_size=200,
+                              max_segments=3)
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.log.close()
+        self.tmp.cleanup()
+
+    def test_append_and_pop(self):
+        """Records should be read back in order."""
+        self.log.append(1, [('ns1', {'rx_bytes': 1})])
+        self.log.append(2, [('ns2', {'rx_bytes': 2})])
+        self.assertIsNone(self.log.pop_segment())
+        self.log.seal()
+        self.assertEqual([(1, [('ns1', {'rx_bytes': 1})]),
+                          (2, [('ns2', {'rx_bytes': 2})])],
+                         self.log.pop_segment())
+        self.assertEqual([], list(self.directory.iterdir()))
+
+    def test_rotation(self):
+        """Full segments should be sealed and the oldest ones discarded."""
+        for timestamp in range(20):
+            self.log.append(timestamp, [(f'ns{timestamp}', {'bytes': 0})])
+        self.assertEqual(3, self.log.segments())
+        records = self.log.pop_segment()
+        self.assertLess(0, records[0][0])
+
+    def test_reopen(self):
+        """Segments of a previous run should be replayed."""
+        self.log.append(1, [('ns1', {'rx_bytes': 1})])
+        self.log.sync()
+        # Simulate a crash: the active segment is not sealed.
+        log = SegmentLog(self.directory, segment_size=200, max_segments=3)
+        self.assertEqual([(1, [('ns1', {'rx_bytes': 1})])],
+                         log.pop_segment())
+
+    def test_corrupted(self):
+        """Reading should stop at a corrupted record."""
+        self.log.append(1, [('ns1', {'rx_bytes': 1})])
+        self.log.append(2, [('ns2', {'rx_bytes': 2})])
+        self.log.seal()
+        path = next(self.directory.iterdir())
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xff
+        path.write_bytes(data)
+        self.assertEqual([1], [timestamp
+                               for timestamp, _ in read_segment(path)])
+
+    def test_export(self):
+        """Segments should be exported as JSON lines."""
+        self.log.append(1, [('ns1', {'rx_bytes': 1})])
+        self.log.seal()
+        output = self.directory / 'out.jsonl'
+        main(['export', str(self.directory), '-o', str(output), '--delete'])
+        self.assertEqual('{"timestamp": 1.0, "namespace": "ns1", "value":'
+                         ' {"rx_bytes": 1}}\n', output.read_text())
+        self.assertEqual(0, len(list(self.directory.glob('*.spool'))))
+
+
+class TestSpool(unittest.TestCase):
+    """Test Spool."""
+
+    def setUp(self):
+        """Create a spool with a mocked log."""
+        self.log = MagicMock()
+        self.log.segments.return_value = 1
+        self.spool = Spool(self.log, 'fallback', retry_interval=30)
+
+    def test_failed_batch(self):
+        """Samples of failed events should be spooled."""
+        event = MagicMock(content={'samples': [{'namespace': 'ns',
+                                                'value': {'a': 1}}],
+                                   'timestamp': 5})
+        self.spool.saved(event, 'error', now=10)
+        self.log.append.assert_called_once_with(5, [('ns', {'a': 1})])
+        self.assertTrue(self.spool.active(now=20))
+        self.assertFalse(self.spool.active(now=40))
+        self.assertEqual([], self.spool.replay())
+
+    def test_failed_record(self):
+        """Samples of failed record events should be spooled."""
+        event = MagicMock(content={'namespace': 'ns', 'value': {'a': 1},
+                                   'timestamp': 5})
+        self.spool.saved(event, 'error', now=10)
+        self.log.append.assert_called_once_with(5, [('ns', {'a': 1})])
+
+    def test_replay_after_success(self):
+        """The log should be replayed after a successful save."""
+        event = MagicMock(content={'namespace': 'ns', 'value': {'a': 1}})
+        self.spool.saved(event, 'error', now=10)
+        self.spool.saved(MagicMock(), None)
+        self.assertFalse(self.spool.active(now=11))
+        self.log.pop_segment.return_value = [(1, [])]
+        self.assertEqual([(1, [])], self.spool.replay())
+
+    def test_always(self):
+        """In always mode, samples should always be spooled."""
+        spool = Spool(self.log, 'always')
+        self.assertTrue(spool.active())
+
+    def test_always_failing(self):
+        """In always mode, replays should wait after a failure."""
+        spool = Spool(self.log, 'always', retry_interval=30)
+        self.log.pop_segment.return_value = [(1, [('ns', {'a': 1})])]
+        records = spool.replay(now=0)
+        self.assertEqual([(1, [('ns', {'a': 1})])], records)
+        # kronos fails and the replayed samples go back to the log
+        event = MagicMock(content={'namespace': 'ns', 'value': {'a': 1},
+                                   'timestamp': 1})
+        spool.saved(event, 'error', now=1)
+        self.log.pop_segment.reset_mock()
+        self.assertEqual([], spool.replay(now=10))
+        self.log.pop_segment.assert_not_called()
+        self.assertEqual(records, spool.replay(now=31))
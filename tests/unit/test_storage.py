@@ -0,0 +1,123 @@
+"""Test KronosStorage."""
+import unittest
+from unittest.mock import MagicMock
+
+from napps.kytos.of_stats.storage import KronosStorage
+
+
+class TestKronosStorage(unittest.TestCase):
+    """Test KronosStorage."""
+
+    def setUp(self):
+        """Create a storage with a mocked buffer."""
+        self.buffer = MagicMock()
+        self.callback = MagicMock()
+        self.samples = [('kytos.kronos.dpid.port_no.1', {'rx_bytes': 1}),
+                        ('kytos.kronos.dpid.port_no.2', {'rx_bytes': 2}),
+                        ('kytos.kronos.dpid.port_no.3', {'rx_bytes': 3})]
+
+    def put_events(self):
+        """Return the events put in the buffer."""
+        return [call[0][0] for call in self.buffer.put.call_args_list]
+
+    def test_batch(self):
+        """All samples should be sent in a single event."""
+        storage = KronosStorage(self.buffer, self.callback, mode='batch',
+                                heartbeat=0)
+        storage.save(self.samples, timestamp=42)
+        events = self.put_events()
+        self.assertEqual(1, len(events))
+        self.assertEqual('kytos.kronos.save_batch', events[0].name)
+        self.assertEqual(42, events[0].content['timestamp'])
+        self.assertEqual(3, len(events[0].content['samples']))
+        self.assertEqual({'namespace': 'kytos.kronos.dpid.port_no.2',
+                          'value': {'rx_bytes': 2}},
+                         events[0].content['samples'][1])
+
+    def test_batch_size(self):
+        """Samples should be split in batches of the given size."""
+        storage = KronosStorage(self.buffer, self.callback, mode='batch',
+                                batch_size=2, heartbeat=0)
+        storage.save(self.samples)
+        sizes = [len(event.content['samples'])
+                 for event in self.put_events()]
+        self.assertEqual([2, 1], sizes)
+
+    def test_record(self):
+        """Each sample should be sent in its own event."""
+        storage = KronosStorage(self.buffer, self.callback, mode='record',
+                                heartbeat=0)
+        storage.save(self.samples, timestamp=42)
+        events = self.put_events()
+        self.assertEqual(['kytos.kronos.save'] * 3,
+                         [event.name for event in events])
+        self.assertEqual('kytos.kronos.dpid.port_no.1',
+                         events[0].content['namespace'])
+        self.assertEqual(42, events[2].content['timestamp'])
+
+    def test_no_samples(self):
+        """Nothing should be sent without samples."""
+        KronosStorage(self.buffer, self.callback).save([])
+        self.buffer.put.assert_not_called()
+
+    def test_invalid_mode(self):
+        """Unknown modes should be rejected."""
+        with self.assertRaises(ValueError):
+            KronosStorage(self.buffer, self.callback, mode='invalid')
+
+    def test_unchanged(self):
+        """Unchanged samples should be skipped until the heartbeat."""
+        storage = KronosStorage(self.buffer, self.callback, mode='record',
+                                heartbeat=60)
+        storage.save(self.samples, timestamp=0)
+        changed = [self.samples[0], ('kytos.kronos.dpid.port_no.2',
+                                     {'rx_bytes': 5})]
+        storage.save(changed, timestamp=30)
+        storage.save(self.samples[:1], timestamp=60)
+        namespaces = [event.content['namespace']
+                      for event in self.put_events()]
+        self.assertEqual(['kytos.kronos.dpid.port_no.1',
+                          'kytos.kronos.dpid.port_no.2',
+                          'kytos.kronos.dpid.port_no.3',
+                          'kytos.kronos.dpid.port_no.2',
+                          'kytos.kronos.dpid.port_no.1'], namespaces)
+
+    def test_metrics(self):
+        """Events should be counted for the source of the samples."""
+        storage = KronosStorage(self.buffer, self.callback, mode='batch',
+                                batch_size=2, heartbeat=0)
+        storage.metrics = MagicMock()
+        storage.save(self.samples, source=('dpid', 'port'))
+        storage.metrics.count.assert_called_once_with(
+            'dpid', 'port', 'events_emitted', 2)
+
+    def test_queue(self):
+        """Samples should wait while the app buffer is behind."""
+        storage = KronosStorage(self.buffer, self.callback, mode='record',
+                                heartbeat=0, queue_size=10, max_buffered=2)
+        self.buffer.qsize.return_value = 2
+        storage.save(self.samples, timestamp=1)
+        storage.save(self.samples[:1], timestamp=2)
+        self.assertEqual([], self.put_events())
+        self.buffer.qsize.return_value = 0
+        self.assertEqual(2, storage.flush())
+        self.assertEqual([('kytos.kronos.dpid.port_no.1', 2),
+                          ('kytos.kronos.dpid.port_no.2', 1)],
+                         [(event.content['namespace'],
+                           event.content['timestamp'])
+                          for event in self.put_events()])
+
+    def test_queue_record_flows(self):
+        """Packet and byte counts of a flow should both be queued."""
+        storage = KronosStorage(self.buffer, self.callback, mode='record',
+                                heartbeat=0, queue_size=10, max_buffered=2)
+        self.buffer.qsize.return_value = 2
+        storage.save([('kytos.kronos.dpid.flow_id.1', {'packet_count': 1}),
+                      ('kytos.kronos.dpid.flow_id.1', {'byte_count': 2})],
+                     timestamp=1)
+        self.assertEqual(0, storage.queue.counters()['coalesced'])
+        self.buffer.qsize.return_value = 0
+        self.assertEqual(2, storage.flush())
+        self.assertEqual([{'packet_count': 1}, {'byte_count': 2}],
+                         [event.content['value']
+                          for event in self.put_events()])
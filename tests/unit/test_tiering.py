@@ -0,0 +1,38 @@
+"""Test FlowDumpPolicy."""
+import unittest
+
+from napps.kytos.of_stats.tiering import FlowDumpPolicy
+
+
+class TestFlowDumpPolicy(unittest.TestCase):
+    """Test FlowDumpPolicy."""
+
+    def setUp(self):
+        """Dump after 1000 bytes or 600 seconds."""
+        self.policy = FlowDumpPolicy(min_bytes=1000, max_interval=600)
+        self.policy.dumped('dpid', (10, 5000, 3), now=0)
+
+    def test_first_dump(self):
+        """Switches without dumps or aggregate stats should be dumped."""
+        self.assertTrue(self.policy.should_dump('dpid2', (1, 1, 1), 0))
+        self.assertTrue(self.policy.should_dump('dpid', None, 0))
+
+    def test_no_changes(self):
+        """Small changes should not trigger a dump."""
+        self.assertFalse(self.policy.should_dump('dpid', (11, 5999, 3), 10))
+
+    def test_bytes(self):
+        """Enough bytes should trigger a dump."""
+        self.assertTrue(self.policy.should_dump('dpid', (20, 6000, 3), 10))
+
+    def test_flow_count(self):
+        """Added or removed flows should trigger a dump."""
+        self.assertTrue(self.policy.should_dump('dpid', (10, 5000, 2), 10))
+
+    def test_reset(self):
+        """Counter resets should trigger a dump."""
+        self.assertTrue(self.policy.should_dump('dpid', (1, 100, 3), 10))
+
+    def test_max_interval(self):
+        """Old dumps should be refreshed."""
+        self.assertTrue(self.policy.should_dump('dpid', (10, 5000, 3), 600))
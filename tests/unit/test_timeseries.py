@@ -0,0 +1,66 @@
+"""Test TimeSeriesStore."""
+import unittest
+
+from napps.kytos.of_stats.timeseries import TimeSeriesStore
+
+
+class TestTimeSeriesStore(unittest.TestCase):
+    """Test TimeSeriesStore."""
+
+    def setUp(self):
+        """Create a store with 3 samples per series."""
+        self.store = TimeSeriesStore(capacity=3, max_series=2)
+
+    def add_flow(self, timestamp, packets, flow_id='flow1'):
+        """Add a flow sample."""
+        self.store.add('dpid', 'flow', timestamp,
+                       [(flow_id, (packets, packets * 100))])
+
+    def test_ring(self):
+        """Only the most recent samples should be kept, oldest first."""
+        for timestamp in range(5):
+            self.add_flow(timestamp, timestamp * 10)
+        result = self.store.query('dpid', 'flow', 'flow1')
+        self.assertEqual([2, 3, 4], result['timestamps'])
+        self.assertEqual([20, 30, 40], result['packet_count'])
+        self.assertEqual([2000, 3000, 4000], result['byte_count'])
+
+    def test_rates(self):
+        """Rates should handle 32-bit wraps and resets."""
+        self.add_flow(0, 2**32 - 10)
+        self.add_flow(2, 10)
+        self.add_flow(4, 0)
+        result = self.store.query('dpid', 'flow', 'flow1', rates=True)
+        self.assertEqual([None, 10, None], result['packet_count_per_sec'])
+
+    def test_since(self):
+        """Only samples newer than ``since`` should be returned."""
+        for timestamp in range(3):
+            self.add_flow(timestamp, timestamp)
+        result = self.store.query('dpid', 'flow', 'flow1', since=0.5,
+                                  rates=True)
+        self.assertEqual([1, 2], result['timestamps'])
+        self.assertEqual([1, 1], result['packet_count_per_sec'])
+
+    def test_max_series(self):
+        """New series beyond the limit should be ignored."""
+        self.add_flow(0, 1, 'flow1')
+        self.store.add('dpid', 'port', 0, [(1, (1, 2, 3, 4, 5, 6))])
+        self.add_flow(0, 1, 'flow2')
+        self.assertIsNone(self.store.query('dpid', 'flow', 'flow2'))
+        port = self.store.query('dpid', 'port', 1)
+        self.assertEqual([6], port['tx_errors'])
+
+    def test_retain(self):
+        """Series of removed flows should be discarded."""
+        self.add_flow(0, 1, 'flow1')
+        self.store.add('dpid', 'port', 0, [(1, (1, 2, 3, 4, 5, 6))])
+        self.store.retain('dpid', 'flow', set())
+        self.assertIsNone(self.store.query('dpid', 'flow', 'flow1'))
+        self.assertIsNotNone(self.store.query('dpid', 'port', 1))
+
+    def test_forget(self):
+        """Series of a disconnected switch should be discarded."""
+        self.add_flow(0, 1)
+        self.store.forget('dpid')
+        self.assertIsNone(self.store.query('dpid', 'flow', 'flow1'))
@@ -0,0 +1,49 @@
+"""Test TriggeredPolls."""
+import unittest
+
+from napps.kytos.of_stats.triggers import TriggeredPolls
+
+
+class TestTriggeredPolls(unittest.TestCase):
+    """Test TriggeredPolls."""
+
+    def setUp(self):
+        """Debounce 1 s, one poll every 10 s and up to 2 single ports."""
+        self.triggers = TriggeredPolls(1, 10, 2)
+
+    def test_debounce(self):
+        """Events should be merged until the debounce time has passed."""
+        self.triggers.trigger('dpid', 'port', 100, 1)
+        self.triggers.trigger('dpid', 'port', 100.5, 2)
+        self.assertEqual([], self.triggers.due(100.5))
+        self.assertEqual([('dpid', 'port', [1, 2])],
+                         self.triggers.due(101))
+        self.assertEqual([], self.triggers.due(102))
+
+    def test_min_interval(self):
+        """A switch should not be polled again before the minimum interval."""
+        self.triggers.trigger('dpid', 'flow', 100)
+        self.assertEqual([('dpid', 'flow', None)], self.triggers.due(101))
+        self.triggers.trigger('dpid', 'flow', 102)
+        self.assertEqual([], self.triggers.due(103))
+        self.assertEqual([('dpid', 'flow', None)], self.triggers.due(111))
+
+    def test_whole_switch(self):
+        """Too many ports or a whole-switch event should poll all ports."""
+        for port_no in (1, 2, 3):
+            self.triggers.trigger('dpid', 'port', 100, port_no)
+        self.triggers.trigger('other', 'port', 100, 1)
+        self.triggers.trigger('other', 'port', 100)
+        self.triggers.trigger('other', 'port', 100, 2)
+        self.assertEqual([('dpid', 'port', None), ('other', 'port', None)],
+                         self.triggers.due(101))
+
+    def test_forget(self):
+        """Forgotten switches should have no pending polls nor limits."""
+        self.triggers.trigger('dpid', 'flow', 100)
+        self.triggers.due(101)
+        self.triggers.trigger('dpid', 'port', 102, 1)
+        self.triggers.forget('dpid')
+        self.assertEqual([], self.triggers.due(105))
+        self.triggers.trigger('dpid', 'flow', 105)
+        self.assertEqual([('dpid', 'flow', None)], self.triggers.due(106))
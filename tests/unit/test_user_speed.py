@@ -5,6 +5,7 @@ from pathlib import Path
 from unittest.mock import mock_open, patch  # noqa (isort conflict)
 
 from napps.kytos.of_stats.user_speed import UserSpeed
+from napps.kytos.of_stats.watched_file import WatchedFile
 
 logging.basicConfig(level=logging.CRITICAL)
 
@@ -55,3 +56,34 @@ class TestUserSpeed(unittest.TestCase):
             '{"default": 1, "dpid": {"default": 2000000000, "4": 3000000000}}'
         )
         self.assertEqual(3 * 10 ** 9, UserSpeed().get_speed("dpid", 4))
+
+    def test_int_and_str_ports(self):
+        """Ports can be given as int or str."""
+        self.set_file_content('{"dpid": {"4": 3000000000}}')
+        user_speed = UserSpeed()
+        self.assertEqual(3 * 10 ** 9, user_speed.get_speed('dpid', 4))
+        self.assertEqual(3 * 10 ** 9, user_speed.get_speed('dpid', '4'))
+
+    def test_refresh(self):
+        """Reload the file only after it changes."""
+        self.set_file_content('{"default": 1}')
+        with patch.object(WatchedFile, '_get_mtime', return_value=1):
+            user_speed = UserSpeed(check_interval=5)
+            self.set_file_content('{"default": 2}')
+            user_speed.refresh(now=user_speed._file._checked_at + 5)
+            self.assertEqual(1, user_speed.get_speed('dpid'))
+
+        with patch.object(WatchedFile, '_get_mtime', return_value=2):
+            user_speed.refresh(now=user_speed._file._checked_at + 1)
+            self.assertEqual(1, user_speed.get_speed('dpid'))
+            user_speed.refresh(now=user_speed._file._checked_at + 5)
+            self.assertEqual(2, user_speed.get_speed('dpid'))
+
+    def test_refresh_invalid_file(self):
+        """Keep previous speeds if the new file is invalid."""
+        self.set_file_content('{"default": 1}')
+        with patch.object(WatchedFile, '_get_mtime', side_effect=[1, 2]):
+            user_speed = UserSpeed()
+            self.set_file_content('{"default": ')
+            user_speed.refresh(now=user_speed._file._checked_at + 5)
+        self.assertEqual(1, user_speed.get_speed('dpid'))
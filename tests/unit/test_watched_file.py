@@ -0,0 +1,44 @@
+"""Test WatchedFile."""
+import logging
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from napps.kytos.of_stats.watched_file import WatchedFile
+
+logging.basicConfig(level=logging.CRITICAL)
+
+
+class TestWatchedFile(unittest.TestCase):
+    """Test WatchedFile with a temporary file."""
+
+    def setUp(self):
+        """Watch a file in a temporary directory."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'watched.json'
+
+    def write(self, content, mtime):
+        """Write the file with a given modification time."""
+        self.path.write_text(content)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_missing_file(self):
+        """A missing file should be read as empty."""
+        watched = WatchedFile(self.path, dict, 'values')
+        self.assertEqual({}, watched.content)
+
+    def test_refresh(self):
+        """Changes should be loaded and invalid files ignored."""
+        self.write('{"a": 1}', 1)
+        watched = WatchedFile(self.path, dict, 'values', check_interval=5)
+        start = watched._checked_at  # pylint: disable=protected-access
+        self.write('{"a": 2}', 2)
+        watched.refresh(start + 1)
+        self.assertEqual({'a': 1}, watched.content)
+        watched.refresh(start + 5)
+        self.assertEqual({'a': 2}, watched.content)
+        self.write('{"a": ', 3)
+        watched.refresh(start + 10)
+        self.assertEqual({'a': 2}, watched.content)
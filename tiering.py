@@ -0,0 +1,56 @@
+"""Request full flow dumps only when aggregate stats show changes."""
+
+
+class FlowDumpPolicy:
+    """Decide whether a switch needs a full flow stats dump.
+
+    Aggregate stats (total packets, bytes and flows) are polled often and
+    compared to the totals at the last dump. A new dump is requested when
+    the number of flows changed, when enough bytes were counted since then
+    or when the last dump is too old.
+    """
+
+    def __init__(self, min_bytes, max_interval):
+        """Set what is a meaningful change.
+
+        Args:
+            min_bytes (int): Bytes counted since the last dump that trigger a
+                new one.
+            max_interval (float): Maximum seconds between dumps.
+
+        """
+        self.min_bytes = min_bytes
+        self.max_interval = max_interval
+        #: dpid -> (time, totals) of the last dump
+        self._dumps = {}
+
+    def should_dump(self, dpid, totals, now):
+        """Return whether a full flow dump should be requested.
+
+        Args:
+            dpid (str): Switch dpid.
+            totals (tuple): Latest aggregate (packet_count, byte_count,
+                flow_count), ``None`` if unknown.
+            now (float): Current time.
+
+        """
+        last = self._dumps.get(dpid)
+        if last is None or totals is None or last[1] is None:
+            return True
+        dumped_at, dumped_totals = last
+        if now - dumped_at >= self.max_interval:
+            return True
+        _, dumped_bytes, dumped_flows = dumped_totals
+        _, byte_count, flow_count = totals
+        if flow_count != dumped_flows:
+            return True
+        # A smaller counter means the switch was reset.
+        return not 0 <= byte_count - dumped_bytes < self.min_bytes
+
+    def dumped(self, dpid, totals, now):
+        """Register a full flow dump request."""
+        self._dumps[dpid] = (now, totals)
+
+    def forget(self, dpid):
+        """Forget the dumps of a switch."""
+        self._dumps.pop(dpid, None)
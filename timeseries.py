@@ -0,0 +1,189 @@
+"""Keep the most recent samples of each port and flow in memory."""
+from threading import Lock
+
+from kytos.core import log
+from napps.kytos.of_stats.rates import COUNTERS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+#: Counters kept for each kind of series.
+FIELDS = {'port': COUNTERS,
+          'flow': ('packet_count', 'byte_count')}
+
+
+class RingBuffer:
+    """Fixed-size buffer of timestamps and counters.
+
+    The oldest sample is overwritten when the buffer is full. Counters are
+    kept as unsigned 64-bit integers, like in the OpenFlow messages.
+    """
+
+    __slots__ = ('times', 'values', 'next', 'size')
+
+    def __init__(self, capacity, fields):
+        """Allocate the buffer.
+
+        Args:
+            capacity (int): Maximum number of samples.
+            fields (int): Number of counters per sample.
+
+        """
+        self.times = numpy.zeros(capacity, dtype=numpy.float64)
+        self.values = numpy.zeros((capacity, fields), dtype=numpy.uint64)
+        self.next = 0
+        self.size = 0
+
+    def append(self, timestamp, values):
+        """Add a sample, overwriting the oldest one if full."""
+        self.times[self.next] = timestamp
+        self.values[self.next] = values
+        self.next = (self.next + 1) % len(self.times)
+        self.size = min(self.size + 1, len(self.times))
+
+    def samples(self):
+        """Return copies of the timestamps and counters, oldest first."""
+        if self.size < len(self.times):
+            return self.times[:self.size].copy(), \
+                self.values[:self.size].copy()
+        order = numpy.r_[self.next:len(self.times), 0:self.next]
+        return self.times[order], self.values[order]
+
+
+def counter_rates(times, values):
+    """Return the rates per second between consecutive samples.
+
+    Wraps are handled as in :func:`rates.counter_delta`. Rates after a counter
+    reset are NaN.
+
+    Args:
+        times (numpy.ndarray): Sample timestamps.
+        values (numpy.ndarray): Counters, one row per sample.
+
+    Returns:
+        numpy.ndarray: One row less than ``values``.
+
+    """
+    old, new = values[:-1], values[1:]
+    # Unsigned subtraction already handles 64-bit wraps.
+    delta = new - old
+    wrapped = new < old
+    size32 = old < 2**32
+    delta = numpy.where(wrapped & size32, delta + numpy.uint64(2**32), delta)
+    valid = ~wrapped | (size32 & (old >= 2**31)) | (~size32 & (old >= 2**63))
+    elapsed = numpy.diff(times)[:, numpy.newaxis]
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        rates = delta.astype(numpy.float64) / elapsed
+    rates[~valid | (elapsed <= 0)] = numpy.nan
+    return rates
+
+
+class TimeSeriesStore:
+    """Recent samples of each (dpid, port) and (dpid, flow_id).
+
+    Each series has a ring buffer of ``capacity`` samples, allocated when its
+    first sample arrives. At most ``max_series`` series are kept, so memory
+    use is bounded. Samples of new series beyond the limit are ignored.
+    """
+
+    def __init__(self, capacity, max_series):
+        """Set the memory bounds.
+
+        Args:
+            capacity (int): Samples kept per series.
+            max_series (int): Maximum number of series.
+
+        Raises:
+            RuntimeError: NumPy is not installed.
+
+        """
+        if numpy is None:
+            raise RuntimeError('NumPy is required to keep recent samples.')
+        self.capacity = capacity
+        self.max_series = max_series
+        #: (dpid, kind, id) -> RingBuffer
+        self._series = {}
+        self._full_warned = False
+        self._lock = Lock()
+
+    def add(self, dpid, kind, timestamp, entries):
+        """Add the samples of a stats reply.
+
+        Args:
+            dpid (str): Switch dpid.
+            kind (str): ``port`` or ``flow``.
+            timestamp (float): When the reply was received.
+            entries (list): (port_no or flow_id, counters) tuples. Counters
+                are in the order of :data:`FIELDS`.
+
+        """
+        fields = len(FIELDS[kind])
+        with self._lock:
+            for entry_id, counters in entries:
+                buffer = self._series.get((dpid, kind, entry_id))
+                if buffer is None:
+                    if len(self._series) >= self.max_series:
+                        self._warn_full()
+                        continue
+                    buffer = RingBuffer(self.capacity, fields)
+                    self._series[(dpid, kind, entry_id)] = buffer
+                buffer.append(timestamp, counters)
+
+    def retain(self, dpid, kind, entry_ids):
+        """Discard the series of entries that are not in ``entry_ids``."""
+        with self._lock:
+            for key in [key for key in self._series
+                        if key[:2] == (dpid, kind)
+                        and key[2] not in entry_ids]:
+                del self._series[key]
+
+    def forget(self, dpid):
+        """Discard all series of a switch."""
+        with self._lock:
+            for key in [key for key in self._series if key[0] == dpid]:
+                del self._series[key]
+
+    def query(self, dpid, kind, entry_id, since=None, rates=False):
+        """Return the recent samples of a port or flow.
+
+        Args:
+            dpid (str): Switch dpid.
+            kind (str): ``port`` or ``flow``.
+            entry_id: Port number or flow id.
+            since (float): Only samples newer than this timestamp.
+            rates (bool): Also return ``<counter>_per_sec`` series, with
+                ``None`` for the first sample and after counter resets.
+
+        Returns:
+            dict: ``timestamps`` and one list per counter, ``None`` if the
+            series is unknown.
+
+        """
+        with self._lock:
+            buffer = self._series.get((dpid, kind, entry_id))
+            if buffer is None:
+                return None
+            times, values = buffer.samples()
+        fields = FIELDS[kind]
+        result = {'timestamps': times.tolist()}
+        for index, field in enumerate(fields):
+            result[field] = values[:, index].tolist()
+        if rates:
+            series_rates = counter_rates(times, values)
+            for index, field in enumerate(fields):
+                result[f'{field}_per_sec'] = [None] + [
+                    None if numpy.isnan(rate) else rate
+                    for rate in series_rates[:, index].tolist()]
+        if since is not None:
+            first = int(numpy.searchsorted(times, since, side='right'))
+            result = {name: series[first:]
+                      for name, series in result.items()}
+        return result
+
+    def _warn_full(self):
+        if not self._full_warned:
+            log.warning('Keeping recent samples of %d ports and flows.'
+                        ' New ones are not kept.', self.max_series)
+            self._full_warned = True
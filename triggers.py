@@ -0,0 +1,95 @@
+"""Poll switches right after events that change their statistics."""
+from threading import Lock
+
+
+class _Trigger:
+    """A pending triggered poll."""
+
+    __slots__ = ('due', 'ports')
+
+    def __init__(self, due, ports):
+        self.due = due
+        self.ports = ports
+
+
+class TriggeredPolls:
+    """Debounced, rate-limited polls of a switch and stats type.
+
+    Events within ``debounce`` seconds of the first one are merged into a
+    single poll, and a switch is polled at most once every ``min_interval``
+    seconds for a stats type. A port poll can be limited to the ports of
+    the events; with more than ``max_ports`` ports, all ports are polled.
+    """
+
+    def __init__(self, debounce, min_interval, max_ports):
+        """Set how often triggered polls can happen.
+
+        Args:
+            debounce (float): Seconds to wait for more events.
+            min_interval (float): Minimum seconds between triggered polls of
+                a switch and stats type.
+            max_ports (int): Maximum number of single-port requests of a
+                poll.
+
+        """
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self.max_ports = max_ports
+        #: (dpid, name) -> _Trigger
+        self._pending = {}
+        #: (dpid, name) -> time of the last triggered poll
+        self._polled = {}
+        # Events are handled by several threads and due() is called by the
+        # scheduler.
+        self._lock = Lock()
+
+    def trigger(self, dpid, name, now, port_no=None):
+        """Schedule a poll of a switch.
+
+        Args:
+            dpid (str): Switch dpid.
+            name (str): Stats type name.
+            now (float): Time of the event.
+            port_no (int): Port to poll, ``None`` for the whole switch.
+
+        """
+        key = (dpid, name)
+        with self._lock:
+            trigger = self._pending.get(key)
+            if trigger is None:
+                due = max(now + self.debounce,
+                          self._polled.get(key, -self.min_interval)
+                          + self.min_interval)
+                trigger = self._pending[key] = _Trigger(due, set())
+            if trigger.ports is None:
+                return
+            if port_no is None or len(trigger.ports) >= self.max_ports:
+                trigger.ports = None
+            else:
+                trigger.ports.add(port_no)
+
+    def due(self, now):
+        """Return and remove the polls that should be sent now.
+
+        Returns:
+            list: ``(dpid, name, ports)`` tuples. ``ports`` is ``None`` for
+            the whole switch.
+
+        """
+        result = []
+        with self._lock:
+            for key, trigger in list(self._pending.items()):
+                if now >= trigger.due:
+                    del self._pending[key]
+                    self._polled[key] = now
+                    ports = sorted(trigger.ports) \
+                        if trigger.ports is not None else None
+                    result.append((*key, ports))
+        return result
+
+    def forget(self, dpid):
+        """Discard the polls of a switch."""
+        with self._lock:
+            for mapping in self._pending, self._polled:
+                for key in [key for key in mapping if key[0] == dpid]:
+                    del mapping[key]
@@ -1,26 +1,39 @@
 """Manage link speeds when OF spec is not enough."""
-import json
 from os.path import dirname
 from pathlib import Path
 
+from napps.kytos.of_stats.watched_file import WatchedFile
+
 
 class UserSpeed:
     """User-defined interface speeds.
 
     In case there is no matching speed in OF spec or the speed is not correctly
     detected.
+
+    The file is parsed into flat lookup tables that are replaced at once, so
+    :meth:`get_speed` never sees a partially loaded file. Call
+    :meth:`refresh` periodically to load changes.
     """
 
     _FILE = Path(dirname(__file__)) / 'user_speed.json'
 
-    def __init__(self):
-        """Load user-created file."""
-        if self._FILE.exists():
-            with self._FILE.open() as user_file:
-                # print('UserSpeed', user_file.read())
-                self._speed = json.load(user_file)
-        else:
-            self._speed = {}
+    def __init__(self, check_interval=5):
+        """Load user-created file.
+
+        Args:
+            check_interval (float): Minimum seconds between checks for file
+                changes in :meth:`refresh`.
+
+        """
+        # Content: ({(dpid, port): speed}, {dpid: switch default},
+        # global default)
+        self._file = WatchedFile(self._FILE, self._build_tables,
+                                 'user-defined speeds', check_interval)
+
+    def refresh(self, now=None):
+        """Reload the file if it changed since it was last read."""
+        self._file.refresh(now)
 
     def get_speed(self, dpid, port=None):
         """Return speed in bits/sec or None if not defined by the user.
@@ -29,15 +42,31 @@ class UserSpeed:
             dpid (str): Switch dpid.
             port (int or str): Port number.
         """
-        if not isinstance(port, str):
-            port = str(port)
-        speed = None
-        switch = self._speed.get(dpid)
-        if switch is None:
-            speed = self._speed.get('default')
-        else:
-            if port is None or port not in switch:
-                speed = switch.get('default')
-            else:
-                speed = switch.get(port)
-        return speed
+        ports, switch_defaults, default = self._file.content
+        speed = ports.get((dpid, port))
+        if speed is not None:
+            return speed
+        if dpid in switch_defaults:
+            return switch_defaults[dpid]
+        return default
+
+    @staticmethod
+    def _build_tables(speeds):
+        """Flatten the file content into lookup tables.
+
+        Ports are indexed both by ``str`` and ``int`` so lookups don't need
+        any conversion.
+        """
+        ports = {}
+        switch_defaults = {}
+        for dpid, switch in speeds.items():
+            if dpid == 'default' or not isinstance(switch, dict):
+                continue
+            switch_defaults[dpid] = switch.get('default')
+            for port, speed in switch.items():
+                if port == 'default':
+                    continue
+                ports[(dpid, port)] = speed
+                if port.isdigit():
+                    ports[(dpid, int(port))] = speed
+        return ports, switch_defaults, speeds.get('default')
@@ -0,0 +1,67 @@
+"""Reload user-created JSON files when they change."""
+import json
+import time
+
+from kytos.core import log
+
+
+class WatchedFile:
+    """JSON file whose content is converted again when the file changes.
+
+    ``build`` turns the file content into the structure used for lookups,
+    which replaces the previous one at once, so readers never see a
+    partially loaded file. Call :meth:`refresh` periodically to load changes.
+    """
+
+    def __init__(self, path, build, description, check_interval=5):
+        """Load the file.
+
+        Args:
+            path (Path): JSON file. A missing file is read as ``{}``.
+            build (callable): Convert the file content. Invalid content
+                raises ``ValueError``, ``TypeError`` or ``AttributeError``.
+            description (str): What the file holds, for log messages.
+            check_interval (float): Minimum seconds between checks for file
+                changes in :meth:`refresh`.
+
+        """
+        self.path = path
+        self.build = build
+        self.description = description
+        self.check_interval = check_interval
+        self._checked_at = time.time()
+        self._mtime = self._get_mtime()
+        #: Result of ``build`` for the latest valid file.
+        self.content = build(self._read())
+
+    def refresh(self, now=None):
+        """Reload the file if it changed since it was last read."""
+        if now is None:
+            now = time.time()
+        if now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        mtime = self._get_mtime()
+        if mtime == self._mtime:
+            return
+        try:
+            content = self.build(self._read())
+        except (ValueError, TypeError, AttributeError) as error:
+            log.error(f'Invalid {self.path.name}, keeping previous '
+                      f'{self.description}: {error}')
+            return
+        self._mtime = mtime
+        self.content = content
+        log.info(f'Loaded {self.description} from {self.path.name}.')
+
+    def _get_mtime(self):
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+    def _read(self):
+        if self.path.exists():
+            with self.path.open() as user_file:
+                return json.load(user_file)
+        return {}